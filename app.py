@@ -3,18 +3,53 @@ Flask Web Application for AI Agent Assistant
 Provides a web interface for interview preparation and PDF summarization
 """
 
+import base64
 import os
-import json
 import tempfile
+import threading
+import time
 from pathlib import Path
-from flask import Flask, render_template, request, jsonify, send_file
+
+import numpy as np
+from flask import Flask, Response, g, render_template, request, jsonify, send_file, url_for
+from werkzeug.security import safe_join
 from werkzeug.utils import secure_filename
 from crewai import Task
 from langchain.schema import BaseMessage, HumanMessage, AIMessage
 
 # Import voice processing modules
 from voice.stt_handler import SpeechToTextHandler
+from voice.whisper_tiers import AdaptiveWhisper, load_real_time_factors
 from voice.tts_handler import TextToSpeechHandler
+from voice.streaming_stt import StreamingTranscriber, StreamingSessions, SAMPLE_RATE
+from voice.speech_text import speech_sections
+from voice.speculative_tts import SpeculativeSynthesizer
+
+# Import summary output parsing
+from processing.prompt_layout import cache_usage
+from processing.summary_parser import extract_summary, repair_summary, watch_summary_stream
+from processing.summary_export import EXPORT_FORMATS, export_summary
+from processing.pdf_text import parse_page_range, page_range_from_env
+from processing.llm_retry import RetryPolicy, install_llm_retry, is_transient
+
+# Import result storage
+from storage.result_store import ResultStore, hash_inputs, parse_timestamp
+from storage.blob_store import BlobStore, is_blob_hash
+from storage.profile_cache import ProfileCache
+from storage.temp_files import TempFileManager
+from storage.chunked_uploads import ChunkedUploads, UploadError, PART_SUFFIX
+from storage.near_duplicate_index import NearDuplicateIndex
+from storage.usage_ledger import UsageLedger, BudgetPolicy, GROUP_COLUMNS
+from storage.speech_cache import SpeechCache
+from storage.task_checkpoints import TaskCheckpointStore
+
+# Import HTTP serving helpers
+from serving.executors import cpu_bound, io_executor, cpu_queue_depth, CPU_WORKERS
+from serving.compression import compress_response
+from serving.traffic_capture import TrafficCapture, DEFAULT_CAPTURE_PATH
+from serving.file_serving import send_immutable_file
+from serving.static_assets import AssetManifest, DIST_DIRNAME
+from serving.warmup import WarmUp
 
 # Import our existing agent functions
 from main import (
@@ -22,22 +57,66 @@ from main import (
     create_reading_summary_agent,
     create_interview_task,
     create_reading_summary_task,
+    select_relevant_passages,
     convert_pdf_to_text,
-    create_excel_from_summary,
     INTERESTS
 )
-from crewai import Crew, Process
+from orchestration import run_crew
 
 app = Flask(__name__)
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+app.config['MAX_CONTENT_LENGTH'] = int(os.environ.get('MAX_UPLOAD_MB', 512)) * 1024 * 1024  # Textbook-sized PDFs stream to disk
 app.config['UPLOAD_FOLDER'] = 'uploads'
 app.config['SECRET_KEY'] = 'your-secret-key-here'
+app.config['BLOB_FOLDER'] = os.path.join(app.config['UPLOAD_FOLDER'], 'blobs')
+app.config['BLOB_MAX_TOTAL_MB'] = int(os.environ.get('BLOB_MAX_TOTAL_MB', 2048))
+app.config['BLOB_MAX_AGE_DAYS'] = float(os.environ.get('BLOB_MAX_AGE_DAYS', 30))
+app.config['BLOB_GC_INTERVAL_SECONDS'] = float(os.environ.get('BLOB_GC_INTERVAL_SECONDS', 600))
+app.config['UPLOAD_CHUNK_MB'] = int(os.environ.get('UPLOAD_CHUNK_MB', 8))
+app.config['UPLOAD_SESSION_TTL_HOURS'] = float(os.environ.get('UPLOAD_SESSION_TTL_HOURS', 24))
+app.config['NEAR_DUP_THRESHOLD'] = float(os.environ.get('NEAR_DUP_THRESHOLD', 0.85))
+app.config['NEAR_DUP_BACKGROUND_REFRESH'] = os.environ.get('NEAR_DUP_BACKGROUND_REFRESH', '').lower() in ('1', 'true', 'yes')
+app.config['BUDGET_HOURLY_USD'] = float(os.environ['BUDGET_HOURLY_USD']) if os.environ.get('BUDGET_HOURLY_USD') else None
+app.config['BUDGET_DAILY_USD'] = float(os.environ['BUDGET_DAILY_USD']) if os.environ.get('BUDGET_DAILY_USD') else None
+app.config['LATENCY_P95_SLO_SECONDS'] = float(os.environ['LATENCY_P95_SLO_SECONDS']) if os.environ.get('LATENCY_P95_SLO_SECONDS') else None
+app.config['TTS_DEGRADED_MAX_CHARS'] = int(os.environ.get('TTS_DEGRADED_MAX_CHARS', 1500))
+app.config['TTS_SPECULATIVE'] = os.environ.get('TTS_SPECULATIVE', '').lower() in ('1', 'true', 'yes')
+app.config['TTS_SPECULATIVE_SECTIONS'] = int(os.environ.get('TTS_SPECULATIVE_SECTIONS', 3))
+app.config['TTS_SPECULATIVE_WAIT_SECONDS'] = float(os.environ.get('TTS_SPECULATIVE_WAIT_SECONDS', 15))
+app.config['LLM_RETRIES'] = int(os.environ.get('LLM_RETRIES', 3))
+app.config['LLM_RETRY_BASE_SECONDS'] = float(os.environ.get('LLM_RETRY_BASE_SECONDS', 1.0))
+app.config['LLM_RETRY_MAX_SECONDS'] = float(os.environ.get('LLM_RETRY_MAX_SECONDS', 20.0))
+app.config['LLM_JOB_RETRIES'] = int(os.environ.get('LLM_JOB_RETRIES', 1))
+app.config['CHECKPOINT_MAX_AGE_HOURS'] = float(os.environ.get('CHECKPOINT_MAX_AGE_HOURS', 24))
 
 # Ensure upload directory exists
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
+# gzip/brotli for JSON and HTML bodies above COMPRESS_MIN_BYTES
+app.after_request(compress_response)
+
+# Retry rate limits and provider hiccups per LLM call instead of failing the whole crew
+llm_retry_policy = install_llm_retry(RetryPolicy(
+    retries=app.config['LLM_RETRIES'],
+    base_seconds=app.config['LLM_RETRY_BASE_SECONDS'],
+    max_seconds=app.config['LLM_RETRY_MAX_SECONDS'],
+    job_retries=app.config['LLM_JOB_RETRIES'],
+))
+
+# Opt-in capture of sanitized request envelopes for benchmarks/replay_traffic.py
+traffic_capture = None
+if os.environ.get('TRAFFIC_CAPTURE', '').lower() in ('1', 'true', 'yes'):
+    traffic_capture = TrafficCapture(
+        os.environ.get('TRAFFIC_CAPTURE_PATH', DEFAULT_CAPTURE_PATH),
+        sample_rate=float(os.environ.get('TRAFFIC_CAPTURE_SAMPLE', 1.0)),
+        max_bytes=int(float(os.environ.get('TRAFFIC_CAPTURE_MAX_MB', 100)) * 1024 * 1024),
+        salt=os.environ.get('TRAFFIC_CAPTURE_SALT') or None,
+    )
+    traffic_capture.install(app)
+    print(f"📼 Capturing request envelopes to {traffic_capture.path}")
+
 # Allowed file extensions
 ALLOWED_EXTENSIONS = {'pdf', 'json'}
+AUDIO_EXTENSIONS = {'wav', 'webm', 'mp3', 'm4a', 'ogg', 'flac'}
 
 def allowed_file(filename):
     """Check if file extension is allowed"""
@@ -90,23 +169,43 @@ class MockLLM:
         
         return AIMessage(content="I'm a mock LLM for testing purposes. Please provide more specific instructions.")
 
-def get_llm_config():
-    """Get LLM configuration with fallback logic"""
+# Stream LLM output from the provider (LiteLLM streaming); the summary JSON is then parsed as it arrives
+LLM_STREAMING = os.environ.get('LLM_STREAMING', '').lower() in ('1', 'true', 'yes')
+
+def get_llm_config(degraded=None):
+    """Get LLM configuration with fallback logic
+    
+    While a spend or latency budget is exceeded (or degraded=True) the cheaper/faster
+    GEMINI_FALLBACK_MODEL / OPENAI_FALLBACK_MODEL is used instead.
+    """
+    if degraded is None:
+        degraded = budget_state().get('degraded', False)
+    
     # First try Gemini
     gemini_model = os.environ.get("GEMINI_MODEL", "gemini-1.5-flash")
+    if degraded:
+        gemini_model = os.environ.get("GEMINI_FALLBACK_MODEL", "gemini-1.5-flash-8b")
     gemini_key = os.environ.get("GEMINI_API_KEY")
     if gemini_key:
         try:
             os.environ["GOOGLE_API_KEY"] = gemini_key
+            if LLM_STREAMING:
+                from crewai import LLM
+                return LLM(model=f"gemini/{gemini_model}", stream=True)
             return f"gemini/{gemini_model}"
         except Exception as e:
             print(f"Gemini failed: {e}")
     
     # If Gemini fails, try OpenAI
     openai_model = os.environ.get("OPENAI_MODEL", "gpt-3.5-turbo")
+    if degraded:
+        openai_model = os.environ.get("OPENAI_FALLBACK_MODEL", "gpt-4o-mini")
     openai_key = os.environ.get("OPENAI_API_KEY")
     if openai_key:
         try:
+            if LLM_STREAMING:
+                from crewai import LLM
+                return LLM(model=openai_model, api_key=openai_key, stream=True)
             from langchain_community.chat_models import ChatOpenAI
             return ChatOpenAI(model_name=openai_model, openai_api_key=openai_key)
         except Exception as e:
@@ -116,12 +215,310 @@ def get_llm_config():
     print("No API keys available - LLM functionality disabled")
     return None
 
+def describe_llm(llm):
+    """Return a printable model identifier for an LLM config"""
+    if llm is None:
+        return None
+    if isinstance(llm, str):
+        return llm
+    return getattr(llm, 'model_name', None) or getattr(llm, 'model', None) or type(llm).__name__
+
+def get_token_usage(result):
+    """Extract (input_tokens, output_tokens) from a crew result if reported"""
+    usage = getattr(result, 'token_usage', None)
+    if usage is None:
+        return None, None
+    return getattr(usage, 'prompt_tokens', None), getattr(usage, 'completion_tokens', None)
+
+def report_prompt_cache(kind, result):
+    """Log and return how much of a crew run's input was served from the provider's prompt cache"""
+    usage = cache_usage(result)
+    if usage['cached_share'] is not None:
+        print(f"🧊 {kind} prompt cache: {usage['cached_input_tokens']}/{usage['input_tokens']} "
+              f"input tokens cached ({usage['cached_share']:.0%})")
+    return usage
+
+def get_user_id():
+    """Identify the caller from the X-User-Id header or user_id parameter"""
+    return (request.headers.get('X-User-Id')
+            or request.args.get('user_id')
+            or request.form.get('user_id')
+            or None)
+
+# CV profile cache (parsed once, reloaded when resources/cv.json changes)
+profile_cache = ProfileCache(os.path.join(os.path.dirname(os.path.abspath(__file__)), "resources", "cv.json"))
+
+# Initialize result store globally
+result_store = None
+
+def get_result_store():
+    """Get or initialize the result store"""
+    global result_store
+    if result_store is None:
+        try:
+            result_store = ResultStore(os.environ.get('RESULTS_DB_PATH'))
+        except Exception as e:
+            print(f"Warning: Could not initialize result store: {e}")
+            return None
+    return result_store
+
+# Initialize blob store globally
+blob_store = None
+
+def get_blob_store():
+    """Get or initialize the content-addressed upload store and its GC thread"""
+    global blob_store
+    if blob_store is None:
+        try:
+            blob_store = BlobStore(
+                app.config['BLOB_FOLDER'],
+                max_total_bytes=app.config['BLOB_MAX_TOTAL_MB'] * 1024 * 1024,
+                max_age_seconds=app.config['BLOB_MAX_AGE_DAYS'] * 24 * 3600,
+            )
+            # Set before the GC starts, so idle upload parts survive even before a session is opened here
+            blob_store.scratch_grace[PART_SUFFIX] = app.config['UPLOAD_SESSION_TTL_HOURS'] * 3600
+            blob_store.start_gc_thread(app.config['BLOB_GC_INTERVAL_SECONDS'])
+        except Exception as e:
+            print(f"Warning: Could not initialize blob store: {e}")
+            return None
+    return blob_store
+
+# Initialize chunked uploads globally
+chunked_uploads = None
+
+def get_chunked_uploads():
+    """Get or initialize resumable upload sessions (assembled inside the blob store)"""
+    global chunked_uploads
+    if chunked_uploads is None:
+        blobs = get_blob_store()
+        if not blobs:
+            return None
+        try:
+            chunked_uploads = ChunkedUploads(
+                blobs,
+                chunk_size=app.config['UPLOAD_CHUNK_MB'] * 1024 * 1024,
+                max_size=app.config['MAX_CONTENT_LENGTH'],
+                session_ttl=app.config['UPLOAD_SESSION_TTL_HOURS'] * 3600,
+            )
+        except Exception as e:
+            print(f"Warning: Could not initialize chunked uploads: {e}")
+            return None
+    return chunked_uploads
+
+# Initialize near-duplicate job description index globally
+near_duplicate_index = None
+
+def get_near_duplicate_index():
+    """Get or initialize the MinHash/LSH index (stored alongside the results)"""
+    global near_duplicate_index
+    if near_duplicate_index is None:
+        store = get_result_store()
+        if not store:
+            return None
+        try:
+            near_duplicate_index = NearDuplicateIndex(store.db_path, threshold=app.config['NEAR_DUP_THRESHOLD'])
+        except Exception as e:
+            print(f"Warning: Could not initialize near-duplicate index: {e}")
+            return None
+    return near_duplicate_index
+
+# Initialize usage ledger and budget policy globally
+usage_ledger = None
+budget_policy = None
+
+def get_usage_ledger():
+    """Get or initialize the per-call cost/latency ledger (stored alongside the results)"""
+    global usage_ledger
+    if usage_ledger is None:
+        store = get_result_store()
+        if not store:
+            return None
+        try:
+            usage_ledger = UsageLedger(store.db_path)
+        except Exception as e:
+            print(f"Warning: Could not initialize usage ledger: {e}")
+            return None
+    return usage_ledger
+
+def get_budget_policy():
+    """Get or initialize the spend/latency budget policy"""
+    global budget_policy
+    if budget_policy is None:
+        ledger = get_usage_ledger()
+        if not ledger:
+            return None
+        budget_policy = BudgetPolicy(
+            ledger,
+            hourly_usd=app.config['BUDGET_HOURLY_USD'],
+            daily_usd=app.config['BUDGET_DAILY_USD'],
+            p95_seconds=app.config['LATENCY_P95_SLO_SECONDS'],
+        )
+    return budget_policy
+
+# Initialize task checkpoints globally
+task_checkpoints = None
+
+def get_task_checkpoints():
+    """Get or initialize the per-task checkpoints of crew jobs (stored alongside the results)"""
+    global task_checkpoints
+    if task_checkpoints is None:
+        store = get_result_store()
+        if not store:
+            return None
+        try:
+            task_checkpoints = TaskCheckpointStore(store.db_path, max_age_seconds=app.config['CHECKPOINT_MAX_AGE_HOURS'] * 3600)
+        except Exception as e:
+            print(f"Warning: Could not initialize task checkpoints: {e}")
+            return None
+    return task_checkpoints
+
+def run_job(kind, input_hash, model_name, agents, tasks):
+    """
+    Run a crew job with per-task checkpoints
+
+    Web jobs are single-task crews, so a retry reruns the task; only a task that had already
+    finished (the failure came after it) is taken from its checkpoint.
+    """
+    return run_crew(tasks, agents=agents, job_key=f"{kind}:{input_hash}:{model_name}",
+                    checkpoints=get_task_checkpoints(), policy=llm_retry_policy)
+
+def finish_job(kind, input_hash, model_name):
+    """Drop a job's checkpoints once its result is stored"""
+    checkpoints = get_task_checkpoints()
+    if checkpoints:
+        try:
+            checkpoints.clear(f"{kind}:{input_hash}:{model_name}")
+        except Exception as e:
+            print(f"Warning: Could not clear task checkpoints: {e}")
+
+def job_error_response(e):
+    """Error response of a failed LLM job: 503 + Retry-After when retrying is likely to help"""
+    if is_transient(e):
+        response = jsonify({
+            'error': f'The AI provider is temporarily unavailable. Please try again shortly. ({e})',
+            'retryable': True
+        })
+        response.headers['Retry-After'] = str(max(1, round(app.config['LLM_RETRY_MAX_SECONDS'])))
+        return response, 503
+    return jsonify({'error': str(e)}), 500
+
+def budget_state():
+    """Current budget decision ({} when no budget is configured or the ledger is unavailable)"""
+    if not any(app.config[key] is not None for key in ('BUDGET_HOURLY_USD', 'BUDGET_DAILY_USD', 'LATENCY_P95_SLO_SECONDS')):
+        return {}
+    policy = get_budget_policy()
+    if not policy:
+        return {}
+    try:
+        return policy.state()
+    except Exception as e:
+        print(f"Warning: Could not evaluate budgets: {e}")
+        return {}
+
+def record_usage(kind, **fields):
+    """Record a provider call in the usage ledger, never letting ledger errors fail the request"""
+    ledger = get_usage_ledger()
+    if not ledger:
+        return None
+    try:
+        return ledger.record(kind, **fields)
+    except Exception as e:
+        print(f"Warning: Could not record {kind} usage: {e}")
+        return None
+
+def save_result(kind, result_text, input_hash, **fields):
+    """Record a result, never letting storage errors fail the request"""
+    store = get_result_store()
+    if not store:
+        return None
+    try:
+        return store.record_result(kind, result_text, input_hash, **fields)
+    except Exception as e:
+        print(f"Warning: Could not store {kind} result: {e}")
+        return None
+
+
+# Minified, fingerprinted CSS/JS (rebuilt on change in development; built once per deploy otherwise)
+asset_manifest = AssetManifest(
+    auto_build=os.environ.get('STATIC_AUTO_BUILD', '1' if os.environ.get('FLASK_ENV') == 'development' else '').lower() in ('1', 'true', 'yes')
+)
+
+@app.context_processor
+def inject_asset_url():
+    return {'asset_url': asset_url}
+
+def asset_url(filename):
+    """URL of the fingerprinted build of a static file (its plain static URL if it has no build)"""
+    built = asset_manifest.resolve(filename)
+    if built:
+        return url_for('static_asset', filename=built[len(DIST_DIRNAME) + 1:])
+    return url_for('static', filename=filename)
+
+@app.route('/assets/<path:filename>')
+def static_asset(filename):
+    """Serve a fingerprinted asset: immutable, precompressed, the name's hash as ETag"""
+    file_path = safe_join(asset_manifest.dist_dir, filename)
+    if not file_path or not os.path.isfile(file_path):
+        return jsonify({'error': 'File not found'}), 404
+    return send_immutable_file(file_path, filename.rsplit('.', 2)[-2], as_attachment=False)
 
 @app.route('/')
 def index():
     """Main page"""
     return render_template('index.html')
 
+def generate_interview(llm, cv_text, job_description, input_hash, scope, user_id, degraded=False):
+    """Run the interviewer crew, store the prep and index its job description"""
+    # Create agent and task (JSON CVs are rendered compactly for the prompt)
+    interviewer = create_interviewer_agent(llm=llm)
+    task = create_interview_task(interviewer, profile_cache.prompt_text_for(cv_text), job_description)
+    model_name = describe_llm(llm)
+    
+    started = time.perf_counter()
+    run = run_job('interview', input_hash, model_name, [interviewer], [task])
+    result = run['result']
+    llm_ms = (time.perf_counter() - started) * 1000
+    
+    input_tokens, output_tokens = get_token_usage(result)
+    prompt_cache = report_prompt_cache('interview', result)
+    result_id = save_result(
+        'interview', run['output'], input_hash,
+        user_id=user_id,
+        model=model_name,
+        input_tokens=input_tokens,
+        output_tokens=output_tokens,
+        timings={'llm_ms': llm_ms, 'total_ms': llm_ms},
+        metadata={'prompt_cache': prompt_cache, 'degraded': degraded, 'attempts': run['attempts'], 'resumed': run['resumed']},
+    )
+    if result_id:
+        finish_job('interview', input_hash, model_name)
+    record_usage(
+        'interview',
+        model=model_name,
+        user_id=user_id,
+        input_tokens=input_tokens,
+        cached_input_tokens=prompt_cache['cached_input_tokens'],
+        output_tokens=output_tokens,
+        latency_ms=llm_ms,
+        timings={'llm_ms': llm_ms},
+        degraded=degraded,
+    )
+    
+    near_duplicates = get_near_duplicate_index()
+    if result_id and near_duplicates:
+        try:
+            near_duplicates.add(result_id, scope, job_description)
+        except Exception as e:
+            print(f"Warning: Could not index job description: {e}")
+    return run['output'], result_id
+
+def refresh_interview(*args):
+    """Background regeneration for a near-duplicate hit; the next exact request gets the fresh prep"""
+    try:
+        generate_interview(*args)
+    except Exception as e:
+        print(f"Warning: Background interview refresh failed: {e}")
+
 @app.route('/api/interview', methods=['POST'])
 def interview_preparation():
     """API endpoint for interview preparation"""
@@ -133,20 +530,24 @@ def interview_preparation():
         if not cv_text or not job_description:
             return jsonify({'error': 'CV text and job description are required'}), 400
         
-        # Configure LLM
-        llm = get_llm_config()
+        # Configure LLM (a cheaper/faster model while a budget is exceeded)
+        degraded = budget_state().get('degraded', False)
+        llm = get_llm_config(degraded)
+        model_name = describe_llm(llm)
+        input_hash = hash_inputs('interview', cv_text, job_description)
         
-        # Create agent and task
-        interviewer = create_interviewer_agent(llm=llm)
-        task = create_interview_task(interviewer, cv_text, job_description)
-        
-        # Create and run crew
-        crew = Crew(
-            agents=[interviewer],
-            tasks=[task],
-            process=Process.sequential,
-            verbose=False
-        )
+        # Reuse a stored result for identical inputs unless a refresh is requested
+        store = get_result_store()
+        if store and llm is not None and not data.get('refresh'):
+            cached = store.find_result('interview', input_hash, model_name)
+            if cached:
+                return jsonify({
+                    'success': True,
+                    'result': cached['result'],
+                    'result_id': cached['id'],
+                    'cached': True,
+                    'speech_sections': prepare_speech(cached['result'], data)
+                })
         
         # Check if LLM is available
         if llm is None:
@@ -155,39 +556,62 @@ def interview_preparation():
                 'error': 'LLM service not available. Please set OPENAI_API_KEY or GEMINI_API_KEY environment variable.'
             }), 500
         
-        # Run crew with LLM
-        result = crew.kickoff()
+        # Reuse the prep of a near-identical posting (whitespace, reordered bullets, changed dates)
+        scope = hash_inputs('interview', cv_text, model_name)
+        near_duplicates = get_near_duplicate_index()
+        if store and near_duplicates and not data.get('refresh'):
+            try:
+                match = near_duplicates.find(scope, job_description)
+                previous = store.get_result(match[0]) if match else None
+            except Exception as e:
+                print(f"Warning: Near-duplicate lookup failed: {e}")
+                previous = None
+            if previous:
+                refreshing = bool(data.get('refresh_in_background', app.config['NEAR_DUP_BACKGROUND_REFRESH']))
+                if refreshing:
+                    io_executor.submit(refresh_interview, llm, cv_text, job_description, input_hash, scope, get_user_id(), degraded)
+                return jsonify({
+                    'success': True,
+                    'result': previous['result'],
+                    'result_id': previous['id'],
+                    'cached': True,
+                    'near_duplicate': True,
+                    'similarity': round(match[1], 3),
+                    'refreshing': refreshing,
+                    'speech_sections': prepare_speech(previous['result'], data)
+                })
+        
+        result_text, result_id = generate_interview(llm, cv_text, job_description, input_hash, scope, get_user_id(), degraded)
         
         return jsonify({
             'success': True,
-            'result': str(result)
+            'result': result_text,
+            'result_id': result_id,
+            'degraded': degraded,
+            'speech_sections': prepare_speech(result_text, data)
         })
         
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return job_error_response(e)
 
-@app.route('/api/summarize', methods=['POST'])
-def pdf_summarization():
-    """API endpoint for PDF summarization"""
+def summarize_pdf_blob(blobs, pdf_hash, filename, options):
+    """Summarize a PDF already in the blob store
+    
+    options is the request form (or finalize JSON) with custom_interests, page_range and refresh.
+    """
+    # Lets the traffic capture fingerprint the document (salted) so replays repeat identical uploads
+    g.upload_hash = pdf_hash
+    temp_files = TempFileManager(prefix="summarize_")
     try:
-        # Check if file was uploaded
-        if 'pdf_file' not in request.files:
-            return jsonify({'error': 'No PDF file uploaded'}), 400
-        
-        file = request.files['pdf_file']
-        if file.filename == '':
-            return jsonify({'error': 'No file selected'}), 400
-        
-        if not allowed_file(file.filename):
-            return jsonify({'error': 'Only PDF files are allowed'}), 400
-        
-        # Save uploaded file
-        filename = secure_filename(file.filename)
-        pdf_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(pdf_path)
+        pdf_path = blobs.path_for(pdf_hash)
+        if not pdf_path:
+            return jsonify({'error': 'Uploaded PDF is no longer available'}), 404
         
         # Get all interests from frontend (includes both default and custom)
-        all_interests_str = request.form.get('custom_interests', '').strip()
+        all_interests_str = options.get('custom_interests') or ''
+        if isinstance(all_interests_str, list):
+            all_interests_str = ','.join(all_interests_str)
+        all_interests_str = all_interests_str.strip()
         
         # Parse interests into list
         if all_interests_str:
@@ -198,27 +622,49 @@ def pdf_summarization():
             interests_for_task = INTERESTS.copy()
             print(f"📋 Using default interests: {interests_for_task}")
         
-        # Configure LLM
-        llm = get_llm_config()
+        # Optional page range, e.g. "1-40" for long books
+        page_range = str(options.get('page_range') or '').strip() or page_range_from_env()
+        if page_range:
+            try:
+                parse_page_range(page_range)
+            except ValueError:
+                return jsonify({'error': f'Invalid page range: {page_range}'}), 400
         
-        # Create agent and task with the interests list
-        # Convert list to string for agent backstory
-        interests_str = ", ".join(interests_for_task)
-        reader = create_reading_summary_agent(llm=llm, custom_interests=interests_str)
+        # Configure LLM (a cheaper/faster model while a budget is exceeded)
+        degraded = budget_state().get('degraded', False)
+        llm = get_llm_config(degraded)
+        model_name = describe_llm(llm)
+        input_hash = hash_inputs('summary', pdf_hash, interests_for_task, *([page_range] if page_range else []))
         
-        # Create temporary Excel path
-        excel_filename = filename.replace('.pdf', '_summary.xlsx')
-        excel_path = os.path.join(app.config['UPLOAD_FOLDER'], excel_filename)
+        # Reuse a stored summary of the same PDF and interests unless a refresh is requested
+        store = get_result_store()
+        if store and llm is not None and not options.get('refresh'):
+            cached = store.find_result('summary', input_hash, model_name)
+            if cached:
+                return jsonify({
+                    'success': True,
+                    'result': cached['result'],
+                    'result_id': cached['id'],
+                    'cached': True,
+                    **summary_downloads(cached['id'], cached['metadata'], blobs)
+                })
         
-        task = create_reading_summary_task(reader, pdf_path, excel_path, interests_for_task)
+        started = time.perf_counter()
         
-        # Create and run crew
-        crew = Crew(
-            agents=[reader],
-            tasks=[task],
-            process=Process.sequential,
-            verbose=False
-        )
+        # Create agent (the interests go at the end of the task prompt, keeping its prefix cacheable)
+        reader = create_reading_summary_agent(llm=llm)
+        
+        # PDF text extraction and passage ranking are CPU-bound: run them on the bounded CPU pool
+        try:
+            passages = cpu_bound(select_relevant_passages, pdf_path, interests_for_task, page_range)
+        except Exception as e:
+            print(f"Warning: Could not rank passages: {e}")
+            passages = None
+        relevance = passages.report() if passages is not None else None
+        if relevance:
+            print(f"🔎 Relevance pre-filter: {relevance['selected_tokens']}/{relevance['total_tokens']} tokens "
+                  f"from {len(relevance['passages'])}/{relevance['total_passages']} passages")
+        task = cpu_bound(create_reading_summary_task, reader, pdf_path, None, interests_for_task, page_range, temp_files, passages)
         
         # Check if LLM is available
         if llm is None:
@@ -227,67 +673,428 @@ def pdf_summarization():
                 'error': 'LLM service not available. Please set OPENAI_API_KEY or GEMINI_API_KEY environment variable.'
             }), 500
         
-        # Run crew with LLM
-        result = crew.kickoff()
+        # Run crew with LLM (a single task: a retried request runs it again)
+        prepared = time.perf_counter()
+        with watch_summary_stream(task) as streamed:
+            run = run_job('summary', input_hash, model_name, [reader], [task])
+        result, result_text = run['result'], run['output']
+        generated = time.perf_counter()
         
-        # Create Excel file from the agent's result
-        excel_created = create_excel_from_summary(str(result), excel_path, filename)
+        # Keep the structured summary; Excel/CSV/JSON are written on first download.
+        # If the final answer has no valid object but the streamed one closed cleanly (LLM_STREAMING),
+        # that one is kept; otherwise a malformed answer is repaired at the first download
+        summary, _ = extract_summary(result_text)
+        if summary is None and streamed.complete:
+            summary = streamed.result
+        finished = time.perf_counter()
         
-        if excel_created and os.path.exists(excel_path):
-            return jsonify({
-                'success': True,
-                'result': str(result),
-                'excel_file': excel_filename
-            })
+        input_tokens, output_tokens = get_token_usage(result)
+        prompt_cache = report_prompt_cache('summary', result)
+        timings = {
+            'prepare_ms': (prepared - started) * 1000,
+            'llm_ms': (generated - prepared) * 1000,
+            'parse_ms': (finished - generated) * 1000,
+            'total_ms': (finished - started) * 1000,
+        }
+        result_id = save_result(
+            'summary', result_text, input_hash,
+            user_id=get_user_id(),
+            pdf_hash=pdf_hash,
+            model=model_name,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            timings=timings,
+            metadata={
+                'filename': filename,
+                'interests': interests_for_task,
+                'summary': summary,
+                'exports': {},
+                'prompt_cache': prompt_cache,
+                'relevance': relevance,
+                'degraded': degraded,
+                'attempts': run['attempts'],
+                'resumed': run['resumed'],
+            },
+        )
+        record_usage(
+            'summary',
+            model=model_name,
+            user_id=get_user_id(),
+            input_tokens=input_tokens,
+            cached_input_tokens=prompt_cache['cached_input_tokens'],
+            output_tokens=output_tokens,
+            latency_ms=timings['total_ms'],
+            timings=timings,
+            degraded=degraded,
+        )
+        
+        # Keep the upload alive for as long as the stored result refers to it
+        if result_id:
+            blobs.add_ref(pdf_hash, f"result:{result_id}")
+            finish_job('summary', input_hash, model_name)
+        
+        return jsonify({
+            'success': True,
+            'result': result_text,
+            'result_id': result_id,
+            'relevance': relevance,
+            'degraded': degraded,
+            **summary_downloads(result_id, {'summary': summary}, blobs)
+        })
+        
+    finally:
+        temp_files.cleanup()
+
+@app.route('/api/summarize', methods=['POST'])
+def pdf_summarization():
+    """API endpoint for PDF summarization"""
+    try:
+        # Check if file was uploaded
+        if 'pdf_file' not in request.files:
+            return jsonify({'error': 'No PDF file uploaded'}), 400
+        
+        file = request.files['pdf_file']
+        if file.filename == '':
+            return jsonify({'error': 'No file selected'}), 400
+        
+        if not allowed_file(file.filename):
+            return jsonify({'error': 'Only PDF files are allowed'}), 400
+        
+        # Save uploaded file by content hash so identical uploads are stored once
+        blobs = get_blob_store()
+        if not blobs:
+            return jsonify({'error': 'Upload storage not available'}), 500
+        filename = secure_filename(file.filename)
+        pdf_hash = blobs.put_stream(file.stream, ext='.pdf')
+        
+        return summarize_pdf_blob(blobs, pdf_hash, filename, request.form)
+        
+    except Exception as e:
+        return job_error_response(e)
+
+@app.route('/api/uploads', methods=['POST'])
+def create_upload():
+    """Start a resumable chunked upload"""
+    data = request.get_json(silent=True) or {}
+    purpose = data.get('purpose', 'summarize')
+    filename = secure_filename(data.get('filename') or '')
+    extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    
+    if purpose not in ('summarize', 'transcribe'):
+        return jsonify({'error': 'purpose must be "summarize" or "transcribe"'}), 400
+    if purpose == 'summarize' and extension != 'pdf':
+        return jsonify({'error': 'Only PDF files are allowed'}), 400
+    if purpose == 'transcribe' and extension not in AUDIO_EXTENSIONS:
+        return jsonify({'error': f'Audio must be one of: {", ".join(sorted(AUDIO_EXTENSIONS))}'}), 400
+    
+    uploads = get_chunked_uploads()
+    if not uploads:
+        return jsonify({'error': 'Upload storage not available'}), 500
+    try:
+        session = uploads.create(filename, int(data.get('size') or 0), ext=f'.{extension}',
+                                 sha256=data.get('sha256'), purpose=purpose)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'size must be an integer'}), 400
+    except UploadError as e:
+        return jsonify({'error': str(e)}), e.status
+    return jsonify(session), 201
+
+@app.route('/api/uploads/<upload_id>', methods=['GET', 'DELETE'])
+def upload_status(upload_id):
+    """Report which chunks are still missing (GET) or abandon the upload (DELETE)"""
+    uploads = get_chunked_uploads()
+    if not uploads:
+        return jsonify({'error': 'Upload storage not available'}), 500
+    try:
+        if request.method == 'DELETE':
+            uploads.abort(upload_id)
+            return jsonify({'success': True})
+        return jsonify(uploads.status(upload_id))
+    except UploadError as e:
+        return jsonify({'error': str(e)}), e.status
+
+@app.route('/api/uploads/<upload_id>/chunks/<int:index>', methods=['PUT'])
+def upload_chunk(upload_id, index):
+    """Store one chunk; the body is the raw bytes and X-Chunk-Sha256 their checksum"""
+    uploads = get_chunked_uploads()
+    if not uploads:
+        return jsonify({'error': 'Upload storage not available'}), 500
+    try:
+        status = uploads.write_chunk(upload_id, index, request.get_data(cache=False),
+                                     request.headers.get('X-Chunk-Sha256'))
+    except UploadError as e:
+        return jsonify({'error': str(e)}), e.status
+    return jsonify({'received': index, 'missing': status['missing']})
+
+@app.route('/api/uploads/<upload_id>/finalize', methods=['POST'])
+def finalize_upload(upload_id):
+    """Assemble the upload into the blob store and run the summary or transcription"""
+    uploads = get_chunked_uploads()
+    if not uploads:
+        return jsonify({'error': 'Upload storage not available'}), 500
+    try:
+        stored = uploads.finalize(upload_id)
+    except UploadError as e:
+        return jsonify({'error': str(e)}), e.status
+    
+    options = request.get_json(silent=True) or {}
+    try:
+        if stored['purpose'] == 'transcribe':
+            whisper = get_whisper_handler()
+            if not whisper:
+                response = jsonify({'error': 'Speech-to-text service not available'}), 500
+            else:
+                response = transcribe_path(whisper, uploads.blobs.path_for(stored['hash']))
         else:
-            return jsonify({
-                'success': True,
-                'result': str(result),
-                'excel_file': None,
-                'message': 'Excel file could not be created from agent result'
-            })
+            response = summarize_pdf_blob(uploads.blobs, stored['hash'], stored['filename'], options)
+    except Exception as e:
+        response = job_error_response(e)
+    
+    # After a retryable failure the same finalize can be repeated without uploading again;
+    # otherwise the upload id is done and the blob lives on through the result's own reference
+    status = response[1] if isinstance(response, tuple) else response.status_code
+    if status != 503:
+        uploads.release(upload_id)
+    return response
+
+def summary_downloads(result_id, metadata, blobs):
+    """Download fields of a summary response: the lazily exported formats (or a stored legacy workbook)"""
+    if result_id and 'summary' in metadata:
+        return {
+            'excel_file': f"summary/{result_id}",
+            'exports': {fmt: url_for('download_summary', result_id=result_id, format=fmt) for fmt in EXPORT_FORMATS},
+        }
+    legacy_excel = metadata.get('excel_file')
+    if legacy_excel and blobs.exists(legacy_excel.split('/', 1)[0]):
+        return {'excel_file': legacy_excel, 'exports': {'xlsx': url_for('download_file', filename=legacy_excel)}}
+    return {'excel_file': None, 'exports': {}, 'message': 'Summary downloads are not available for this result'}
+
+# One export per result at a time, so concurrent first downloads write each format once
+export_locks = {}  # result id -> [lock, requests using it]
+export_locks_guard = threading.Lock()
+
+def materialize_export(store, blobs, record, fmt):
+    """Write a stored summary in `fmt` into the blob store and remember it; returns the blob hash"""
+    result_id = record['id']
+    metadata = record['metadata']
+    summary = metadata.get('summary')
+    if summary is None:
+        # The answer was not valid summary JSON: one targeted repair call, made only now that it's needed
+        llm = get_llm_config()
+        _, errors = extract_summary(record['result'])
+        summary = repair_summary(record['result'], errors, llm) if llm is not None else None
+        if summary is None:
+            return None
+        store.update_metadata(result_id, summary=summary)
+    
+    path = blobs.temp_path(EXPORT_FORMATS[fmt][0])
+    try:
+        cpu_bound(export_summary, summary, path, metadata.get('filename') or 'reading.pdf', fmt)
+    except Exception:
+        os.unlink(path)
+        raise
+    blob_hash = blobs.put_file(path)
+    blobs.add_ref(blob_hash, f"result:{result_id}")
+    exports = dict((store.get_result(result_id)['metadata'].get('exports') or {}), **{fmt: blob_hash})
+    store.update_metadata(result_id, exports=exports)
+    return blob_hash
+
+@app.route('/api/download/summary/<int:result_id>')
+def download_summary(result_id):
+    """Download a stored summary as ?format=xlsx (default), csv or json, written on first download"""
+    try:
+        fmt = request.args.get('format', 'xlsx').lower()
+        if fmt not in EXPORT_FORMATS:
+            return jsonify({'error': f"format must be one of: {', '.join(EXPORT_FORMATS)}"}), 400
+        store = get_result_store()
+        blobs = get_blob_store()
+        if not store or not blobs:
+            return jsonify({'error': 'Result store not available'}), 500
+        
+        record = store.get_result(result_id)
+        if record is None or record['kind'] != 'summary' or 'summary' not in record['metadata']:
+            return jsonify({'error': 'Summary not found'}), 404
+        
+        blob_hash = (record['metadata'].get('exports') or {}).get(fmt)
+        if not blob_hash or not blobs.exists(blob_hash):
+            with export_locks_guard:
+                entry = export_locks.setdefault(result_id, [threading.Lock(), 0])
+                entry[1] += 1
+            try:
+                with entry[0]:
+                    record = store.get_result(result_id)
+                    blob_hash = (record['metadata'].get('exports') or {}).get(fmt)
+                    if not blob_hash or not blobs.exists(blob_hash):
+                        blob_hash = materialize_export(store, blobs, record, fmt)
+            finally:
+                with export_locks_guard:
+                    entry[1] -= 1
+                    if not entry[1]:
+                        export_locks.pop(result_id, None)
+            if blob_hash is None:
+                return jsonify({'error': 'The summary could not be read from the agent result'}), 422
         
+        extension, mimetype = EXPORT_FORMATS[fmt]
+        stem = (record['metadata'].get('filename') or 'reading.pdf').rsplit('.', 1)[0]
+        response = send_immutable_file(blobs.path_for(blob_hash), blob_hash,
+                                       download_name=f"{stem}_summary{extension}", mimetype=mimetype)
+        # Not a content-addressed URL: revalidate (a cheap 304) instead of caching forever
+        response.cache_control.immutable = False
+        response.cache_control.public = False
+        response.cache_control.max_age = None
+        response.cache_control.no_cache = True
+        response.cache_control.private = True
+        return response
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/download/<filename>')
+@app.route('/api/download/<path:filename>')
 def download_file(filename):
-    """Download generated files"""
+    """Download generated files (`<content hash>/<download name>` or a legacy upload name)"""
     try:
-        file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        if os.path.exists(file_path):
+        blob_hash, _, download_name = filename.partition('/')
+        if is_blob_hash(blob_hash):
+            # Content-addressed: the hash is a strong ETag and the content never changes
+            blobs = get_blob_store()
+            file_path = blobs.path_for(blob_hash) if blobs else None
+            if not file_path:
+                return jsonify({'error': 'File not found'}), 404
+            download_name = secure_filename(download_name) or os.path.basename(file_path)
+            return send_immutable_file(file_path, blob_hash, download_name=download_name)
+        
+        file_path = safe_join(app.config['UPLOAD_FOLDER'], filename)
+        if file_path and os.path.isfile(file_path):
             return send_file(file_path, as_attachment=True)
         else:
             return jsonify({'error': 'File not found'}), 404
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/results')
+def list_results():
+    """List stored results filtered by kind, user, PDF hash and date range"""
+    try:
+        store = get_result_store()
+        if not store:
+            return jsonify({'error': 'Result store not available'}), 500
+        
+        results = store.list_results(
+            kind=request.args.get('kind'),
+            user_id=request.args.get('user_id') or request.headers.get('X-User-Id'),
+            pdf_hash=request.args.get('pdf_hash'),
+            since=parse_timestamp(request.args.get('since')),
+            until=parse_timestamp(request.args.get('until')),
+            limit=request.args.get('limit', 50, type=int),
+            offset=request.args.get('offset', 0, type=int),
+        )
+        return jsonify({'success': True, 'results': results, 'count': len(results)})
+    except ValueError as e:
+        return jsonify({'error': f'Invalid filter: {e}'}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/results/<int:result_id>')
+def get_result(result_id):
+    """Fetch a stored result by id"""
+    try:
+        store = get_result_store()
+        if not store:
+            return jsonify({'error': 'Result store not available'}), 500
+        
+        record = store.get_result(result_id)
+        if record is None:
+            return jsonify({'error': 'Result not found'}), 404
+        return jsonify({'success': True, 'result': record})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/usage')
+def usage_summary():
+    """Aggregate calls, tokens, estimated cost and latency percentiles from the usage ledger"""
+    try:
+        ledger = get_usage_ledger()
+        if not ledger:
+            return jsonify({'error': 'Usage ledger not available'}), 500
+        
+        group_by = request.args.get('group_by', 'kind')
+        if group_by not in GROUP_COLUMNS:
+            return jsonify({'error': f"group_by must be one of: {', '.join(GROUP_COLUMNS)}"}), 400
+        since = parse_timestamp(request.args.get('since'))
+        until = parse_timestamp(request.args.get('until'))
+        if since is None and until is None:
+            since = time.time() - 86400
+        groups = ledger.summary(since=since, until=until, group_by=group_by)
+        return jsonify({
+            'success': True,
+            'group_by': group_by,
+            'since': since,
+            'until': until,
+            'groups': groups,
+            'total_cost_usd': round(sum(group['cost_usd'] for group in groups), 6),
+            'total_calls': sum(group['calls'] for group in groups)
+        })
+    except ValueError as e:
+        return jsonify({'error': f'Invalid filter: {e}'}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/usage/budget')
+def usage_budget():
+    """Current spend and p95 against the configured budgets, and whether requests are degraded"""
+    try:
+        policy = get_budget_policy()
+        if not policy:
+            return jsonify({'error': 'Usage ledger not available'}), 500
+        return jsonify({'success': True, **policy.state(force=True), 'llm_retry': llm_retry_policy.status()})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/cv')
 def get_cv():
-    """Get CV data from cv.json file"""
+    """Get CV data from cv.json file (cached, with ETag revalidation)"""
     try:
-        cv_path = os.path.join(os.path.dirname(__file__), "resources", "cv.json")
-        with open(cv_path, "r", encoding="utf-8") as f:
-            cv_data = json.load(f)
-        return jsonify(cv_data)
+        snapshot = profile_cache.get()
+        response = Response(snapshot.json_bytes, mimetype='application/json')
+        response.set_etag(snapshot.etag)
+        response.cache_control.no_cache = True
+        return response.make_conditional(request)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/health')
 def health_check():
-    """Health check endpoint"""
+    """Health check endpoint (liveness: the process is serving requests)"""
     return jsonify({'status': 'healthy', 'message': 'AI Agent Assistant is running'})
 
+@app.route('/api/ready')
+def readiness_check():
+    """Readiness: 200 once every required subsystem has warmed up, 503 until then"""
+    warmup.start()
+    status = warmup.status()
+    return jsonify(status), 200 if status['ready'] else 503
+
 # Initialize voice handlers globally
 whisper_handler = None
 tts_handler = None
 
 def get_whisper_handler():
-    """Get or initialize Whisper handler"""
+    """Get or initialize Whisper handler (WHISPER_MODEL=adaptive picks a tier per clip)"""
     global whisper_handler
     if whisper_handler is None:
         try:
-            whisper_handler = SpeechToTextHandler(model_size="base")
+            model = os.environ.get('WHISPER_MODEL', 'base')
+            if model == 'adaptive':
+                # Real-time factors measured by benchmarks/bench_whisper_tiers.py --output on this hardware
+                rtf_file = os.environ.get('WHISPER_RTF_FILE')
+                whisper_handler = AdaptiveWhisper(
+                    tiers=[tier.strip() for tier in os.environ.get('WHISPER_TIERS', 'tiny,base,small').split(',') if tier.strip()],
+                    latency_slo=float(os.environ.get('WHISPER_LATENCY_SLO_SECONDS', 3.0)),
+                    workers=CPU_WORKERS,
+                    queue_depth=cpu_queue_depth,
+                    real_time_factors=load_real_time_factors(rtf_file) if rtf_file else None,
+                )
+            else:
+                whisper_handler = SpeechToTextHandler(model_size=model)
         except Exception as e:
             print(f"Warning: Could not initialize Whisper: {e}")
             return None
@@ -304,6 +1111,75 @@ def get_tts_handler():
             return None
     return tts_handler
 
+# Initialize speech cache and speculative TTS globally
+speech_cache = None
+speculative_tts = None
+
+def get_speech_cache():
+    """Get or initialize the cache of synthesized speech (audio kept in the blob store)"""
+    global speech_cache
+    if speech_cache is None:
+        store = get_result_store()
+        blobs = get_blob_store()
+        if not store or not blobs:
+            return None
+        try:
+            speech_cache = SpeechCache(store.db_path, blobs)
+        except Exception as e:
+            print(f"Warning: Could not initialize speech cache: {e}")
+            return None
+    return speech_cache
+
+def speculation_should_yield():
+    """Speculative synthesis gives way while CPU work is queueing or a budget is exceeded"""
+    return cpu_queue_depth() >= CPU_WORKERS or budget_state().get('degraded', False)
+
+def get_speculative_tts():
+    """Get or initialize the speculative synthesizer (None unless TTS_SPECULATIVE is set)"""
+    global speculative_tts
+    if speculative_tts is None and app.config['TTS_SPECULATIVE']:
+        cache = get_speech_cache()
+        if not cache:
+            return None
+        speculative_tts = SpeculativeSynthesizer(
+            get_tts_handler,
+            cache,
+            sections=app.config['TTS_SPECULATIVE_SECTIONS'],
+            should_yield=speculation_should_yield,
+            on_synthesized=lambda usage: record_usage(
+                'tts_speculative',
+                model=usage['model'],
+                characters=usage['characters'],
+                latency_ms=usage['latency_ms'],
+                timings={'tts_ms': usage['latency_ms']},
+            ),
+        )
+    return speculative_tts
+
+def prepare_speech(result_text, data):
+    """Split an interview prep into speech sections and pre-synthesize the first ones if enabled"""
+    try:
+        sections = speech_sections(result_text)
+    except Exception as e:
+        print(f"Warning: Could not split result into speech sections: {e}")
+        return None
+    speculative = get_speculative_tts()
+    if speculative and sections:
+        speculative.schedule(sections, data.get('voice') or 'nova')
+    return sections
+
+def transcribe_path(whisper, audio_path):
+    """Transcribe an audio file on disk and build the API response"""
+    print("Starting transcription...")
+    transcribed_text = cpu_bound(whisper.transcribe_audio_file, audio_path)
+    print(f"Transcription completed: {len(transcribed_text)} characters")
+    
+    return jsonify({
+        'success': True,
+        'text': transcribed_text,
+        'message': 'Audio transcribed successfully'
+    })
+
 @app.route('/api/transcribe', methods=['POST'])
 def transcribe_audio():
     """Transcribe audio file to text using Whisper"""
@@ -350,16 +1226,7 @@ def transcribe_audio():
             return jsonify({'error': 'Audio file is empty'}), 400
         
         try:
-            # Transcribe audio
-            print("Starting transcription...")
-            transcribed_text = whisper.transcribe_audio_file(temp_path)
-            print(f"Transcription completed: {len(transcribed_text)} characters")
-            
-            return jsonify({
-                'success': True,
-                'text': transcribed_text,
-                'message': 'Audio transcribed successfully'
-            })
+            return transcribe_path(whisper, temp_path)
         
         finally:
             # Clean up temporary file
@@ -373,6 +1240,55 @@ def transcribe_audio():
         traceback.print_exc()
         return jsonify({'error': str(e)}), 500
 
+# Live streaming transcription sessions (in-process; run a single worker process or sticky sessions)
+stt_streams = StreamingSessions()
+
+@app.route('/api/stt/stream', methods=['POST'])
+def start_stt_stream():
+    """Open a streaming transcription; audio is then POSTed in small PCM chunks"""
+    whisper = get_whisper_handler()
+    if not whisper or not whisper.is_available():
+        return jsonify({'error': 'Speech-to-text service not available'}), 503
+    stream_id = stt_streams.create(StreamingTranscriber(whisper.transcribe_samples))
+    return jsonify({'stream_id': stream_id, 'sample_rate': SAMPLE_RATE, 'format': 'pcm_s16le'}), 201
+
+@app.route('/api/stt/stream/<stream_id>', methods=['POST'])
+def feed_stt_stream(stream_id):
+    """Feed 16 kHz mono 16-bit PCM; returns the current partial and any newly final text"""
+    entry = stt_streams.get(stream_id)
+    if entry is None:
+        return jsonify({'error': 'Unknown or expired stream'}), 404
+    transcriber, lock = entry
+    data = request.get_data(cache=False)
+    if len(data) % 2:
+        return jsonify({'error': 'Audio must be 16-bit PCM'}), 400
+    try:
+        # Chunks of one stream are decoded in order; Whisper runs on the CPU pool
+        with lock:
+            update = cpu_bound(transcriber.feed_pcm16, data)
+        return jsonify({'partial': update['partial'], 'final': update['final'], 'text': transcriber.text})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/stt/stream/<stream_id>/finish', methods=['POST'])
+def finish_stt_stream(stream_id):
+    """Decode the remaining audio and close the stream"""
+    entry = stt_streams.get(stream_id)
+    if entry is None:
+        return jsonify({'error': 'Unknown or expired stream'}), 404
+    transcriber, lock = entry
+    try:
+        with lock:
+            data = request.get_data(cache=False)
+            if data:
+                cpu_bound(transcriber.feed_pcm16, data[:len(data) - len(data) % 2])
+            result = cpu_bound(transcriber.finish)
+        return jsonify({'success': True, 'final': result['final'], 'text': result['text']})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        stt_streams.close(stream_id)
+
 @app.route('/api/voice-status')
 def voice_status():
     """Check if voice services are available"""
@@ -382,9 +1298,11 @@ def voice_status():
         
         return jsonify({
             'whisper_available': whisper is not None,
+            'streaming_stt_available': bool(whisper and whisper.is_available()),
             'tts_available': tts is not None,
             'whisper_model': whisper.get_model_info() if whisper else None,
-            'tts_voices': tts.get_voice_info() if tts else None
+            'tts_voices': tts.get_voice_info() if tts else None,
+            'speculative_tts': speculative_tts.status() if speculative_tts else None
         })
     except Exception as e:
         return jsonify({
@@ -393,9 +1311,38 @@ def voice_status():
             'error': str(e)
         })
 
+def wants_binary_audio(data):
+    """Binary audio/mpeg instead of base64 JSON (?format=mp3, "format": "mp3" or Accept: audio/mpeg)"""
+    requested = request.args.get('format') or data.get('format')
+    if requested:
+        return requested in ('mp3', 'binary')
+    accept = request.accept_mimetypes
+    # Only an explicit audio/mpeg counts: a plain */* keeps the JSON response older clients expect
+    return 'audio/mpeg' in accept.values() and accept['audio/mpeg'] >= accept['application/json']
+
+def audio_response(audio_data, voice, text, data, cached=False, degraded=False):
+    """MP3 bytes for clients asking for audio/mpeg, base64 inside JSON otherwise"""
+    if wants_binary_audio(data):
+        # Playable directly as an object URL, a third smaller than base64 and no decode on the client
+        return Response(audio_data, mimetype='audio/mpeg', headers={
+            'X-Voice-Used': voice,
+            'X-Text-Length': str(len(text)),
+            'X-Degraded': str(degraded).lower(),
+            'X-TTS-Cache': 'hit' if cached else 'miss',
+            'Cache-Control': 'no-store',
+        })
+    return jsonify({
+        'success': True,
+        'audio_data': base64.b64encode(audio_data).decode('utf-8'),
+        'voice_used': voice,
+        'text_length': len(text),
+        'degraded': degraded,
+        'cached': cached
+    })
+
 @app.route('/api/text-to-speech', methods=['POST'])
 def text_to_speech():
-    """Convert text to speech using OpenAI TTS"""
+    """Convert text to speech using OpenAI TTS (MP3 bytes, or base64 inside JSON)"""
     try:
         data = request.get_json()
         if not data or 'text' not in data:
@@ -407,22 +1354,55 @@ def text_to_speech():
         if not text:
             return jsonify({'error': 'Text cannot be empty'}), 400
         
+        # Serve audio synthesized ahead of time (or for an earlier request with the same text)
+        cache = get_speech_cache()
+        speculative = get_speculative_tts()
+        if speculative:
+            speculative.wait_for(text, voice, app.config['TTS_SPECULATIVE_WAIT_SECONDS'])
+        try:
+            cached_audio = cache.get(text, voice) if cache else None
+        except Exception as e:
+            print(f"Warning: Speech cache lookup failed: {e}")
+            cached_audio = None
+        if cached_audio:
+            return audio_response(cached_audio['audio'], voice, text, data, cached=True)
+        
         tts_handler = get_tts_handler()
         if not tts_handler:
             return jsonify({'error': 'TTS service not available'}), 500
         
-        # Convert text to speech
-        audio_base64 = tts_handler.text_to_speech(text, voice)
+        # Over budget: read a shorter excerpt, and use the free engine when spend is the problem
+        budget = budget_state()
+        degraded = budget.get('degraded', False)
+        options = {}
+        if degraded:
+            options['max_length'] = app.config['TTS_DEGRADED_MAX_CHARS']
+            options['free_only'] = budget.get('over_spend', False)
         
-        if audio_base64:
-            return jsonify({
-                'success': True,
-                'audio_data': audio_base64,
-                'voice_used': voice,
-                'text_length': len(text)
-            })
-        else:
+        # Convert text to speech
+        info = {}
+        started = time.perf_counter()
+        audio_data = tts_handler.synthesize(text, voice, info=info, **options)
+        tts_ms = (time.perf_counter() - started) * 1000
+        if not audio_data:
             return jsonify({'error': 'Failed to generate speech'}), 500
+        
+        record_usage(
+            'tts',
+            model=info.get('model'),
+            user_id=get_user_id(),
+            characters=info.get('characters', len(text)),
+            latency_ms=tts_ms,
+            timings={'tts_ms': tts_ms},
+            degraded=degraded,
+        )
+        if cache and not degraded:
+            # Degraded audio is truncated, so only full-quality audio is reused
+            try:
+                cache.put(text, voice, audio_data, model=info.get('model'), source='request')
+            except Exception as e:
+                print(f"Warning: Could not cache speech: {e}")
+        return audio_response(audio_data, voice, text, data, degraded=degraded)
             
     except Exception as e:
         print(f"Error in TTS endpoint: {e}")
@@ -430,6 +1410,38 @@ def text_to_speech():
         traceback.print_exc()
         return jsonify({'error': str(e)}), 500
 
+def warm_crewai():
+    """Import LiteLLM and build an agent once; both are slow the first time"""
+    import litellm  # noqa: F401 - crewai's provider layer
+    create_interviewer_agent(llm=get_llm_config())
+    return True
+
+def warm_whisper():
+    """Load the Whisper model(s) and run one short decode"""
+    whisper = get_whisper_handler()
+    if not whisper or not whisper.is_available():
+        return False
+    if isinstance(whisper, AdaptiveWhisper):
+        return whisper.warm_up()
+    whisper.transcribe_samples(np.zeros(SAMPLE_RATE, dtype=np.float32))
+    return True
+
+# Initialize subsystems in the background at boot instead of on the first request
+warmup = WarmUp()
+warmup.add('result_store', get_result_store)
+warmup.add('blob_store', get_blob_store)
+warmup.add('cv_profile', profile_cache.get)
+warmup.add('static_assets', asset_manifest.load)
+warmup.add('crewai', warm_crewai)
+warmup.add('llm', get_llm_config, required=False)
+warmup.add('near_duplicate_index', get_near_duplicate_index, required=False)
+warmup.add('usage_ledger', get_usage_ledger, required=False)
+warmup.add('tts', get_tts_handler, required=False)
+warmup.add('speech_cache', get_speech_cache, required=False)
+warmup.add('whisper', warm_whisper, required=False)
+if os.environ.get('WARMUP_ON_START', '1').lower() in ('1', 'true', 'yes'):
+    warmup.start()
+
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5002))
     debug = os.environ.get('FLASK_ENV') == 'development'
@@ -0,0 +1,89 @@
+"""
+ASGI entry point for the AI Agent Assistant
+Serves the Flask app from an event loop so slow LLM/TTS/Whisper waits don't pin a worker process
+
+Run with:
+    uvicorn asgi:application --host 0.0.0.0 --port 5002
+"""
+
+from asgiref.sync import sync_to_async
+from asgiref.wsgi import WsgiToAsgi, WsgiToAsgiInstance
+
+from app import app
+from serving.executors import io_executor, IO_THREADS
+
+class PooledWsgiToAsgiInstance(WsgiToAsgiInstance):
+    """
+    Per-request WSGI bridge that runs the Flask view on the I/O pool
+
+    asgiref runs every request on one shared thread by default (thread_sensitive=True), which
+    would serialize the whole app. This bridge runs the view through sync_to_async on the wide
+    I/O pool instead, and keeps its own start_response so it only relies on build_environ.
+    """
+
+    async def run_wsgi_app(self, body):
+        await sync_to_async(self._run_wsgi_app, thread_sensitive=False, executor=io_executor)(body)
+
+    def start_response(self, status, response_headers, exc_info=None):
+        """WSGI start_response: remember the status and headers until the first body chunk"""
+        if exc_info and self.response_started:
+            raise exc_info[1].with_traceback(exc_info[2])
+        self.response_start = {
+            'type': 'http.response.start',
+            'status': int(status.split(' ', 1)[0]),
+            'headers': [(name.lower().encode('latin1'), value.encode('latin1')) for name, value in response_headers],
+        }
+        self.response_content_length = next(
+            (int(value) for name, value in response_headers if name.lower() == 'content-length'), None)
+
+    def _send_start(self):
+        if not self.response_started:
+            self.response_started = True
+            self.sync_send(self.response_start)
+
+    def _run_wsgi_app(self, body):
+        """Run the WSGI app in a pool thread, streaming its output back to the event loop"""
+        try:
+            environ = self.build_environ(self.scope, body)
+        except ValueError:
+            # Too many duplicate headers
+            self.sync_send({'type': 'http.response.start', 'status': 400, 'headers': [(b'content-type', b'text/plain')]})
+            self.sync_send({'type': 'http.response.body', 'body': b'Bad Request'})
+            return
+        bytes_sent = 0
+        result = self.wsgi_application(environ, self.start_response)
+        try:
+            for output in result:
+                self._send_start()
+                if self.response_content_length is not None:
+                    # Never send more than the declared Content-Length
+                    output = output[:self.response_content_length - bytes_sent]
+                self.sync_send({'type': 'http.response.body', 'body': output, 'more_body': True})
+                bytes_sent += len(output)
+                if bytes_sent == self.response_content_length:
+                    break
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+        self._send_start()
+        self.sync_send({'type': 'http.response.body'})
+
+
+class AsyncServingApp(WsgiToAsgi):
+    """ASGI application: the event loop owns connections and request bodies, views run on the pool"""
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            while True:
+                message = await receive()
+                if message['type'] == 'lifespan.startup':
+                    print(f"🚀 Async serving mode: up to {IO_THREADS} concurrent requests per process")
+                    await send({'type': 'lifespan.startup.complete'})
+                elif message['type'] == 'lifespan.shutdown':
+                    io_executor.shutdown(wait=False)
+                    await send({'type': 'lifespan.shutdown.complete'})
+                    return
+        await PooledWsgiToAsgiInstance(self.wsgi_application)(scope, receive, send)
+
+
+application = AsyncServingApp(app)
@@ -0,0 +1,308 @@
+"""
+Headless batch mode for the AI Agent Assistant
+Runs interview preps for a manifest of job descriptions and summaries for a directory of PDFs,
+concurrently, resuming from items already finished in the output directory (and failed items from
+their last finished crew task).
+
+Usage:
+    python main.py batch --manifest jobs.json --pdf-dir readings/ --output-dir results/ --workers 4
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from main import (
+    configure_llm,
+    create_interviewer_agent,
+    create_reading_summary_agent,
+    create_interview_task,
+    create_reading_summary_task,
+    create_excel_from_summary,
+    INTERESTS,
+)
+from orchestration import run_crew
+from storage.blob_store import READ_CHUNK_SIZE
+from storage.profile_cache import ProfileCache
+from storage.task_checkpoints import TaskCheckpointStore
+from storage.temp_files import TempFileManager
+
+STATE_FILENAME = "batch_state.json"
+REPORT_FILENAME = "batch_report.json"
+CHECKPOINTS_FILENAME = "batch_checkpoints.db"
+
+
+def slugify(text, max_length=60):
+    """Make a filesystem-safe name from free text"""
+    slug = re.sub(r"[^A-Za-z0-9]+", "-", text).strip("-").lower()
+    return slug[:max_length] or "item"
+
+
+def unique_slug(slug, taken, index):
+    """
+    The slug, or "<slug>-<index>" (then "-2", "-3", ...) if another entry already has it
+
+    The chosen name is added to `taken`.
+    """
+    candidate, attempt = slug, 1
+    while candidate in taken:
+        candidate = f"{slug}-{index}" if attempt == 1 else f"{slug}-{index}-{attempt}"
+        attempt += 1
+    taken.add(candidate)
+    return candidate
+
+
+def load_manifest(manifest_path):
+    """
+    Load job descriptions from a .json list or a .jsonl file
+
+    Entries may be plain strings or objects with "job_description" and an optional "id".
+
+    Returns:
+        List of {"id", "job_description"} dicts with unique ids
+    """
+    path = Path(manifest_path)
+    with open(path, "r", encoding="utf-8") as f:
+        if path.suffix.lower() == ".jsonl":
+            entries = [json.loads(line) for line in f if line.strip()]
+        else:
+            entries = json.load(f)
+    if isinstance(entries, dict):
+        entries = entries.get("jobs", [])
+
+    jobs = []
+    seen = set()
+    for index, entry in enumerate(entries, start=1):
+        if isinstance(entry, str):
+            entry = {"job_description": entry}
+        description = (entry.get("job_description") or "").strip()
+        if not description:
+            print(f"⚠️  Skipping manifest entry {index}: no job_description")
+            continue
+        job_id = unique_slug(slugify(str(entry.get("id") or f"job-{index}")), seen, index)
+        jobs.append({"id": job_id, "job_description": description})
+    return jobs
+
+
+def fingerprint(*parts):
+    """
+    Short hash of an item's inputs, so edited inputs are not treated as finished
+
+    Path parts are hashed by content, read in chunks so large PDFs are never loaded whole.
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, Path):
+            with open(part, "rb") as f:
+                for block in iter(lambda: f.read(READ_CHUNK_SIZE), b""):
+                    digest.update(block)
+        else:
+            digest.update(part if isinstance(part, bytes) else str(part).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+class BatchState:
+    """Thread-safe record of finished items, persisted after every completion"""
+
+    def __init__(self, output_dir):
+        self.path = os.path.join(output_dir, STATE_FILENAME)
+        self._lock = threading.Lock()
+        self.items = {}
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.items = json.load(f)
+
+    def is_done(self, key, outputs):
+        """An item counts as finished only if its recorded outputs still exist"""
+        record = self.items.get(key)
+        return bool(record) and record.get("status") == "done" and all(os.path.exists(p) for p in outputs)
+
+    def record(self, key, **fields):
+        """Store an item's outcome and flush the state file atomically"""
+        with self._lock:
+            self.items[key] = dict(fields, updated_at=time.time())
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.items, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+
+
+def run_interview_item(llm, cv_text, job, output_path, checkpoints=None, key=None):
+    """Generate one interview prep and write it as Markdown"""
+    interviewer = create_interviewer_agent(llm=llm)
+    task = create_interview_task(interviewer, cv_text, job["job_description"])
+    result = run_crew([task], agents=[interviewer], job_key=key, checkpoints=checkpoints)["output"]
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write(result)
+    return [output_path]
+
+
+def run_summary_item(llm, pdf_path, interests, markdown_path, excel_path, checkpoints=None, key=None):
+    """Summarize one PDF, writing the raw answer and the Excel row"""
+    reader = create_reading_summary_agent(llm=llm)
+    with TempFileManager(prefix="batch_") as temp_files:
+        task = create_reading_summary_task(reader, pdf_path, excel_path, interests, temp_files=temp_files)
+        result = run_crew([task], agents=[reader], job_key=key, checkpoints=checkpoints)["output"]
+
+    with open(markdown_path, "w", encoding="utf-8") as f:
+        f.write(result)
+    if not create_excel_from_summary(result, excel_path, Path(pdf_path).name, llm=llm):
+        raise RuntimeError("summary JSON could not be extracted")
+    return [markdown_path, excel_path]
+
+
+def run_batch(manifest_path=None, pdf_dir=None, output_dir="batch_output", workers=4,
+              resume=True, interests=None, llm=None):
+    """
+    Run every interview and summary item concurrently
+
+    Args:
+        manifest_path: JSON/JSONL file of job descriptions (optional)
+        pdf_dir: Directory searched recursively for PDFs (optional)
+        output_dir: Where results, state and the report are written
+        workers: Maximum number of items in flight
+        resume: Skip items already finished in output_dir
+        interests: Topics for the summaries (default: INTERESTS)
+        llm: LLM config (default: configure_llm())
+
+    Returns:
+        Report dict with per-item status and timings
+    """
+    llm = llm if llm is not None else configure_llm()
+    if llm is None:
+        raise RuntimeError("Batch mode needs an LLM. Set LLM_TYPE and the matching API key.")
+
+    interests = interests or INTERESTS
+    interview_dir = os.path.join(output_dir, "interviews")
+    summary_dir = os.path.join(output_dir, "summaries")
+    os.makedirs(interview_dir, exist_ok=True)
+    os.makedirs(summary_dir, exist_ok=True)
+    state_path = os.path.join(output_dir, STATE_FILENAME)
+    checkpoints_path = os.path.join(output_dir, CHECKPOINTS_FILENAME)
+    if not resume:
+        for path in (state_path, checkpoints_path):
+            if os.path.exists(path):
+                os.unlink(path)
+    state = BatchState(output_dir)
+    # Finished crew tasks of failed items, so a rerun does not repeat their LLM calls
+    checkpoints = TaskCheckpointStore(checkpoints_path, max_age_seconds=30 * 24 * 3600)
+
+    # Build the work list: (key, label, outputs, callable)
+    items = []
+    if manifest_path:
+        cv_text = ProfileCache().get().prompt_text
+        for job in load_manifest(manifest_path):
+            output_path = os.path.join(interview_dir, f"{job['id']}.md")
+            key = f"interview:{job['id']}:{fingerprint(cv_text, job['job_description'])}"
+            items.append((key, f"interview {job['id']}", [output_path],
+                          lambda job=job, output_path=output_path, key=key: run_interview_item(
+                              llm, cv_text, job, output_path, checkpoints, key)))
+    if pdf_dir:
+        stems = set()
+        for index, pdf_path in enumerate(sorted(Path(pdf_dir).rglob("*.pdf")), start=1):
+            # "a b.pdf" and "a-b.pdf" slugify alike; keep their outputs apart
+            stem = unique_slug(slugify(str(pdf_path.relative_to(pdf_dir).with_suffix(""))), stems, index)
+            markdown_path = os.path.join(summary_dir, f"{stem}.md")
+            excel_path = os.path.join(summary_dir, f"{stem}.xlsx")
+            key = f"summary:{stem}:{fingerprint(pdf_path, interests)}"
+            items.append((key, f"summary {pdf_path.name}", [markdown_path, excel_path],
+                          lambda p=str(pdf_path), m=markdown_path, x=excel_path, key=key: run_summary_item(
+                              llm, p, interests, m, x, checkpoints, key)))
+
+    pending = [item for item in items if not state.is_done(item[0], item[2])]
+    skipped = len(items) - len(pending)
+    print(f"\n📦 Batch: {len(items)} items ({skipped} already done), {workers} workers")
+    print(f"📁 Output: {output_dir}")
+
+    report = {"output_dir": output_dir, "total": len(items), "skipped": skipped, "items": []}
+    started = time.perf_counter()
+    finished = 0
+
+    def run_item(item):
+        key, label, outputs, work = item
+        item_started = time.perf_counter()
+        try:
+            work()
+            checkpoints.clear(key)
+            return key, label, outputs, "done", None, time.perf_counter() - item_started
+        except Exception as e:
+            return key, label, outputs, "failed", str(e), time.perf_counter() - item_started
+
+    def finish(future):
+        nonlocal finished
+        key, label, outputs, status, error, duration = future.result()
+        finished += 1
+        state.record(key, status=status, outputs=outputs, error=error, duration_s=round(duration, 2))
+        report["items"].append({"key": key, "label": label, "status": status,
+                                "error": error, "duration_s": round(duration, 2)})
+
+        elapsed = time.perf_counter() - started
+        eta = elapsed / finished * (len(pending) - finished)
+        icon = "✅" if status == "done" else "❌"
+        print(f"[{finished}/{len(pending)}] {icon} {label} ({duration:.1f}s)"
+              f"{' - ' + error if error else ''}  | elapsed {elapsed:.0f}s, eta {eta:.0f}s")
+
+    pool = ThreadPoolExecutor(max_workers=max(1, workers))
+    futures = [pool.submit(run_item, item) for item in pending]
+    recorded = set()
+    try:
+        for future in as_completed(futures):
+            recorded.add(future)
+            finish(future)
+    except KeyboardInterrupt:
+        # Drop queued items instead of running them all before exiting; keep what already finished
+        pool.shutdown(wait=False, cancel_futures=True)
+        for future in futures:
+            if future.done() and not future.cancelled() and future not in recorded:
+                finish(future)
+        raise
+    pool.shutdown()
+
+    report["failed"] = sum(1 for item in report["items"] if item["status"] == "failed")
+    report["duration_s"] = round(time.perf_counter() - started, 2)
+    with open(os.path.join(output_dir, REPORT_FILENAME), "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    print(f"\n🎉 Batch finished in {report['duration_s']}s: "
+          f"{len(pending) - report['failed']} done, {report['failed']} failed, {skipped} skipped")
+    return report
+
+
+def batch_main(argv=None):
+    """Command-line entry point for batch mode"""
+    parser = argparse.ArgumentParser(prog="main.py batch", description="Run interview preps and reading summaries headlessly.")
+    parser.add_argument("--manifest", help="JSON/JSONL file with job descriptions")
+    parser.add_argument("--pdf-dir", help="Directory of PDF readings (searched recursively)")
+    parser.add_argument("--output-dir", default="batch_output", help="Directory for results (default: batch_output)")
+    parser.add_argument("--workers", type=int, default=4, help="Maximum concurrent items (default: 4)")
+    parser.add_argument("--interests", help="Comma-separated interests for summaries (default: built-in list)")
+    parser.add_argument("--no-resume", action="store_true", help="Redo items already finished in the output directory")
+    args = parser.parse_args(argv)
+
+    if not args.manifest and not args.pdf_dir:
+        parser.error("give --manifest, --pdf-dir or both")
+    for path, kind in ((args.manifest, "Manifest"), (args.pdf_dir, "PDF directory")):
+        if path and not os.path.exists(path):
+            parser.error(f"{kind} not found: {path}")
+
+    interests = [i.strip() for i in args.interests.split(",") if i.strip()] if args.interests else None
+    try:
+        report = run_batch(args.manifest, args.pdf_dir, args.output_dir, args.workers,
+                           resume=not args.no_resume, interests=interests)
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        return 1
+    except KeyboardInterrupt:
+        print("\n\n👋 Batch interrupted. Items still running finish before exit; run the same command again to resume.")
+        return 130
+    return 1 if report["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(batch_main())
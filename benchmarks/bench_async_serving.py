@@ -0,0 +1,90 @@
+"""
+Benchmark: concurrent requests per process, sync gunicorn worker vs async serving mode
+
+Starts each server with stubbed providers (see stub_providers.py), fires N concurrent
+/api/interview requests and reports throughput and latency percentiles.
+
+Usage:
+    python benchmarks/bench_async_serving.py --concurrency 100 --latency 1.0
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SERVERS = {
+    'gunicorn-sync': ['gunicorn', 'benchmarks.stub_providers:app', '--workers', '1', '--bind', '127.0.0.1:{port}'],
+    'asgi': ['uvicorn', 'benchmarks.stub_providers:application', '--workers', '1',
+             '--host', '127.0.0.1', '--port', '{port}', '--log-level', 'warning'],
+}
+
+
+def wait_until_up(base_url, timeout=60):
+    """Poll /api/health until the server answers"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if requests.get(f"{base_url}/api/health", timeout=1).ok:
+                return
+        except requests.RequestException:
+            time.sleep(0.25)
+    raise RuntimeError(f"Server at {base_url} did not start")
+
+
+def one_request(base_url, i):
+    """Send one uncached interview request and return its latency in seconds"""
+    started = time.perf_counter()
+    response = requests.post(
+        f"{base_url}/api/interview",
+        json={'cv_text': f'Stub CV {i}', 'job_description': f'Stub job {i}', 'refresh': True},
+        timeout=600,
+    )
+    response.raise_for_status()
+    return time.perf_counter() - started
+
+
+def run(name, concurrency, latency, port):
+    """Start a server, drive it with `concurrency` simultaneous requests, stop it"""
+    env = dict(os.environ, STUB_PROVIDER_LATENCY=str(latency),
+               RESULTS_DB_PATH=os.path.join(tempfile.mkdtemp(), 'results.sqlite3'))
+    cmd = [part.format(port=port) for part in SERVERS[name]]
+    server = subprocess.Popen(cmd, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        wait_until_up(base_url)
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            latencies = sorted(pool.map(lambda i: one_request(base_url, i), range(concurrency)))
+        wall = time.perf_counter() - started
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+    p95 = latencies[max(0, int(len(latencies) * 0.95) - 1)]
+    print(f"{name:>14}: {concurrency} requests in {wall:6.2f}s  "
+          f"({concurrency / wall:6.1f} req/s, p50 {statistics.median(latencies):6.2f}s, p95 {p95:6.2f}s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--latency', type=float, default=1.0, help='stub provider latency in seconds')
+    parser.add_argument('--port', type=int, default=5090)
+    parser.add_argument('--servers', nargs='+', default=list(SERVERS), choices=list(SERVERS))
+    args = parser.parse_args()
+
+    print(f"Provider latency {args.latency}s, {args.concurrency} concurrent requests, 1 process each")
+    for offset, name in enumerate(args.servers):
+        run(name, args.concurrency, args.latency, args.port + offset)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,103 @@
+"""
+Peak-memory check for the streaming PDF pipeline
+Writes a synthetic text PDF of the requested size (default 200 MB), streams it through
+stream_pdf_chunks into a managed temp file, and fails if peak RSS exceeds the budget.
+
+Usage:
+    python -m benchmarks.bench_large_pdf --size-mb 200 --rss-budget-mb 300
+"""
+import argparse
+import os
+import random
+import resource
+import sys
+import time
+
+from processing.pdf_text import stream_pdf_chunks
+from storage.temp_files import TempFileManager
+
+WORDS = ("learning design equity curriculum assessment students teachers classroom feedback "
+         "motivation literacy technology community research practice policy inclusion "
+         "scaffolding reflection inquiry collaboration outcomes evidence framework").split()
+
+
+def write_synthetic_pdf(path, size_mb, page_kb=16, seed=7):
+    """Write an uncompressed multi-page text PDF of about size_mb, one page at a time"""
+    rng = random.Random(seed)
+    page_count = max(1, int(size_mb * 1024 // page_kb))
+    offsets = []
+
+    with open(path, "wb") as f:
+        def write_object(body):
+            offsets.append(f.tell())
+            f.write(b"%d 0 obj\n" % len(offsets) + body + b"\nendobj\n")
+
+        f.write(b"%PDF-1.4\n")
+        write_object(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+        pages_id = 2 + 2 * page_count
+        page_ids = []
+        for page in range(page_count):
+            lines = [f"Chapter {page // 20 + 1}, page {page + 1}"]
+            while sum(len(line) for line in lines) < page_kb * 1024 - 200:
+                lines.append(" ".join(rng.choice(WORDS) for _ in range(12)))
+            ops = "BT /F1 9 Tf 11 TL 40 800 Td " + " ".join(f"({line}) Tj T*" for line in lines) + " ET"
+            write_object(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(ops), ops.encode("ascii")))
+            write_object(b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 612 792] /Contents %d 0 R "
+                         b"/Resources << /Font << /F1 1 0 R >> >> >>" % (pages_id, len(offsets)))
+            page_ids.append(len(offsets))
+        write_object(b"<< /Type /Pages /Kids [%s] /Count %d >>"
+                     % (b" ".join(b"%d 0 R" % i for i in page_ids), page_count))
+        write_object(b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id)
+
+        xref = f.tell()
+        f.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(offsets) + 1))
+        f.write(b"".join(b"%010d 00000 n \n" % offset for offset in offsets))
+        f.write(b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+                % (len(offsets) + 1, len(offsets), xref))
+    return page_count
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process (ru_maxrss is KB on Linux, bytes on macOS)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream a large synthetic PDF under a fixed RSS budget.")
+    parser.add_argument("--size-mb", type=int, default=200, help="Synthetic PDF size (default: 200)")
+    parser.add_argument("--rss-budget-mb", type=float, default=300, help="Maximum peak RSS (default: 300)")
+    parser.add_argument("--memory-limit-mb", type=float, default=64, help="Pipeline memory ceiling (default: 64)")
+    args = parser.parse_args(argv)
+
+    with TempFileManager(prefix="bench_pdf_") as temps:
+        pdf_path = temps.path(".pdf")
+        started = time.perf_counter()
+        pages = write_synthetic_pdf(pdf_path, args.size_mb)
+        print(f"📄 Wrote {os.path.getsize(pdf_path) / 1e6:.0f} MB, {pages} pages "
+              f"in {time.perf_counter() - started:.1f}s (peak RSS {peak_rss_mb():.0f} MB)")
+
+        started = time.perf_counter()
+        text_path = temps.path(".txt")
+        chunks = characters = 0
+        with open(text_path, "w", encoding="utf-8") as f:
+            for chunk in stream_pdf_chunks(pdf_path, memory_limit_mb=args.memory_limit_mb):
+                f.write(chunk)
+                chunks += 1
+                characters += len(chunk)
+        elapsed = time.perf_counter() - started
+        peak = peak_rss_mb()
+        print(f"🧩 Streamed {characters / 1e6:.0f}M characters in {chunks} chunks in {elapsed:.1f}s")
+        print(f"📈 Peak RSS {peak:.0f} MB (budget {args.rss_budget_mb:.0f} MB)")
+        temp_dir = temps.directory
+    print(f"🧹 Temp files removed: {not os.path.exists(temp_dir)}")
+
+    if peak > args.rss_budget_mb:
+        print("❌ Over budget")
+        return 1
+    print("✅ Within budget")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,199 @@
+"""
+Latency and word-error rate of each Whisper tier on the local test corpus
+The corpus is a set of short 16 kHz mono WAV clips with reference transcripts and pinned SHA-256
+checksums in manifest.json. Clips are synthesized once with gTTS (needs network and ffmpeg) or
+recorded by hand, pinned with --pin and committed next to the manifest; afterwards the benchmark
+runs offline and refuses clips that differ from the pinned ones, so results stay comparable.
+Point WHISPER_RTF_FILE at the --output file and AdaptiveWhisper starts from the measured
+real-time factors instead of the built-in defaults.
+
+Usage:
+    python -m benchmarks.bench_whisper_tiers --generate --pin    # synthesize missing clips and pin them (once)
+    python -m benchmarks.bench_whisper_tiers --tiers tiny,base,small --output whisper_tiers.json
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+from voice.stt_handler import SpeechToTextHandler, WHISPER_AVAILABLE
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stt_corpus")
+SAMPLE_RATE = 16000
+
+
+def normalize_words(text):
+    """Lowercase words without punctuation, for WER scoring"""
+    return re.findall(r"[a-z0-9']+", text.lower().replace("-", " "))
+
+
+def word_error_rate(reference, hypothesis):
+    """(substitutions + deletions + insertions) / reference words"""
+    ref, hyp = normalize_words(reference), normalize_words(hypothesis)
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, start=1):
+        current = [i] + [0] * len(hyp)
+        for j, hyp_word in enumerate(hyp, start=1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ref_word != hyp_word))
+        previous = current
+    return previous[-1] / max(1, len(ref))
+
+
+def file_sha256(path):
+    """Hex SHA-256 of a file"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_corpus(corpus_dir=CORPUS_DIR):
+    """Manifest clips, each with the path of its audio file (None if missing)"""
+    with open(os.path.join(corpus_dir, "manifest.json"), "r", encoding="utf-8") as f:
+        clips = json.load(f)["clips"]
+    for clip in clips:
+        matches = sorted(glob.glob(os.path.join(corpus_dir, clip["id"] + ".wav")))
+        clip["audio"] = matches[0] if matches else None
+    return clips
+
+
+def generate_missing(clips, corpus_dir=CORPUS_DIR):
+    """Synthesize missing clips with gTTS (already a dependency for TTS) as 16 kHz mono WAV"""
+    from gtts import gTTS
+
+    for clip in clips:
+        if clip["audio"] is None:
+            path = os.path.join(corpus_dir, clip["id"] + ".wav")
+            with tempfile.TemporaryDirectory() as tmp:
+                mp3_path = os.path.join(tmp, "clip.mp3")
+                gTTS(text=clip["text"], lang="en").save(mp3_path)
+                # -bitexact keeps encoder tags out of the header, so the same audio gives the same bytes
+                subprocess.run(["ffmpeg", "-nostdin", "-loglevel", "error", "-y", "-i", mp3_path,
+                                "-ac", "1", "-ar", str(SAMPLE_RATE), "-c:a", "pcm_s16le", "-bitexact", path],
+                               check=True)
+            clip["audio"] = path
+            print(f"🔊 Generated {os.path.basename(path)}")
+
+
+def pin_checksums(clips, corpus_dir=CORPUS_DIR):
+    """Record each clip's SHA-256 in the manifest"""
+    manifest_path = os.path.join(corpus_dir, "manifest.json")
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    for clip in clips:
+        if clip["audio"]:
+            clip["sha256"] = file_sha256(clip["audio"])
+    checksums = {clip["id"]: clip["sha256"] for clip in clips if clip["audio"]}
+    for entry in manifest["clips"]:
+        if entry["id"] in checksums:
+            entry["sha256"] = checksums[entry["id"]]
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+    print(f"📌 Pinned {len(checksums)} clip checksums in {manifest_path}")
+
+
+def check_checksums(clips):
+    """Ids of clips that are not pinned, and of clips whose audio differs from the pinned checksum"""
+    unpinned = [clip["id"] for clip in clips if not clip.get("sha256")]
+    changed = [clip["id"] for clip in clips if clip.get("sha256") and file_sha256(clip["audio"]) != clip["sha256"]]
+    return unpinned, changed
+
+
+def benchmark_tier(tier, clips):
+    """Load one tier and transcribe every clip; returns a summary dict"""
+    import whisper
+
+    started = time.perf_counter()
+    handler = SpeechToTextHandler(model_size=tier)
+    load_s = time.perf_counter() - started
+    if not handler.is_available():
+        return {"tier": tier, "error": "model failed to load"}
+
+    # Warm-up run so the first clip does not pay one-off initialisation
+    handler.transcribe_samples(whisper.load_audio(clips[0]["audio"]))
+
+    rows = []
+    for clip in clips:
+        audio = whisper.load_audio(clip["audio"])
+        duration = len(audio) / SAMPLE_RATE
+        started = time.perf_counter()
+        text = handler.transcribe_samples(audio)
+        latency = time.perf_counter() - started
+        rows.append({"id": clip["id"], "duration_s": duration, "latency_s": latency,
+                     "wer": word_error_rate(clip["text"], text), "text": text})
+
+    total_audio = sum(row["duration_s"] for row in rows)
+    total_latency = sum(row["latency_s"] for row in rows)
+    reference_words = sum(len(normalize_words(clip["text"])) for clip in clips)
+    return {
+        "tier": tier,
+        "load_s": round(load_s, 2),
+        "mean_latency_s": round(total_latency / len(rows), 3),
+        "max_latency_s": round(max(row["latency_s"] for row in rows), 3),
+        "real_time_factor": round(total_latency / total_audio, 3),
+        # Corpus WER weights each clip by its length
+        "wer": round(sum(row["wer"] * len(normalize_words(clip["text"])) for row, clip in zip(rows, clips))
+                     / reference_words, 4),
+        "clips": rows,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Map Whisper tier latency and WER on the local corpus.")
+    parser.add_argument("--tiers", default="tiny,base,small", help="Comma-separated tiers (default: tiny,base,small)")
+    parser.add_argument("--corpus", default=CORPUS_DIR, help="Corpus directory with manifest.json")
+    parser.add_argument("--generate", action="store_true", help="Synthesize missing audio clips with gTTS first")
+    parser.add_argument("--pin", action="store_true", help="Record the clips' checksums in manifest.json")
+    parser.add_argument("--output", help="Write the full results as JSON")
+    args = parser.parse_args(argv)
+
+    clips = load_corpus(args.corpus)
+    if args.generate:
+        generate_missing(clips, args.corpus)
+    missing = [clip["id"] for clip in clips if clip["audio"] is None]
+    if missing:
+        print(f"❌ Missing audio for {', '.join(missing)}. Run with --generate or record them (16 kHz mono WAV).")
+        return 1
+    if args.pin:
+        pin_checksums(clips, args.corpus)
+    unpinned, changed = check_checksums(clips)
+    if changed:
+        print(f"❌ Audio differs from the pinned checksums: {', '.join(changed)}. "
+              "Restore the committed clips, or re-pin with --pin if the change is intended.")
+        return 1
+    if unpinned:
+        print(f"⚠️ Unpinned clips ({', '.join(unpinned)}): results are not comparable across machines; "
+              "run with --pin and commit the clips")
+    if not WHISPER_AVAILABLE:
+        print("❌ Whisper not installed (pip install openai-whisper)")
+        return 1
+
+    reference_words = sum(len(normalize_words(clip["text"])) for clip in clips)
+    print(f"🎧 {len(clips)} clips, {reference_words} reference words")
+    results = [benchmark_tier(tier.strip(), clips) for tier in args.tiers.split(",") if tier.strip()]
+
+    print(f"\n{'tier':<8}{'load s':>8}{'mean s':>9}{'max s':>8}{'RTF':>8}{'WER':>8}")
+    for result in results:
+        if "error" in result:
+            print(f"{result['tier']:<8}  {result['error']}")
+            continue
+        print(f"{result['tier']:<8}{result['load_s']:>8}{result['mean_latency_s']:>9}{result['max_latency_s']:>8}"
+              f"{result['real_time_factor']:>8}{result['wer']:>8.1%}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
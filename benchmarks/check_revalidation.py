@@ -0,0 +1,39 @@
+"""
+Check: browser-style ETag revalidation of /api/cv still returns 304 with compression on
+
+A browser sends Accept-Encoding, stores the (encoding-suffixed) ETag it gets back and sends
+it as If-None-Match on the next load. Run without and with Accept-Encoding.
+
+Usage:
+    python benchmarks/check_revalidation.py
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app
+
+
+def revalidate(client, accept_encoding):
+    """Fetch /api/cv, resend its ETag, return (first status, ETag, second status)"""
+    headers = {'Accept-Encoding': accept_encoding} if accept_encoding else {}
+    first = client.get('/api/cv', headers=headers)
+    etag = first.headers.get('ETag')
+    second = client.get('/api/cv', headers=dict(headers, **{'If-None-Match': etag}))
+    return first.status_code, etag, second.status_code
+
+
+def main():
+    failed = False
+    with app.test_client() as client:
+        for accept_encoding in (None, 'gzip', 'gzip, deflate, br'):
+            first, etag, second = revalidate(client, accept_encoding)
+            ok = first == 200 and second == 304
+            failed |= not ok
+            print(f"{'ok  ' if ok else 'FAIL'} Accept-Encoding={accept_encoding!s:<20} {first} -> {second}  ETag {etag}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,291 @@
+"""
+Replay captured production traffic against a local instance with stubbed providers
+
+Reads a capture file written with TRAFFIC_CAPTURE=1 (see serving/traffic_capture.py), rebuilds
+each request with synthetic content of the recorded size (CV/job text, PDFs, TTS text, chunked
+uploads), re-drives them on the recorded schedule at original or scaled speed, and reports
+latency percentiles per endpoint next to the latencies seen when the traffic was captured.
+Requests sharing a fingerprint get identical content, so cache hits replay as cache hits.
+
+Usage:
+    python -m benchmarks.replay_traffic captures/traffic.jsonl --speed 1
+    python -m benchmarks.replay_traffic captures/traffic.jsonl --speed 10 --server gunicorn-sync
+    python -m benchmarks.replay_traffic captures/traffic.jsonl --speed 0 --base-url http://127.0.0.1:5002
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+
+from benchmarks.bench_async_serving import ROOT, SERVERS, wait_until_up
+from benchmarks.bench_large_pdf import WORDS, write_synthetic_pdf
+from serving.traffic_capture import read_capture
+
+UPLOAD_STEPS = ("create_upload", "upload_chunk", "finalize_upload")
+
+
+def seed_for(*parts):
+    """Deterministic integer seed from a fingerprint (or any identifying parts)"""
+    return int(hashlib.sha256("\x00".join(str(part) for part in parts).encode("utf-8")).hexdigest()[:12], 16)
+
+
+def synthetic_text(chars, seed):
+    """Words of filler text totalling about `chars` characters"""
+    rng = random.Random(seed)
+    words, length = [], 0
+    while length < chars:
+        word = rng.choice(WORDS)
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)[:max(chars, 1)]
+
+
+class Replayer:
+    """Rebuild and send the requests of a capture file"""
+
+    def __init__(self, base_url, work_dir):
+        self.base_url = base_url
+        self.work_dir = work_dir
+        self.results = []
+        self.skipped = {}
+        self._lock = threading.Lock()
+        self._pdf_lock = threading.Lock()
+
+    def synthetic_pdf(self, size, seed):
+        """Path of a synthetic PDF of about `size` bytes (written once per seed)"""
+        path = os.path.join(self.work_dir, f"{seed:x}.pdf")
+        with self._pdf_lock:
+            if not os.path.exists(path):
+                page_kb = max(1, min(16, size // 1024))
+                write_synthetic_pdf(path, max(size, 1024) / (1024 * 1024), page_kb=page_kb, seed=seed)
+        return path
+
+    def _record(self, envelope, started, response=None, error=None):
+        with self._lock:
+            self.results.append({
+                "endpoint": envelope["endpoint"],
+                "method": envelope["method"],
+                "status": response.status_code if response is not None else None,
+                "error": error,
+                "seconds": time.perf_counter() - started,
+                "captured_ms": envelope.get("duration_ms"),
+            })
+
+    def _skip(self, envelope, reason):
+        with self._lock:
+            key = f"{envelope['method']} {envelope['endpoint']} ({reason})"
+            self.skipped[key] = self.skipped.get(key, 0) + 1
+
+    def _send(self, envelope, method, path, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = requests.request(method, f"{self.base_url}{path}", timeout=900, **kwargs)
+        except requests.RequestException as e:
+            self._record(envelope, started, error=str(e))
+            return None
+        self._record(envelope, started, response=response)
+        return response
+
+    def replay(self, flow):
+        """Send one flow: a single request, or a whole chunked upload session"""
+        envelope = flow[0]
+        fields = envelope.get("fields") or {}
+        view = envelope.get("view")
+        seed = seed_for(fields.get("fingerprint") or envelope.get("ts"), envelope.get("endpoint"))
+        headers = {"X-User-Id": envelope["user"]} if envelope.get("user") else {}
+
+        if view == "interview_preparation":
+            self._send(envelope, "POST", "/api/interview", headers=headers, json={
+                "cv_text": synthetic_text(fields.get("cv_chars", 2000), seed),
+                "job_description": synthetic_text(fields.get("job_chars", 1500), seed + 1),
+                "refresh": fields.get("refresh", False),
+            })
+        elif view == "pdf_summarization":
+            pdf_path = self.synthetic_pdf(envelope.get("request_bytes") or 100_000, seed)
+            with open(pdf_path, "rb") as f:
+                self._send(envelope, "POST", "/api/summarize", headers=headers,
+                           files={"pdf_file": ("replay.pdf", f, "application/pdf")},
+                           data=self._summary_options(fields))
+        elif view == "text_to_speech":
+            query = f"?format={fields['format']}" if fields.get("format") else ""
+            self._send(envelope, "POST", f"/api/text-to-speech{query}", headers=headers, json={
+                "text": synthetic_text(fields.get("text_chars", 500), seed),
+                "voice": fields.get("voice") or "nova",
+            })
+        elif view == "create_upload":
+            self.replay_upload(flow, headers)
+        elif envelope["method"] == "GET" and "<" not in envelope["endpoint"]:
+            self._send(envelope, "GET", envelope["endpoint"], headers=headers)
+        else:
+            self._skip(envelope, "not replayable")
+
+    @staticmethod
+    def _summary_options(fields):
+        options = {"refresh": "1" if fields.get("refresh") else ""}
+        if fields.get("interests"):
+            options["custom_interests"] = ",".join(fields["interests"])
+        if fields.get("page_range"):
+            options["page_range"] = fields["page_range"]
+        return options
+
+    def replay_upload(self, flow, headers):
+        """Create, send every chunk of, and finalize a synthetic upload of the recorded size"""
+        create = flow[0]
+        fields = create.get("fields") or {}
+        if fields.get("purpose") != "summarize":
+            # Stubbed instances have no Whisper
+            self._skip(create, "transcription upload")
+            return
+        chunks = [envelope for envelope in flow if envelope.get("view") == "upload_chunk"]
+        finalize = next((envelope for envelope in flow if envelope.get("view") == "finalize_upload"), None)
+        # The finalize envelope fingerprints the stored content; the create one only a client-sent checksum
+        fingerprint = ((finalize or {}).get("fields") or {}).get("fingerprint") or fields.get("fingerprint")
+        size = fields.get("size") or sum(envelope.get("request_bytes") or 0 for envelope in chunks) or 100_000
+        pdf_path = self.synthetic_pdf(int(size), seed_for(fingerprint or create.get("ts"), "upload"))
+        response = self._send(create, "POST", "/api/uploads", headers=headers, json={
+            "filename": "replay.pdf", "size": os.path.getsize(pdf_path), "purpose": "summarize",
+        })
+        if response is None or response.status_code != 201:
+            return
+        session = response.json()
+        chunk_template = chunks[0] if chunks else dict(create, endpoint="/api/uploads/<upload_id>/chunks/<int:index>",
+                                                       method="PUT", duration_ms=None)
+        with open(pdf_path, "rb") as f:
+            for index in range(session["chunk_count"]):
+                data = f.read(session["chunk_size"])
+                self._send(chunk_template, "PUT", f"/api/uploads/{session['upload_id']}/chunks/{index}",
+                           headers=dict(headers, **{"X-Chunk-Sha256": hashlib.sha256(data).hexdigest()}), data=data)
+        if finalize is not None:
+            self._send(finalize, "POST", f"/api/uploads/{session['upload_id']}/finalize", headers=headers,
+                       json=self._summary_options(finalize.get("fields") or {}))
+
+
+def build_flows(envelopes):
+    """Group envelopes into independently scheduled flows (upload sessions stay together)"""
+    flows, sessions = [], {}
+    for envelope in envelopes:
+        if envelope.get("view") in UPLOAD_STEPS and envelope.get("session"):
+            if envelope["session"] not in sessions:
+                sessions[envelope["session"]] = []
+                flows.append(sessions[envelope["session"]])
+            sessions[envelope["session"]].append(envelope)
+        else:
+            flows.append([envelope])
+    # Sessions whose create request was not captured can't be rebuilt
+    return [flow for flow in flows if flow[0].get("view") != "upload_chunk" and flow[0].get("view") != "finalize_upload"]
+
+
+def percentiles_ms(values):
+    if not values:
+        return {}
+    p50, p90, p95, p99 = np.percentile(np.asarray(values, dtype=np.float64), [50, 90, 95, 99])
+    return {"p50": round(p50, 1), "p90": round(p90, 1), "p95": round(p95, 1), "p99": round(p99, 1),
+            "max": round(float(max(values)), 1)}
+
+
+def report(results):
+    """Per-endpoint replay latencies next to the captured ones"""
+    endpoints = {}
+    for result in results:
+        endpoints.setdefault(f"{result['method']} {result['endpoint']}", []).append(result)
+    summary = {}
+    for name, rows in sorted(endpoints.items()):
+        summary[name] = {
+            "requests": len(rows),
+            "errors": sum(1 for row in rows if row["error"] or (row["status"] or 0) >= 500),
+            "replay_ms": percentiles_ms([row["seconds"] * 1000 for row in rows]),
+            "captured_ms": percentiles_ms([row["captured_ms"] for row in rows if row["captured_ms"] is not None]),
+        }
+    return summary
+
+
+def run(args):
+    envelopes = read_capture(args.capture)
+    if args.endpoints:
+        envelopes = [envelope for envelope in envelopes if envelope.get("endpoint") in args.endpoints]
+    flows = build_flows(envelopes)[:args.limit] if args.limit else build_flows(envelopes)
+    if not flows:
+        print("No replayable requests in the capture")
+        return 1
+    span = flows[-1][0]["ts"] - flows[0][0]["ts"]
+    print(f"📼 {len(envelopes)} captured requests ({len(flows)} flows) spanning {span:.0f}s, "
+          f"replaying at {'full speed' if args.speed <= 0 else f'{args.speed:g}x'}")
+
+    server = None
+    base_url = args.base_url
+    if base_url is None:
+        env = dict(os.environ, STUB_PROVIDER_LATENCY=str(args.latency),
+                   RESULTS_DB_PATH=os.path.join(tempfile.mkdtemp(), "results.sqlite3"))
+        cmd = [part.format(port=args.port) for part in SERVERS[args.server]]
+        server = subprocess.Popen(cmd, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        base_url = f"http://127.0.0.1:{args.port}"
+
+    with tempfile.TemporaryDirectory(prefix="replay_") as work_dir:
+        replayer = Replayer(base_url, work_dir)
+        lags = []
+        try:
+            wait_until_up(base_url)
+            first = flows[0][0]["ts"]
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=args.max_concurrency) as pool:
+                for flow in flows:
+                    due = (flow[0]["ts"] - first) / args.speed if args.speed > 0 else 0
+                    delay = due - (time.perf_counter() - started)
+                    if delay > 0:
+                        time.sleep(delay)
+                    lags.append(max(0.0, -delay))
+                    pool.submit(replayer.replay, flow)
+            wall = time.perf_counter() - started
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait(timeout=30)
+
+    summary = report(replayer.results)
+    print(f"\n{'endpoint':<48} {'n':>5} {'err':>4} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8} {'captured p95':>13}")
+    for name, row in summary.items():
+        replay_ms, captured_ms = row["replay_ms"], row["captured_ms"]
+        print(f"{name[:48]:<48} {row['requests']:>5} {row['errors']:>4} {replay_ms['p50']:>7.0f}ms "
+              f"{replay_ms['p95']:>7.0f}ms {replay_ms['p99']:>7.0f}ms {replay_ms['max']:>7.0f}ms "
+              f"{(str(round(captured_ms['p95'])) + 'ms') if captured_ms else '-':>13}")
+    print(f"\n⏱️  {len(replayer.results)} requests in {wall:.1f}s; "
+          f"schedule lag p95 {np.percentile(lags, 95) * 1000:.0f}ms")
+    for reason, count in sorted(replayer.skipped.items()):
+        print(f"⏭️  Skipped {count}x {reason}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"speed": args.speed, "wall_seconds": wall, "endpoints": summary,
+                       "skipped": replayer.skipped}, f, indent=2)
+        print(f"📝 Wrote {args.output}")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("capture", help="capture file (JSONL)")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="schedule speed-up: 1 = original timing, 10 = ten times faster, 0 = no waits")
+    parser.add_argument("--base-url", help="replay against this running instance instead of starting one")
+    parser.add_argument("--server", default="asgi", choices=list(SERVERS), help="stubbed server to start")
+    parser.add_argument("--latency", type=float, default=1.0, help="stub provider latency in seconds")
+    parser.add_argument("--port", type=int, default=5095)
+    parser.add_argument("--max-concurrency", type=int, default=256, help="client threads")
+    parser.add_argument("--endpoints", nargs="+", help="only replay these endpoint rules (e.g. /api/interview)")
+    parser.add_argument("--limit", type=int, help="only replay the first N flows")
+    parser.add_argument("--output", help="write the summary as JSON")
+    return run(parser.parse_args(argv))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
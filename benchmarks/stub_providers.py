@@ -0,0 +1,55 @@
+"""
+The Flask app with LLM/TTS providers replaced by fixed-latency stubs, for benchmarking
+Set STUB_PROVIDER_LATENCY (seconds, default 1.0) to control how long each provider call waits.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as app_module
+import orchestration
+from asgi import AsyncServingApp
+
+PROVIDER_LATENCY = float(os.environ.get('STUB_PROVIDER_LATENCY', 1.0))
+
+STUB_SUMMARY = '''```json
+{"article_title": "Stub Reading", "key_concepts": "• Stub concept", "relevance": "• Stub relevance"}
+```'''
+
+
+class StubCrew:
+    """Stands in for crewai.Crew: waits like a provider call, returns canned output"""
+
+    def __init__(self, agents=None, tasks=None, **kwargs):
+        self.tasks = tasks or []
+
+    def kickoff(self, *args, **kwargs):
+        time.sleep(PROVIDER_LATENCY)
+        description = self.tasks[0].description if self.tasks else ''
+        return STUB_SUMMARY if 'PDF' in description else '# Interview Preparation\n\n1. Stub question?'
+
+
+class StubTTS:
+    """Stands in for TextToSpeechHandler"""
+
+    def synthesize(self, text, voice='nova', max_length=4000, free_only=False, info=None):
+        time.sleep(PROVIDER_LATENCY)
+        if info is not None:
+            info.update(model='gtts' if free_only else 'tts-1', characters=min(len(text), max_length))
+        return b'STUB'
+
+    def text_to_speech(self, text, voice='nova'):
+        return 'U1RVQg=='
+
+    def get_voice_info(self):
+        return {'current_voice': 'stub'}
+
+
+orchestration.Crew = StubCrew
+app_module.get_llm_config = lambda degraded=None: 'stub/stub-model'
+app_module.get_tts_handler = lambda: StubTTS()
+
+app = app_module.app
+application = AsyncServingApp(app)
@@ -3,16 +3,25 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
-from crewai import Agent, Task, Crew, Process
+from crewai import Agent, Task
 from langchain_community.chat_models import ChatOpenAI
 from langchain_google_genai import ChatGoogleGenerativeAI
 from crewai_tools import FileReadTool
 from langchain.schema import BaseMessage, HumanMessage, AIMessage
 import os
-import json
 import sys
 from pathlib import Path
 
+from orchestration import run_independent_tasks
+from processing.summary_parser import extract_summary, repair_summary
+from processing.llm_retry import install_llm_retry
+from processing.summary_export import write_xlsx
+from processing.prompt_layout import PromptBuilder, INSTRUCTIONS, PROFILE, SCHEMA, REQUEST
+from processing.relevance import select_passages, relevance_budget_from_env
+from processing.pdf_text import iter_pdf_pages, stream_pdf_chunks, extract_front_matter, page_range_from_env
+from storage.profile_cache import ProfileCache
+from storage.temp_files import TempFileManager
+
 # Simple Mock LLM for testing
 class MockLLM:
     def __init__(self):
@@ -144,18 +153,13 @@ def create_interviewer_agent(llm=None):
         cfg["llm"] = llm
     return Agent(**cfg)
 
-def create_reading_summary_agent(llm=None, custom_interests=None):
-    # Default interests (used only if no custom interests provided)
-    default_interests = "AI in Education, Marginalized Communities, EdTech, Learning Design, Career Readiness, K-12, Soft Skills"
-    
-    # Use custom interests if provided, otherwise use defaults
-    # custom_interests now contains ALL interests from the frontend (not just added ones)
-    interests = custom_interests if custom_interests else default_interests
-    
+def create_reading_summary_agent(llm=None):
+    # The backstory is identical for every request so the system prompt stays a cacheable prefix;
+    # the interests, which vary per request, go at the end of the task (see create_reading_summary_task)
     cfg = dict(
         role="Reading Summarizer",
         goal="Read a pdf file (e.g. an article or book chapter) and generate an excel file with what Livia would find relevant and a summary of the key concepts.",
-        backstory=f"You are helping Livia summarize readings from her Graduate Education classes. You have access to the reading material in pdf format. Use this information to generate an excel file with what Livia would find relevant, given her interests in: {interests}. Focus on summarizing the key concepts and highlighting connections to these areas. Write like Livia would - natural and informal.",
+        backstory="You are helping Livia summarize readings from her Graduate Education classes. You have access to the reading material in pdf format. Use this information to generate an excel file with what Livia would find relevant, given the interests listed in each task. Focus on summarizing the key concepts and highlighting connections to these areas. Write like Livia would - natural and informal.",
         verbose=False,
         allow_delegation=False,
         tools=[FileReadTool()],
@@ -165,140 +169,79 @@ def create_reading_summary_agent(llm=None, custom_interests=None):
     return Agent(**cfg)
 
 def create_interview_task(agent, cv, job_description):
-    """Create interview preparation task"""
+    """Create interview preparation task
+    
+    The prompt runs from most to least stable (instructions, CV, answer format, job description)
+    so repeated preps share a long prefix the provider can serve from its prompt cache.
+    """
+    description = (
+        PromptBuilder()
+        .add(INSTRUCTIONS, "Help Livia prepare for a job interview based on her CV and the job description. You should generate a list of potential interview questions and answers that Livia can use to practice. Focus on the most relevant skills and experiences from her CV that match the job description. Give concise and clear answers that Livia can easily remember, and tips to help her prepare and feel calm at the day. Remember that the answers should be in Livia's voice, so they should sound natural and polite.")
+        .add(PROFILE, cv, label="CV")
+        .add(SCHEMA, """A full preparation for the interview. Include the following:
+1) A list of potential questions
+2) Answers in Livia's voice following the STAR method
+3) Tips for Livia to feel confident and prepared.
+This should be formatted as a list of questions and answers in a structured format that is easy to read and understand, just like Livia, an organized person, would write it.""", label="Answer format")
+        .add(REQUEST, job_description, label="Job Description")
+        .build()
+    )
     return Task(
-        description=f"""Help Livia prepare for a job interview based on her CV and the job description. You should generate a list of potential interview questions and answers that Livia can use to practice. Focus on the most relevant skills and experiences from her CV that match the job description. Give concise and clear answers that Livia can easily remember, and tips to help her prepare and feel calm at the day. Remember that the answers should be in Livia's voice, so they should sound natural and polite.
-        Use the following information:
-        CV: {cv}
-        Job Description: {job_description}""",
-        expected_output=f"""A full preparation for the interview. Include the following:
-        1) A list of potential questions
-        2) Answers in Livia's voice following the STAR method
-        3) Tips for Livia to feel confident and prepared.
-        This should be formatted as a list of questions and answers in a structured format that is easy to read and understand, just like Livia, an organized person, would write it.""",
+        description=description,
+        expected_output="The full interview preparation in the answer format described in the task.",
         agent=agent,
     )
 
-def convert_pdf_to_text(pdf_path):
-    """Convert PDF to text using pypdf"""
+def convert_pdf_to_text(pdf_path, page_range=None, max_chars=None):
+    """Convert PDF to text using pypdf
+    
+    Pages are extracted lazily: only pages inside page_range are parsed, and
+    extraction stops once max_chars characters have been collected.
+    """
     try:
-        import pypdf
-        with open(pdf_path, 'rb') as file:
-            pdf_reader = pypdf.PdfReader(file)
-            pdf_text = ""
-            for page in pdf_reader.pages:
-                pdf_text += page.extract_text() + "\n"
-        return pdf_text
+        parts = []
+        total = 0
+        for _, page_text in iter_pdf_pages(pdf_path, page_range):
+            parts.append(page_text + "\n")
+            total += len(page_text) + 1
+            if max_chars is not None and total >= max_chars:
+                break
+        return "".join(parts)
     except Exception as e:
         return f"Error reading PDF: {str(e)}"
 
-def create_excel_from_summary(summary_text, excel_path, pdf_name):
-    """Create Excel file from agent summary using standardized JSON format"""
+def write_summary_excel(summary, excel_path, pdf_name):
+    """Write a validated summary dict as a one-row Excel file"""
     try:
-        import pandas as pd
-        import json
-        import re
-        
-        # Extract JSON from the summary text
-        json_match = re.search(r'```json\s*(\{.*?\})\s*```', summary_text, re.DOTALL)
-        if json_match:
-            json_str = json_match.group(1)
-            try:
-                data = json.loads(json_str)
-                
-                # Handle key_concepts whether it's a string or array
-                key_concepts = data.get('key_concepts', 'No key concepts provided')
-                if isinstance(key_concepts, list):
-                    key_concepts = '\n'.join(key_concepts)
-                
-                # Create DataFrame with the parsed data
-                df = pd.DataFrame({
-                    'Name': [data.get('article_title', pdf_name)],
-                    'Key concepts & Definitions': [key_concepts],
-                    'Relevance & Curiosity': [data.get('relevance', 'No relevance information provided')]
-                })
-                
-                df.to_excel(excel_path, index=False)
-                return True
-                
-            except json.JSONDecodeError as e:
-                print(f"JSON parsing error: {e}")
-                return False
-        else:
-            # Fallback: try to parse as plain text (old format)
-            print("No JSON format found, falling back to text parsing")
-            lines = summary_text.split('\n')
-            key_concepts = []
-            relevance = []
-            
-            # Parse summary text for key concepts and relevance
-            for line in lines:
-                line = line.strip()
-                if line and not line.startswith(('#', '*')):
-                    if len(line) > 10:  # Skip very short lines
-                        if 'concept' in line.lower() or 'definition' in line.lower():
-                            key_concepts.append(line)
-                        elif 'relevant' in line.lower() or 'interest' in line.lower():
-                            relevance.append(line)
-            
-            # Fallback if no specific sections found
-            if not key_concepts:
-                key_concepts = [summary_text[:500] + "..." if len(summary_text) > 500 else summary_text]
-            if not relevance:
-                relevance = ["Relevant to Livia's interests in AI and education"]
-            
-            # Create DataFrame and save to Excel
-            data = {
-                'Name': [pdf_name],
-                'Key concepts & Definitions': [' '.join(key_concepts[:3])],
-                'Relevance & Curiosity': [' '.join(relevance[:2])]
-            }
-            
-            df = pd.DataFrame(data)
-            df.to_excel(excel_path, index=False)
-            return True
-        
+        write_xlsx(summary, excel_path, pdf_name)
+        return True
     except Exception as e:
         print(f"Error creating Excel file: {e}")
         return False
 
-
-def create_reading_summary_task(agent, pdf_path, excel_path, interests):
-    """Create reading summarization task"""
-    # Convert PDF to text first
-    pdf_text = convert_pdf_to_text(pdf_path)
-    
-    # Create a temporary text file with the PDF content
-    temp_txt_path = pdf_path.replace('.pdf', '_temp.txt')
-    try:
-        with open(temp_txt_path, 'w', encoding='utf-8') as f:
-            f.write(pdf_text)
-    except Exception as e:
-        print(f"Warning: Could not create temp text file: {e}")
-        temp_txt_path = None
+def create_excel_from_summary(summary_text, excel_path, pdf_name, llm=None):
+    """Create Excel file from agent summary using standardized JSON format
     
-    # Create task description based on available options
-    if temp_txt_path:
-        task_description = f"""Read the text file located at {temp_txt_path}. It contains the content of a PDF article or book chapter about a subject within education. Then, generate an excel file at {excel_path} with a summary of the key concepts and what Livia would find relevant. Write like Livia would - natural and informal. Livia is interested in the following topics: {interests}. Use this information to determine what she would find relevant in the context of the reading.
+    If the answer does not contain a valid summary object and an LLM is given,
+    a single targeted repair call fixes the JSON instead of re-running the crew.
+    """
+    summary, errors = extract_summary(summary_text)
+    if summary is None and llm is not None:
+        summary = repair_summary(summary_text, errors, llm)
+    if summary is None:
+        print(f"Could not extract summary JSON: {'; '.join(errors)}")
+        return False
+    return write_summary_excel(summary, excel_path, pdf_name)
 
-IMPORTANT: Use the FileReadTool to read the text file at: {temp_txt_path}"""
-    else:
-        # Fallback: provide the text directly in the task description
-        task_description = f"""Analyze the following text content from a PDF article or book chapter about a subject within education. Generate an excel file at {excel_path} with a summary of the key concepts and what Livia would find relevant. Write like Livia would - natural and informal. Livia is interested in the following topics: {interests}. Use this information to determine what she would find relevant in the context of the reading.
 
-PDF Content:
-{pdf_text[:5000]}{'...' if len(pdf_text) > 5000 else ''}"""
-    
-    return Task(
-        description=task_description,
-        expected_output=f"""IMPORTANT: You must return your response in this EXACT format:
+SUMMARY_FORMAT_INSTRUCTIONS = """IMPORTANT: You must return your response in this EXACT format:
 
 ```json
-{{
+{
     "article_title": "Extract the actual article/chapter title from the PDF content (NOT the filename)",
     "key_concepts": "ONLY bullet points with key concepts and definitions - no introductory text",
     "relevance": "ONLY bullet points explaining relevance to Livia's interests - no introductory text"
-}}
+}
 ```
 
 CRITICAL REQUIREMENTS:
@@ -308,7 +251,90 @@ CRITICAL REQUIREMENTS:
 4. Each bullet point should be a complete, standalone statement
 5. Return ONLY the JSON format above - no additional text or explanations
 6. The JSON must be valid and parseable
-7. Both key_concepts and relevance must be STRINGS, not arrays""",
+7. Both key_concepts and relevance must be STRINGS, not arrays"""
+
+def select_relevant_passages(pdf_path, interests, page_range=None, token_budget=None):
+    """Rank the reading's passages against the interests and keep the best ones
+    
+    Returns a PassageSelection holding at most token_budget tokens (default RELEVANCE_TOKEN_BUDGET),
+    or None when the pre-filter is disabled.
+    """
+    token_budget = token_budget or relevance_budget_from_env()
+    if not token_budget:
+        return None
+    return select_passages(stream_pdf_chunks(pdf_path, page_range or page_range_from_env()), interests, token_budget)
+
+def create_reading_summary_task(agent, pdf_path, excel_path, interests, page_range=None, temp_files=None, passages=None):
+    """Create reading summarization task
+    
+    excel_path is only named in the prompt (None when the caller writes exports itself).
+    page_range limits which pages are extracted (e.g. "1-40"; default PDF_PAGE_RANGE or all pages).
+    passages is a selection from select_relevant_passages (made here when not given); it already
+    fits the token budget, so it is inlined in the task. With the pre-filter disabled the extracted
+    text is written to a file owned by temp_files (a TempFileManager the caller cleans up once the
+    crew has run); without one, the start of the text is inlined in the task.
+    """
+    page_range = page_range or page_range_from_env()
+    if passages is None:
+        try:
+            passages = select_relevant_passages(pdf_path, interests, page_range)
+        except Exception as e:
+            print(f"Warning: Could not rank passages: {e}")
+    
+    # Title and abstract come from the first pages only
+    try:
+        front_matter = extract_front_matter(pdf_path)
+    except Exception as e:
+        print(f"Warning: Could not read PDF front matter: {e}")
+        front_matter = {"title": None, "abstract": None}
+    hints = ""
+    if front_matter["title"]:
+        hints += f"\n\nThe title appears to be: {front_matter['title']}"
+    if front_matter["abstract"]:
+        hints += f"\nAbstract: {front_matter['abstract']}"
+    
+    # Stream the PDF text chunk by chunk into a temporary text file (never held in memory whole)
+    temp_txt_path = None
+    if passages is None and temp_files is not None:
+        temp_txt_path = temp_files.path('.txt')
+        try:
+            with open(temp_txt_path, 'w', encoding='utf-8') as f:
+                for chunk in stream_pdf_chunks(pdf_path, page_range):
+                    f.write(chunk)
+        except Exception as e:
+            print(f"Warning: Could not create temp text file: {e}")
+            if os.path.exists(temp_txt_path):
+                os.unlink(temp_txt_path)
+            temp_txt_path = None
+    
+    if passages is not None:
+        # Skipping the FileReadTool round trip also saves an LLM call
+        source = f"""Passages of the reading most relevant to Livia's interests ({len(passages.passages)} of {passages.total_passages}, in reading order):
+{passages.text}"""
+    elif temp_txt_path:
+        source = f"""The reading has been extracted to a text file. Use the FileReadTool to read the text file at: {temp_txt_path}"""
+    else:
+        # Fallback: provide the text directly in the task (only the pages needed are extracted)
+        pdf_text = convert_pdf_to_text(pdf_path, page_range, max_chars=5001)
+        source = f"""PDF Content:
+{pdf_text[:5000]}{'...' if len(pdf_text) > 5000 else ''}"""
+    
+    # Most stable first: instructions and schema are shared by every summary; the interests,
+    # which come from each request's form, and the reading go last (see processing/prompt_layout.py)
+    if not isinstance(interests, str):
+        interests = ", ".join(interests)
+    description = (
+        PromptBuilder()
+        .add(INSTRUCTIONS, "Analyze the content of a PDF article or book chapter about a subject within education. Generate an excel file with a summary of the key concepts and what Livia would find relevant. Write like Livia would - natural and informal. Use the topics Livia is interested in to determine what she would find relevant in the context of the reading.")
+        .add(SCHEMA, SUMMARY_FORMAT_INSTRUCTIONS)
+        .add(REQUEST, interests, label="Livia is interested in the following topics")
+        .add(REQUEST, "\n\n".join(filter(None, [f"Excel file: {excel_path}" if excel_path else "", hints.strip("\n"), source])))
+        .build()
+    )
+    
+    return Task(
+        description=description,
+        expected_output="ONLY the JSON object in the EXACT format described in the task, with article_title, key_concepts and relevance as strings.",
         agent=agent,
     )
 
@@ -323,46 +349,54 @@ INTERESTS = [
     "soft skill development",
 ]
 
+def configure_llm():
+    """Configure the LLM from LLM_TYPE (None means demo mode / no LLM available)"""
+    # LLM configuration: support OpenAI, Gemini, and default
+    llm = None
+    llm_type = os.environ.get("LLM_TYPE", "default").lower()
+    print(f"🔧 Using LLM: {llm_type.upper()}")
+    
+    if llm_type == "default":
+        # Use no LLM - just run the agents without AI
+        print("🔄 Running without LLM (demo mode)...")
+        print("✅ Running in demo mode")
+    
+    elif llm_type == "gemini":
+        # Configure Gemini LLM using LiteLLM format
+        gemini_model = os.environ.get("GEMINI_MODEL", "gemini-1.5-flash")
+        gemini_key = os.environ.get("GEMINI_API_KEY")
+        if not gemini_key:
+            print("⚠️  Warning: GEMINI_API_KEY not found. Falling back to Hugging Face.")
+        else:
+            # Set the API key for Google
+            os.environ["GOOGLE_API_KEY"] = gemini_key
+            # Use LiteLLM format for Gemini
+            llm = f"gemini/{gemini_model}"
+            print(f"✅ Gemini configured with model: {gemini_model}")
+    
+    elif llm_type == "openai":
+        # Configure OpenAI LLM
+        openai_model = os.environ.get("OPENAI_MODEL", "gpt-3.5-turbo")
+        openai_key = os.environ.get("OPENAI_API_KEY")
+        if not openai_key:
+            print("⚠️  Warning: OPENAI_API_KEY not found. Falling back to Hugging Face.")
+        else:
+            llm = ChatOpenAI(model_name=openai_model, openai_api_key=openai_key)
+            print(f"✅ OpenAI configured with model: {openai_model}")
+    
+    if llm is not None:
+        # Retry rate limits and provider hiccups per call instead of failing the whole crew
+        install_llm_retry()
+    return llm
+
 def main():
     """Main function to run the AI Agent Assistant"""
     print("🤖 Welcome to Livia's AI Agent Assistant!")
     print("=" * 50)
     
+    temp_files = TempFileManager(prefix="reading_")
     try:
-        # LLM configuration: support OpenAI, Gemini, and default
-        llm_type = os.environ.get("LLM_TYPE", "default").lower()
-        print(f"🔧 Using LLM: {llm_type.upper()}")
-        
-        if llm_type == "default":
-            # Use no LLM - just run the agents without AI
-            print("🔄 Running without LLM (demo mode)...")
-            llm = None
-            print("✅ Running in demo mode")
-        
-        elif llm_type == "gemini":
-            # Configure Gemini LLM using LiteLLM format
-            gemini_model = os.environ.get("GEMINI_MODEL", "gemini-1.5-flash")
-            gemini_key = os.environ.get("GEMINI_API_KEY")
-            if not gemini_key:
-                print("⚠️  Warning: GEMINI_API_KEY not found. Falling back to Hugging Face.")
-                llm_type = "huggingface"
-            else:
-                # Set the API key for Google
-                os.environ["GOOGLE_API_KEY"] = gemini_key
-                # Use LiteLLM format for Gemini
-                llm = f"gemini/{gemini_model}"
-                print(f"✅ Gemini configured with model: {gemini_model}")
-        
-        elif llm_type == "openai":
-            # Configure OpenAI LLM
-            openai_model = os.environ.get("OPENAI_MODEL", "gpt-3.5-turbo")
-            openai_key = os.environ.get("OPENAI_API_KEY")
-            if not openai_key:
-                print("⚠️  Warning: OPENAI_API_KEY not found. Falling back to Hugging Face.")
-                llm_type = "huggingface"
-            else:
-                llm = ChatOpenAI(model_name=openai_model, openai_api_key=openai_key)
-                print(f"✅ OpenAI configured with model: {openai_model}")
+        llm = configure_llm()
 
         # Load CV data
         cv_path = os.path.join(os.path.dirname(__file__), "resources", "cv.json")
@@ -372,9 +406,7 @@ def main():
             return
         
         try:
-            with open(cv_path, "r", encoding="utf-8") as f:
-                cv_data = json.load(f)
-                cv_text = json.dumps(cv_data, indent=2, ensure_ascii=False)
+            cv_text = ProfileCache(cv_path).get().prompt_text
         except Exception as e:
             print(f"❌ Error loading CV: {e}")
             return
@@ -431,7 +463,7 @@ def main():
         tasks = [create_interview_task(interviewer, cv_text, job_description)]
         
         if summarize_pdf:
-            tasks.append(create_reading_summary_task(reader, pdf_path, excel_path, interests=INTERESTS))
+            tasks.append(create_reading_summary_task(reader, pdf_path, excel_path, interests=INTERESTS, temp_files=temp_files))
 
         # Create and run crew
         print("\n🤖 Creating AI agents...")
@@ -492,27 +524,31 @@ def main():
         else:
             print("\n🚀 Launching AI crew...")
             try:
-                crew = Crew(
-                    agents=[interviewer, reader] if summarize_pdf else [interviewer],
-                    tasks=tasks,
-                    process=Process.sequential,
-                    verbose=True,
-                )
-
+                # Interview prep and reading summary share no data, so they run concurrently
                 print("🏃‍♀️ Running crew...")
-                result = crew.kickoff()
+                outcomes = run_independent_tasks(tasks, verbose=True)
 
                 print("\n" + "="*60)
                 print("🎉 CREW EXECUTION COMPLETED!")
                 print("="*60)
                 
+                interview_outcome = outcomes[0]
+                print(f"\n📝 INTERVIEW PREPARATION RESULTS ({interview_outcome['duration_s']:.1f}s):")
+                print("-" * 40)
+                if interview_outcome["error"]:
+                    print(f"❌ Interview preparation failed: {interview_outcome['error']}")
+                else:
+                    print(interview_outcome["output"])
+                
                 if summarize_pdf and excel_path:
-                    # Check if Excel file was created by the agent
-                    if os.path.exists(excel_path):
-                        print(f"✅ Excel file created successfully by agent: {excel_path}")
+                    summary_outcome = outcomes[1]
+                    print(f"\n📊 READING SUMMARY ({summary_outcome['duration_s']:.1f}s):")
+                    if summary_outcome["error"]:
+                        print(f"❌ Reading summary failed: {summary_outcome['error']}")
+                    elif create_excel_from_summary(summary_outcome["output"], excel_path, os.path.basename(pdf_path), llm=llm):
+                        print(f"✅ Excel file created: {excel_path}")
                     else:
-                        print(f"⚠️  Excel file not found at expected location: {excel_path}")
-                        print("The agent should have created the Excel file directly.")
+                        print("⚠️  Excel file could not be created from the summary")
                 
             except Exception as e:
                 print(f"❌ Error running crew: {e}")
@@ -523,6 +559,12 @@ def main():
     except Exception as e:
         print(f"\n❌ Unexpected error: {e}")
         print("Please check your setup and try again.")
+    finally:
+        temp_files.cleanup()
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        # Headless mode: python main.py batch --manifest jobs.json --pdf-dir readings/
+        from batch import batch_main
+        sys.exit(batch_main(sys.argv[2:]))
     main()
\ No newline at end of file
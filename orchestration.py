@@ -0,0 +1,194 @@
+"""
+Run crewai tasks with checkpoints, retries and concurrency
+run_crew saves each task's output as it finishes and, when a job fails on a transient provider
+error, retries it with backoff starting after the last finished task. Tasks linked through
+`context` stay together in one sequential crew; unrelated groups run in parallel, so wall time
+is roughly the slowest group instead of the sum of all LLM calls.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from crewai import Crew, Process
+from crewai.tasks.task_output import TaskOutput
+from crewai.utilities.constants import NOT_SPECIFIED
+
+from processing.llm_retry import RetryPolicy, installed_policy, is_transient
+
+
+def _dependencies(task):
+    """Tasks whose output `task` explicitly uses as context"""
+    context = getattr(task, "context", None)
+    return context if isinstance(context, list) else []
+
+
+def group_independent_tasks(tasks):
+    """
+    Split tasks into groups with no data dependency between groups
+
+    Only explicit `context` links count as dependencies; tasks in a group keep
+    their original order.
+
+    Returns:
+        List of task lists
+    """
+    parent = {id(task): id(task) for task in tasks}
+
+    def find(key):
+        while parent[key] != key:
+            parent[key] = parent[parent[key]]
+            key = parent[key]
+        return key
+
+    for task in tasks:
+        for dependency in _dependencies(task):
+            if id(dependency) in parent:
+                parent[find(id(task))] = find(id(dependency))
+
+    groups = {}
+    for task in tasks:
+        groups.setdefault(find(id(task)), []).append(task)
+    return list(groups.values())
+
+
+def _agents_of(tasks):
+    """Distinct agents of the tasks, in task order"""
+    agents = []
+    for task in tasks:
+        if task.agent is not None and task.agent not in agents:
+            agents.append(task.agent)
+    return agents
+
+
+def _restore_output(task, text):
+    """Give a checkpointed task its output back, so later tasks can use it as context"""
+    task.output = TaskOutput(
+        description=task.description,
+        name=task.name,
+        expected_output=task.expected_output,
+        raw=text,
+        agent=task.agent.role if task.agent is not None else "",
+    )
+
+
+def run_crew(tasks, agents=None, verbose=False, job_key=None, checkpoints=None, policy=None):
+    """
+    Run tasks as one sequential crew, resuming from checkpoints and retrying transient failures
+
+    Every finished task's output is kept (in `checkpoints` when given, otherwise only for the
+    retries of this call). A rerun skips those tasks: their outputs are restored and passed to
+    the remaining tasks as the context a sequential crew would have given them.
+
+    Args:
+        tasks: crewai Tasks in execution order (with agents assigned)
+        agents: Crew agents (default: the tasks' agents)
+        verbose: Passed to the Crew
+        job_key: Identifies the job in `checkpoints` (same inputs and model -> same key)
+        checkpoints: TaskCheckpointStore, or None to keep checkpoints in memory only
+        policy: RetryPolicy; its job_retries sets how often the crew is rerun
+
+    Returns:
+        {"output": last task's text, "task_outputs": text per task, "result": CrewOutput of the
+        final run (None if every task came from checkpoints), "resumed": tasks taken from
+        checkpoints, "attempts": crew runs}
+
+    Raises:
+        The crew's error when it is not transient or job retries are exhausted
+    """
+    policy = policy or installed_policy() or RetryPolicy.from_env()
+    saved = dict(checkpoints.load(job_key)) if checkpoints is not None and job_key else {}
+    resumed = sum(1 for index in range(len(tasks)) if index in saved)
+
+    def on_task_done(task_output):
+        for index, task in enumerate(tasks):
+            if task.output is task_output and index not in saved:
+                saved[index] = str(task_output.raw)
+                if checkpoints is not None and job_key:
+                    checkpoints.save(job_key, index, saved[index], task.name)
+                break
+
+    result = None
+    attempts = 0
+    while True:
+        remaining = [index for index in range(len(tasks)) if index not in saved]
+        if not remaining:
+            break
+        for index, task in enumerate(tasks):
+            if index in saved:
+                _restore_output(task, saved[index])
+            elif task.context is NOT_SPECIFIED and any(done < index for done in saved):
+                # Resuming mid-sequence: the skipped tasks are not among this crew's outputs
+                task.context = tasks[:index]
+        run_tasks = [tasks[index] for index in remaining]
+        attempts += 1
+        try:
+            crew = Crew(agents=agents or _agents_of(run_tasks), tasks=run_tasks, process=Process.sequential,
+                        verbose=verbose, task_callback=on_task_done)
+            result = crew.kickoff()
+        except Exception as e:
+            if attempts > policy.job_retries or not is_transient(e):
+                if attempts > 1:
+                    policy.count("gave_up")
+                raise
+            wait = policy.delay(attempts - 1)
+            policy.count("retried")
+            print(f"🔁 Crew run failed after {len(saved)}/{len(tasks)} tasks ({type(e).__name__}: {str(e)[:200]}); "
+                  f"resuming in {wait:.1f}s")
+            time.sleep(wait)
+            continue
+
+        task_outputs = list(getattr(result, "tasks_output", None) or [])
+        for position, index in enumerate(remaining):
+            if index not in saved:
+                task_output = task_outputs[position] if position < len(task_outputs) else None
+                saved[index] = str(task_output.raw if task_output is not None else result)
+                if checkpoints is not None and job_key:
+                    checkpoints.save(job_key, index, saved[index], tasks[index].name)
+        if attempts > 1:
+            policy.count("recovered")
+        break
+
+    if resumed:
+        print(f"♻️ Resumed {resumed}/{len(tasks)} tasks from checkpoints")
+    outputs = [saved[index] for index in range(len(tasks))]
+    return {"output": outputs[-1] if outputs else "", "task_outputs": outputs, "result": result,
+            "resumed": resumed, "attempts": attempts}
+
+
+def _run_group(group, verbose):
+    """Run one group as its own sequential crew and return per-task outcomes"""
+    started = time.perf_counter()
+    try:
+        run = run_crew(group, verbose=verbose)
+        duration = time.perf_counter() - started
+        return [{"task": task, "output": text, "error": None, "duration_s": duration}
+                for task, text in zip(group, run["task_outputs"])]
+    except Exception as e:
+        duration = time.perf_counter() - started
+        return [{"task": task, "output": None, "error": str(e), "duration_s": duration} for task in group]
+
+
+def run_independent_tasks(tasks, verbose=False, max_workers=None):
+    """
+    Run tasks with independent groups in parallel threads
+
+    A failure in one group does not affect the others: each task's outcome
+    carries either its output or the error of the crew that ran it.
+
+    Args:
+        tasks: crewai Tasks (with agents assigned)
+        verbose: Passed to each Crew
+        max_workers: Maximum groups in flight (default: one thread per group)
+
+    Returns:
+        List of {"task", "output", "error", "duration_s"} dicts in the original task order
+    """
+    groups = group_independent_tasks(tasks)
+    if len(groups) == 1:
+        outcomes = _run_group(groups[0], verbose)
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers or len(groups)) as pool:
+            futures = [pool.submit(_run_group, group, verbose) for group in groups]
+            outcomes = [outcome for future in futures for outcome in future.result()]
+
+    order = {id(task): index for index, task in enumerate(tasks)}
+    return sorted(outcomes, key=lambda outcome: order[id(outcome["task"])])
@@ -0,0 +1 @@
+# Text processing modules for AI Agents
@@ -0,0 +1,183 @@
+"""
+Retry transient LLM provider errors with jittered exponential backoff
+crewai does not retry provider (LiteLLM) errors, so one rate limit or 503 anywhere in a crew run
+used to fail the whole job. install_llm_retry wraps crewai's LLM.call so each provider call is
+retried on its own, and call_with_retry does the same for any other callable.
+"""
+import os
+import random
+import re
+import threading
+import time
+from typing import Callable, Optional
+
+# HTTP statuses worth retrying: timeouts, rate limits and server-side failures
+TRANSIENT_STATUS_CODES = {408, 409, 425, 429, 500, 502, 503, 504, 529}
+
+# LiteLLM / OpenAI / httpx exception class names that mean "try again later"
+TRANSIENT_ERROR_NAMES = {
+    "RateLimitError", "APIConnectionError", "APITimeoutError", "Timeout", "TimeoutError",
+    "ServiceUnavailableError", "InternalServerError", "ConnectionError", "ConnectTimeout",
+    "ReadTimeout", "RemoteProtocolError", "ResourceExhausted", "DeadlineExceeded",
+}
+
+# Never retried: the request itself is wrong and would fail the same way again
+PERMANENT_ERROR_NAMES = {
+    "AuthenticationError", "PermissionDeniedError", "BadRequestError", "NotFoundError",
+    "ContextWindowExceededError", "LLMContextLengthExceededException", "ContentPolicyViolationError",
+    "UnsupportedParamsError", "InvalidRequestError",
+}
+
+# Fallback for errors re-raised as plain Exceptions (e.g. crewai's streaming path): whole phrases,
+# and status codes only where the message labels them as one ("status 503", "error code: 429")
+_TRANSIENT_MESSAGE_RE = re.compile(
+    r"\b(?:rate ?limit(?:ed)?|too many requests|overloaded|temporarily unavailable|service unavailable"
+    r"|timed out|read timeout|connect timeout|connection (?:reset|aborted|refused)|bad gateway"
+    r"|gateway timeout|internal server error|resource exhausted)\b"
+)
+_STATUS_IN_MESSAGE_RE = re.compile(r"\b(?:status(?: code)?|error code|http(?: error)?)\W{0,3}(\d{3})\b")
+
+
+def _error_chain(error: BaseException):
+    """The error and the errors it was raised from, outermost first"""
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        yield error
+        error = error.__cause__ or error.__context__
+
+
+def is_transient(error: BaseException) -> bool:
+    """Whether an LLM call failing with this error is worth retrying"""
+    for link in _error_chain(error):
+        names = {cls.__name__ for cls in type(link).__mro__}
+        if names & PERMANENT_ERROR_NAMES:
+            return False
+        if names & TRANSIENT_ERROR_NAMES:
+            return True
+        status = getattr(link, "status_code", None) or getattr(getattr(link, "response", None), "status_code", None)
+        if isinstance(status, int):
+            return status in TRANSIENT_STATUS_CODES
+    message = str(error).lower()
+    if _TRANSIENT_MESSAGE_RE.search(message):
+        return True
+    return any(int(code) in TRANSIENT_STATUS_CODES for code in _STATUS_IN_MESSAGE_RE.findall(message))
+
+
+class RetryPolicy:
+    """How often and how long to back off before giving up on a transient error"""
+
+    def __init__(self, retries: int = 3, base_seconds: float = 1.0, max_seconds: float = 20.0,
+                 job_retries: int = 1):
+        """
+        Args:
+            retries: Extra attempts per LLM call (0 disables retrying)
+            base_seconds: Backoff ceiling of the first retry; doubles with every retry
+            max_seconds: Largest backoff ceiling
+            job_retries: Extra attempts of a whole crew run, which resume from its checkpoints
+        """
+        self.retries = max(0, retries)
+        self.base_seconds = base_seconds
+        self.max_seconds = max_seconds
+        self.job_retries = max(0, job_retries)
+        self.stats = {"retried": 0, "recovered": 0, "gave_up": 0}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "RetryPolicy":
+        """Policy from LLM_RETRIES, LLM_RETRY_BASE_SECONDS, LLM_RETRY_MAX_SECONDS and LLM_JOB_RETRIES"""
+        return cls(
+            retries=int(os.environ.get("LLM_RETRIES", 3)),
+            base_seconds=float(os.environ.get("LLM_RETRY_BASE_SECONDS", 1.0)),
+            max_seconds=float(os.environ.get("LLM_RETRY_MAX_SECONDS", 20.0)),
+            job_retries=int(os.environ.get("LLM_JOB_RETRIES", 1)),
+        )
+
+    def delay(self, attempt: int) -> float:
+        """
+        Seconds to wait before retry number `attempt` (starting at 0)
+
+        "Full jitter": uniform between 0 and the exponential ceiling, so callers that failed
+        together (one provider outage) do not all come back at the same moment.
+        """
+        return random.uniform(0, min(self.max_seconds, self.base_seconds * (2 ** attempt)))
+
+    def count(self, key: str) -> None:
+        """Bump one of the retry counters"""
+        with self._lock:
+            self.stats[key] += 1
+
+    def status(self) -> dict:
+        """Settings plus retry counters"""
+        with self._lock:
+            return dict(self.stats, retries=self.retries, job_retries=self.job_retries,
+                        base_seconds=self.base_seconds, max_seconds=self.max_seconds)
+
+
+def call_with_retry(fn: Callable, *args, policy: Optional[RetryPolicy] = None, label: str = "LLM call",
+                    retries: Optional[int] = None, **kwargs):
+    """
+    Call fn, retrying transient errors with jittered exponential backoff
+
+    Args:
+        policy: Backoff settings (default: the installed policy, or RetryPolicy.from_env())
+        label: Name used in log lines
+        retries: Override policy.retries (e.g. policy.job_retries for whole jobs)
+
+    Raises:
+        The last error once retries are exhausted, or a non-transient error immediately
+    """
+    policy = policy or _installed_policy or RetryPolicy.from_env()
+    retries = policy.retries if retries is None else retries
+    attempt = 0
+    while True:
+        try:
+            result = fn(*args, **kwargs)
+            if attempt:
+                policy.count("recovered")
+            return result
+        except Exception as e:
+            if attempt >= retries or not is_transient(e):
+                if attempt:
+                    policy.count("gave_up")
+                raise
+            wait = policy.delay(attempt)
+            attempt += 1
+            policy.count("retried")
+            print(f"🔁 {label} failed ({type(e).__name__}: {str(e)[:200]}); retry {attempt}/{retries} in {wait:.1f}s")
+            time.sleep(wait)
+
+
+_installed_policy = None
+_install_lock = threading.Lock()
+
+
+def install_llm_retry(policy: Optional[RetryPolicy] = None) -> RetryPolicy:
+    """
+    Retry every crewai LLM.call (all agents and summary repairs go through it)
+
+    Safe to call more than once; the latest policy wins.
+
+    Returns:
+        The active policy
+    """
+    global _installed_policy
+    from crewai.llm import LLM
+
+    with _install_lock:
+        _installed_policy = policy or _installed_policy or RetryPolicy.from_env()
+        if not getattr(LLM.call, "_retrying", False):
+            original_call = LLM.call
+
+            def call(self, *args, **kwargs):
+                return call_with_retry(original_call, self, *args, policy=_installed_policy,
+                                       label=f"LLM call ({self.model})", **kwargs)
+
+            call._retrying = True
+            LLM.call = call
+    return _installed_policy
+
+
+def installed_policy() -> Optional[RetryPolicy]:
+    """The policy set by install_llm_retry, if any"""
+    return _installed_policy
@@ -0,0 +1,83 @@
+"""
+MinHash signatures and LSH banding for near-duplicate text detection
+"""
+import hashlib
+import re
+from typing import Optional
+
+import numpy as np
+
+NUM_PERM = 128
+BANDS = 32
+ROWS_PER_BAND = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+
+# Fixed seed: signatures must be comparable across processes and restarts
+_rng = np.random.RandomState(1)
+_A = _rng.randint(1, 1 << 32, size=NUM_PERM, dtype=np.uint64)
+_B = _rng.randint(0, 1 << 32, size=NUM_PERM, dtype=np.uint64)
+
+_WORD_RE = re.compile(r"[a-z]+|\d+")
+_SEGMENT_RE = re.compile(r"[\r\n]+|[.;!?](?:\s+|$)")
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> set:
+    """
+    Word n-grams of normalized text
+
+    Shingles never span a line or sentence boundary, so reordered bullets produce the
+    same set; case, punctuation, whitespace and standalone numbers (dates, counts,
+    salaries) are ignored, so small edits change only a few shingles.
+    """
+    result = set()
+    for segment in _SEGMENT_RE.split((text or "").lower()):
+        words = [w for w in _WORD_RE.findall(segment) if not w.isdigit()]
+        if 0 < len(words) < size:
+            result.add(" ".join(words))
+        result.update(" ".join(words[i:i + size]) for i in range(len(words) - size + 1))
+    return result
+
+
+def minhash_signature(text: str) -> Optional[np.ndarray]:
+    """
+    Compute a NUM_PERM-value MinHash signature (uint32) of a text
+
+    Returns:
+        None when the text has no word shingles (e.g. only numbers or punctuation): such texts
+        would all share one signature and look identical
+    """
+    items = shingles(text)
+    if not items:
+        return None
+    hashes = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "little") for s in items),
+        dtype=np.uint64,
+        count=len(items),
+    )
+    # (a * h + b) mod p for every shingle x permutation at once; a, h < 2^32 so no overflow
+    permuted = (np.outer(hashes, _A) + _B) % _MERSENNE_PRIME
+    return np.bitwise_and(permuted, _MAX_HASH).min(axis=0).astype(np.uint32)
+
+
+def estimate_similarity(sig_a: np.ndarray, sig_b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of the shingle sets behind two signatures"""
+    return float(np.mean(sig_a == sig_b))
+
+
+def band_keys(signature: np.ndarray) -> list:
+    """LSH bucket keys: texts sharing any key are candidate near-duplicates"""
+    rows = signature.reshape(BANDS, ROWS_PER_BAND)
+    return [f"{band}:{hashlib.blake2b(row.tobytes(), digest_size=8).hexdigest()}" for band, row in enumerate(rows)]
+
+
+def signature_to_bytes(signature: np.ndarray) -> bytes:
+    """Serialize a signature for storage"""
+    return signature.astype("<u4").tobytes()
+
+
+def signature_from_bytes(data: bytes) -> np.ndarray:
+    """Deserialize a stored signature"""
+    return np.frombuffer(data, dtype="<u4").astype(np.uint32)
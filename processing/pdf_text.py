@@ -0,0 +1,173 @@
+"""
+Lazy PDF text extraction
+Pages are parsed only when iterated, so the title and abstract come from the first pages
+without touching the rest of a large book, and whole textbooks stream through in bounded memory.
+"""
+import os
+import re
+from typing import Iterator, Optional, Tuple
+
+FRONT_MATTER_PAGES = 2
+MAX_ABSTRACT_CHARS = 1500
+DEFAULT_CHUNK_CHARS = 20000
+DEFAULT_MEMORY_LIMIT_MB = float(os.environ.get("PDF_MEMORY_LIMIT_MB", 64))
+
+_SKIP_LINE_RE = re.compile(r"(https?://|www\.|doi|@|©|copyright|issn|isbn|vol\.|volume \d|pp\.|page \d)", re.IGNORECASE)
+_ABSTRACT_RE = re.compile(r"\babstract\b[\s:.\-—–]*", re.IGNORECASE)
+_ABSTRACT_END_RE = re.compile(r"\n\s*(keywords?|key words|introduction|1\.?\s+introduction|background)\b", re.IGNORECASE)
+_GENERATED_TITLE_RE = re.compile(r"^(microsoft (word|powerpoint)|untitled)|\.(docx?|pdf|tex|indd)$", re.IGNORECASE)
+
+
+def parse_page_range(spec) -> Tuple[int, Optional[int]]:
+    """
+    Parse a 1-based inclusive page range into 0-based slice bounds
+
+    Accepts "5", "3-20", "-10" (first ten pages), "40-" (page 40 to the end),
+    a (first, last) tuple, or None/"" for every page.
+
+    Returns:
+        (start, stop) where stop is None for "until the last page"
+    """
+    if spec is None or spec == "":
+        return 0, None
+    if isinstance(spec, (tuple, list)):
+        first, last = spec
+    else:
+        text = str(spec).strip()
+        if "-" in text:
+            first, last = (part.strip() or None for part in text.split("-", 1))
+        else:
+            first = last = text
+    start = max(int(first) - 1, 0) if first else 0
+    stop = int(last) if last else None
+    if stop is not None and stop <= start:
+        raise ValueError(f"Invalid page range: {spec}")
+    return start, stop
+
+
+def _rss_bytes() -> Optional[int]:
+    """Current resident set size, or None where /proc is unavailable"""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def iter_pdf_pages(pdf_path: str, page_range=None, memory_limit_mb: Optional[float] = None) -> Iterator[Tuple[int, str]]:
+    """
+    Yield (page_number, text) one page at a time
+
+    Args:
+        pdf_path: PDF file
+        page_range: Pages to extract (see parse_page_range); default every page
+        memory_limit_mb: Growth allowed before pypdf's parsed-object cache is dropped
+            (default PDF_MEMORY_LIMIT_MB); without this the cache keeps every page parsed so far
+
+    The file stays open only while the iterator is alive; stop iterating early to
+    skip the remaining pages entirely.
+    """
+    import pypdf
+
+    limit = (memory_limit_mb if memory_limit_mb is not None else DEFAULT_MEMORY_LIMIT_MB) * 1024 * 1024
+    start, stop = parse_page_range(page_range)
+    with open(pdf_path, "rb") as file:
+        reader = pypdf.PdfReader(file)
+        stop = len(reader.pages) if stop is None else min(stop, len(reader.pages))
+        baseline = _rss_bytes()
+        for index in range(start, stop):
+            text = reader.pages[index].extract_text() or ""
+            rss = _rss_bytes()
+            if rss is None or rss - baseline > limit:
+                reader.resolved_objects.clear()
+            yield index + 1, text
+
+
+def stream_pdf_chunks(pdf_path: str, page_range=None, chunk_chars: int = DEFAULT_CHUNK_CHARS,
+                      memory_limit_mb: Optional[float] = None) -> Iterator[str]:
+    """
+    Yield the document text in chunks of about chunk_chars characters
+
+    At most one chunk (plus the current page) is held in memory, so callers can write
+    or process arbitrarily large books without building the full text.
+    """
+    buffer = []
+    size = 0
+    for _, page_text in iter_pdf_pages(pdf_path, page_range, memory_limit_mb):
+        buffer.append(page_text + "\n")
+        size += len(page_text) + 1
+        while size >= chunk_chars:
+            text = "".join(buffer)
+            cut = text.rfind("\n", 0, chunk_chars) + 1 or chunk_chars
+            yield text[:cut]
+            buffer = [text[cut:]]
+            size = len(buffer[0])
+    if size:
+        yield "".join(buffer)
+
+
+def count_pages(pdf_path: str) -> int:
+    """Number of pages, without extracting any text"""
+    import pypdf
+
+    with open(pdf_path, "rb") as file:
+        return len(pypdf.PdfReader(file).pages)
+
+
+def _metadata_title(pdf_path: str) -> Optional[str]:
+    """Title from the document info, unless it is empty or an authoring-tool artefact"""
+    import pypdf
+
+    try:
+        with open(pdf_path, "rb") as file:
+            metadata = pypdf.PdfReader(file).metadata
+        title = (metadata.title or "").strip() if metadata else ""
+    except Exception:
+        return None
+    if len(title) < 4 or _GENERATED_TITLE_RE.search(title):
+        return None
+    return title
+
+
+def _title_from_text(text: str) -> Optional[str]:
+    """First line that looks like a heading: a few words, no running-header noise"""
+    for line in text.splitlines():
+        line = line.strip()
+        words = line.split()
+        if not 2 <= len(words) <= 25 or _SKIP_LINE_RE.search(line):
+            continue
+        if not re.search(r"[A-Za-z]{3}", line) or line.endswith((".", ",", ";")):
+            continue
+        return line
+    return None
+
+
+def _abstract_from_text(text: str) -> Optional[str]:
+    """Text after an "Abstract" heading, up to keywords/introduction"""
+    match = _ABSTRACT_RE.search(text)
+    if not match:
+        return None
+    rest = text[match.end():]
+    end = _ABSTRACT_END_RE.search(rest)
+    abstract = " ".join(rest[:end.start() if end else MAX_ABSTRACT_CHARS].split())
+    return abstract[:MAX_ABSTRACT_CHARS] or None
+
+
+def extract_front_matter(pdf_path: str, max_pages: int = FRONT_MATTER_PAGES) -> dict:
+    """
+    Detect the title and abstract from the first pages only
+
+    Returns:
+        {"title", "abstract", "page_count"}; title/abstract are None when not found
+    """
+    front_text = "\n".join(text for _, text in iter_pdf_pages(pdf_path, (1, max_pages)))
+    return {
+        "title": _metadata_title(pdf_path) or _title_from_text(front_text),
+        "abstract": _abstract_from_text(front_text),
+        "page_count": count_pages(pdf_path),
+    }
+
+
+def page_range_from_env() -> Optional[str]:
+    """Default page range for summaries (PDF_PAGE_RANGE, e.g. "1-40")"""
+    return os.environ.get("PDF_PAGE_RANGE") or None
@@ -0,0 +1,56 @@
+"""
+Cache-friendly prompt layout
+Providers cache prompts by exact prefix, so sections are ordered from most to least stable:
+instructions, then the candidate profile, then output schema, then the per-request inputs.
+Anything that changes per request placed early (interests, file paths) would make every
+later token a cache miss.
+"""
+from typing import Optional
+
+# Stability ranks, most stable first
+INSTRUCTIONS = 0
+PROFILE = 1
+SCHEMA = 2
+REQUEST = 3
+
+
+class PromptBuilder:
+    """Collect prompt sections and render them in stability order"""
+
+    def __init__(self):
+        self._sections = []
+
+    def add(self, rank: int, text: str, label: Optional[str] = None) -> "PromptBuilder":
+        """
+        Add a section
+
+        Args:
+            rank: INSTRUCTIONS, PROFILE, SCHEMA or REQUEST
+            text: Section body (skipped when empty)
+            label: Optional heading rendered as "label:" above the body
+        """
+        if text:
+            self._sections.append((rank, f"{label}:\n{text}" if label else text))
+        return self
+
+    def prefix(self, upto: int = SCHEMA) -> str:
+        """The part of the prompt shared by requests that agree on every section up to `upto`"""
+        return "\n\n".join(text for rank, text in sorted(self._sections, key=lambda s: s[0]) if rank <= upto)
+
+    def build(self) -> str:
+        """Render all sections; order within a rank is the order they were added"""
+        return self.prefix(REQUEST)
+
+
+def cache_usage(result) -> dict:
+    """
+    Prompt-cache statistics from a crew result's token usage
+
+    Returns:
+        {"input_tokens", "cached_input_tokens", "cached_share"} (values None when not reported)
+    """
+    usage = getattr(result, "token_usage", None)
+    prompt_tokens = getattr(usage, "prompt_tokens", None)
+    cached = getattr(usage, "cached_prompt_tokens", None)
+    share = round(cached / prompt_tokens, 3) if prompt_tokens and cached is not None else None
+    return {"input_tokens": prompt_tokens, "cached_input_tokens": cached, "cached_share": share}
@@ -0,0 +1,215 @@
+"""
+Relevance pre-filter for reading passages
+The extracted text is split into passages, each scored against every interest with BM25
+(vectorized over passages with NumPy), and only the best passages up to a token budget
+are sent to the summary task. Passage text is spooled to a temporary file while scoring,
+so whole textbooks are ranked in bounded memory.
+"""
+import os
+import re
+import tempfile
+from collections import Counter
+from typing import Iterable, List, Optional
+
+import numpy as np
+
+DEFAULT_TOKEN_BUDGET = 6000
+MIN_PASSAGE_WORDS = 40
+MAX_PASSAGE_WORDS = 250
+CHARS_PER_TOKEN = 4
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[-'][a-z0-9]+)*")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in into is it its of on or that the their this to was were "
+    "with".split()
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token for English prose)"""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def _stem(word: str) -> str:
+    """Light suffix stripping so "communities"/"community" and "edtechs"/"edtech" match"""
+    if len(word) > 4 and word.endswith("ies"):
+        word = word[:-3] + "y"
+    elif len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        word = word[:-1]
+    if len(word) > 5 and word.endswith("ing"):
+        word = word[:-3]
+    elif len(word) > 4 and word.endswith("ed"):
+        word = word[:-2]
+    if len(word) > 4 and word.endswith("e"):
+        word = word[:-1]
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased, lightly stemmed terms without stopwords"""
+    return [_stem(word) for word in _TOKEN_RE.findall(text.lower()) if word not in _STOPWORDS]
+
+
+def split_passages(chunks: Iterable[str], min_words: int = MIN_PASSAGE_WORDS,
+                   max_words: int = MAX_PASSAGE_WORDS) -> Iterable[str]:
+    """
+    Group streamed text into passages
+
+    Paragraph breaks (blank lines) end a passage once it has min_words; PDF text often
+    has none, so a passage is also cut at the first line break after max_words.
+    """
+    lines, words, carry = [], 0, ""
+    for chunk in chunks:
+        *complete, carry = (carry + chunk).split("\n")
+        for line in complete:
+            stripped = line.strip()
+            if not stripped:
+                if words >= min_words:
+                    yield "\n".join(lines)
+                    lines, words = [], 0
+                continue
+            lines.append(stripped)
+            words += len(stripped.split())
+            if words >= max_words:
+                yield "\n".join(lines)
+                lines, words = [], 0
+    if carry.strip():
+        lines.append(carry.strip())
+    if lines:
+        yield "\n".join(lines)
+
+
+class PassageSelection:
+    """Passages chosen for the summary, in document order, with their scores"""
+
+    def __init__(self, passages: list, total_passages: int, total_tokens: int, token_budget: int):
+        self.passages = passages
+        self.total_passages = total_passages
+        self.total_tokens = total_tokens
+        self.token_budget = token_budget
+
+    @property
+    def text(self) -> str:
+        """Selected passages joined, marking gaps where passages were left out"""
+        parts = []
+        previous = -1
+        for passage in self.passages:
+            if parts and passage["index"] != previous + 1:
+                parts.append("[...]")
+            parts.append(passage["text"])
+            previous = passage["index"]
+        return "\n\n".join(parts)
+
+    @property
+    def selected_tokens(self) -> int:
+        return sum(passage["tokens"] for passage in self.passages)
+
+    def report(self) -> dict:
+        """JSON-serializable scores without the passage text"""
+        return {
+            "token_budget": self.token_budget,
+            "total_passages": self.total_passages,
+            "total_tokens": self.total_tokens,
+            "selected_tokens": self.selected_tokens,
+            "passages": [{key: value for key, value in passage.items() if key != "text"}
+                         for passage in self.passages],
+        }
+
+
+def bm25_scores(term_counts: np.ndarray, lengths: np.ndarray, query: np.ndarray,
+                k1: float = 1.5, b: float = 0.75) -> np.ndarray:
+    """
+    BM25 score of every passage for every query
+
+    Args:
+        term_counts: (passages, terms) occurrences of each query term in each passage
+        lengths: (passages,) passage lengths in terms
+        query: (terms, queries) how often each term appears in each query
+
+    Returns:
+        (passages, queries) scores
+    """
+    n = len(lengths)
+    document_frequency = np.count_nonzero(term_counts, axis=0)
+    idf = np.log1p((n - document_frequency + 0.5) / (document_frequency + 0.5))
+    norm = k1 * (1 - b + b * lengths / max(float(lengths.mean()), 1.0))
+    weights = term_counts * (k1 + 1) / (term_counts + norm[:, None]) * idf
+    return weights @ query
+
+
+def select_passages(chunks: Iterable[str], interests, token_budget: int = DEFAULT_TOKEN_BUDGET) -> PassageSelection:
+    """
+    Keep the passages most relevant to the interests, up to token_budget
+
+    Text that already fits the budget is kept whole. Budget left after the matching passages
+    goes to the others in document order (so the opening passages when nothing matches).
+    """
+    if isinstance(interests, str):
+        interests = [interest.strip() for interest in interests.split(",") if interest.strip()]
+    interests = [interest for interest in interests if tokenize(interest)]
+
+    vocabulary = sorted({term for interest in interests for term in tokenize(interest)})
+    columns = {term: column for column, term in enumerate(vocabulary)}
+    query = np.zeros((len(vocabulary), len(interests)), dtype=np.float32)
+    for column, interest in enumerate(interests):
+        for term in tokenize(interest):
+            query[columns[term], column] += 1
+
+    rows, lengths, offsets = [], [], []
+    with tempfile.TemporaryFile() as spool:
+        for passage in split_passages(chunks):
+            terms = tokenize(passage)
+            counts = Counter(term for term in terms if term in columns)
+            row = np.zeros(len(vocabulary), dtype=np.float32)
+            for term, count in counts.items():
+                row[columns[term]] = count
+            rows.append(row)
+            lengths.append(len(terms))
+            data = passage.encode("utf-8")
+            offsets.append((spool.tell(), len(data), estimate_tokens(passage)))
+            spool.write(data)
+
+        tokens = np.array([size for _, _, size in offsets], dtype=np.int64)
+        total_tokens = int(tokens.sum())
+        if rows and vocabulary:
+            per_interest = bm25_scores(np.vstack(rows), np.array(lengths, dtype=np.float32), query)
+        else:
+            per_interest = np.zeros((len(rows), len(interests)), dtype=np.float32)
+        scores = per_interest.sum(axis=1)
+
+        if total_tokens <= token_budget:
+            chosen = np.arange(len(rows))
+        else:
+            # Best first, then the unmatched passages in document order (the opening passages when
+            # nothing matches), so a reading that barely mentions the interests still fills the budget.
+            # A passage that would overflow the budget is skipped; smaller ones may still fit
+            ranked = np.argsort(-scores, kind="stable")
+            chosen = _greedy_fill(ranked, tokens, token_budget)
+
+        passages = []
+        for index in sorted(int(i) for i in chosen):
+            start, size, passage_tokens = offsets[index]
+            spool.seek(start)
+            passages.append({
+                "index": index,
+                "score": round(float(scores[index]), 3),
+                "interests": [interests[column] for column in np.flatnonzero(per_interest[index] > 0)],
+                "tokens": passage_tokens,
+                "text": spool.read(size).decode("utf-8"),
+            })
+    return PassageSelection(passages, len(rows), total_tokens, token_budget)
+
+
+def _greedy_fill(ranked: np.ndarray, tokens: np.ndarray, token_budget: int) -> np.ndarray:
+    """Take passages in rank order while they fit in the remaining budget"""
+    chosen, used = [], 0
+    for index in ranked:
+        if used + tokens[index] <= token_budget:
+            chosen.append(index)
+            used += tokens[index]
+    return np.array(chosen, dtype=np.int64)
+
+
+def relevance_budget_from_env() -> Optional[int]:
+    """Token budget for reading text (RELEVANCE_TOKEN_BUDGET, default 6000; 0 disables the pre-filter)"""
+    return int(os.environ.get("RELEVANCE_TOKEN_BUDGET", DEFAULT_TOKEN_BUDGET)) or None
@@ -0,0 +1,60 @@
+"""
+Export a structured reading summary as an Excel workbook, CSV or JSON
+The web app stores the summary once and writes a format only when it is first downloaded.
+"""
+import csv
+import json
+from collections import OrderedDict
+
+# Format -> (file extension, mimetype)
+EXPORT_FORMATS = {
+    "xlsx": (".xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "csv": (".csv", "text/csv"),
+    "json": (".json", "application/json"),
+}
+
+
+def summary_row(summary: dict, pdf_name: str) -> OrderedDict:
+    """The one-row table shared by every format (column names as in the Excel reports)"""
+    return OrderedDict([
+        ("Name", summary.get("article_title") or pdf_name),
+        ("Key concepts & Definitions", summary["key_concepts"]),
+        ("Relevance & Curiosity", summary["relevance"]),
+    ])
+
+
+def write_xlsx(summary: dict, path: str, pdf_name: str) -> None:
+    """One-row workbook"""
+    import pandas as pd
+
+    pd.DataFrame({column: [value] for column, value in summary_row(summary, pdf_name).items()}).to_excel(path, index=False)
+
+
+def write_csv(summary: dict, path: str, pdf_name: str) -> None:
+    """One-row CSV (UTF-8 with BOM so Excel opens the bullet characters correctly)"""
+    row = summary_row(summary, pdf_name)
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(row.keys())
+        writer.writerow(row.values())
+
+
+def write_json(summary: dict, path: str, pdf_name: str) -> None:
+    """The summary object plus the source file name"""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"source": pdf_name, **summary}, f, ensure_ascii=False, indent=2)
+
+
+WRITERS = {"xlsx": write_xlsx, "csv": write_csv, "json": write_json}
+
+
+def export_summary(summary: dict, path: str, pdf_name: str, fmt: str = "xlsx") -> None:
+    """
+    Write a summary in one of EXPORT_FORMATS
+
+    Raises:
+        ValueError: Unknown format
+    """
+    if fmt not in WRITERS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    WRITERS[fmt](summary, path, pdf_name)
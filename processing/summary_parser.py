@@ -0,0 +1,248 @@
+"""
+Incremental extraction and validation of the reading summary JSON
+"""
+import json
+import threading
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+from processing.llm_retry import call_with_retry
+
+SUMMARY_FIELDS = ("article_title", "key_concepts", "relevance")
+
+# How much of a malformed answer is sent back for repair
+MAX_REPAIR_INPUT_CHARS = 8000
+
+
+def validate_summary(data) -> list:
+    """
+    Check parsed output against the summary schema
+
+    Returns:
+        List of problems (empty when valid)
+    """
+    if not isinstance(data, dict):
+        return ["output is not a JSON object"]
+
+    errors = []
+    for field in SUMMARY_FIELDS:
+        value = data.get(field)
+        if value is None:
+            errors.append(f"missing field '{field}'")
+        elif isinstance(value, list):
+            if not all(isinstance(item, str) for item in value):
+                errors.append(f"'{field}' must be a string")
+        elif not isinstance(value, str):
+            errors.append(f"'{field}' must be a string")
+        elif not value.strip():
+            errors.append(f"'{field}' is empty")
+    return errors
+
+
+def normalize_summary(data: dict) -> dict:
+    """Coerce list fields to newline-joined strings and strip whitespace"""
+    normalized = {}
+    for field in SUMMARY_FIELDS:
+        value = data.get(field, "")
+        if isinstance(value, list):
+            value = "\n".join(value)
+        normalized[field] = value.strip()
+    return normalized
+
+
+class IncrementalJSONExtractor:
+    """
+    Consume text chunks and yield the first JSON object that matches the summary schema
+
+    Tracks open braces and string/escape state as characters arrive, so an object
+    is parsed the moment its closing brace is seen. Objects that do not validate
+    (e.g. tool call arguments in the agent's reasoning) are skipped, and a code
+    fence outside a string resets the scanner so stray braces in earlier reasoning
+    cannot hide the final answer.
+    """
+
+    def __init__(self, validator: Callable = validate_summary):
+        self.validator = validator
+        self.result = None
+        self.last_errors = ["no JSON object found"]
+        self._reset()
+
+    def _reset(self) -> None:
+        """Forget everything scanned so far"""
+        self._buffer = []
+        self._open = []
+        self._in_string = False
+        self._escaped = False
+        self._backticks = 0
+
+    @property
+    def complete(self) -> bool:
+        """True once a valid object has been extracted"""
+        return self.result is not None
+
+    def feed(self, chunk: str) -> Optional[dict]:
+        """
+        Consume the next piece of text
+
+        Returns:
+            The normalized summary if this chunk completed a valid object, else None
+        """
+        if self.complete or not chunk:
+            return None
+
+        for char in chunk:
+            # Backticks inside a JSON string are content, not a fence
+            self._backticks = self._backticks + 1 if char == "`" and not self._in_string else 0
+            if self._backticks == 3:
+                self._reset()
+                continue
+
+            if not self._open:
+                if char == "{":
+                    self._buffer = [char]
+                    self._open = [0]
+                continue
+
+            self._buffer.append(char)
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char == "{":
+                self._open.append(len(self._buffer) - 1)
+            elif char == "}":
+                start = self._open.pop()
+                if self._try_object("".join(self._buffer[start:])):
+                    return self.result
+                if not self._open:
+                    self._buffer = []
+        return None
+
+    def _try_object(self, candidate: str) -> bool:
+        """Parse and validate a complete object"""
+        try:
+            # strict=False tolerates raw newlines inside strings, a common LLM slip
+            data = json.loads(candidate, strict=False)
+        except json.JSONDecodeError as e:
+            self.last_errors = [f"invalid JSON: {e.msg}"]
+            return False
+
+        errors = self.validator(data)
+        if errors:
+            self.last_errors = errors
+            return False
+        self.result = normalize_summary(data)
+        self.last_errors = []
+        return True
+
+
+def extract_summary(text: str):
+    """
+    Extract the summary object from a complete answer
+
+    Returns:
+        (summary dict or None, list of problems)
+    """
+    extractor = IncrementalJSONExtractor()
+    extractor.feed(text or "")
+    if extractor.complete:
+        return extractor.result, []
+    return None, extractor.last_errors
+
+
+def _call_llm(llm, prompt: str) -> str:
+    """Send a single prompt to whichever LLM config get_llm_config returned"""
+    if isinstance(llm, str):
+        from crewai import LLM
+        llm = LLM(model=llm)
+    if hasattr(llm, "invoke"):
+        # crewai's LLM.call is retried by install_llm_retry; LangChain models are retried here
+        response = call_with_retry(llm.invoke, prompt, label="Summary repair")
+        return getattr(response, "content", str(response))
+    return str(llm.call([{"role": "user", "content": prompt}]))
+
+
+def repair_summary(text: str, errors: list, llm) -> Optional[dict]:
+    """
+    Ask the LLM to fix just the formatting of a malformed answer
+
+    Much cheaper than re-running the crew: the reading is not re-sent, only the
+    broken answer and the list of problems.
+
+    Returns:
+        The repaired summary, or None if it still does not validate
+    """
+    prompt = f"""The text below was supposed to be a single JSON object with exactly these string fields:
+"article_title", "key_concepts" (bullet points), "relevance" (bullet points).
+Problems found: {"; ".join(errors)}.
+Return ONLY the corrected JSON object. Keep the original wording; do not add new content.
+
+Text:
+{(text or "")[:MAX_REPAIR_INPUT_CHARS]}"""
+    try:
+        print(f"🔧 Repairing summary JSON ({'; '.join(errors)})")
+        repaired, repair_errors = extract_summary(_call_llm(llm, prompt))
+        if repair_errors:
+            print(f"⚠️ Summary repair failed: {'; '.join(repair_errors)}")
+        return repaired
+    except Exception as e:
+        print(f"⚠️ Summary repair call failed: {e}")
+        return None
+
+
+# Stream watchers keyed by crewai task id, fed from one shared event-bus handler
+_stream_watchers = {}
+_stream_lock = threading.Lock()
+_stream_handler_registered = False
+
+
+def _register_stream_handler() -> None:
+    """Subscribe once to crewai's LLM stream chunk events"""
+    global _stream_handler_registered
+    with _stream_lock:
+        if _stream_handler_registered:
+            return
+        from crewai.events import crewai_event_bus, LLMStreamChunkEvent
+
+        @crewai_event_bus.on(LLMStreamChunkEvent)
+        def _on_stream_chunk(source, event):
+            watcher = _stream_watchers.get(str(event.task_id))
+            if watcher is None:
+                return
+            extractor, on_summary = watcher
+            summary = extractor.feed(event.chunk)
+            if summary is not None and on_summary is not None:
+                try:
+                    on_summary(summary)
+                except Exception as e:
+                    print(f"⚠️ Summary stream callback failed: {e}")
+
+        _stream_handler_registered = True
+
+
+@contextmanager
+def watch_summary_stream(task, on_summary: Optional[Callable] = None):
+    """
+    Parse a task's streamed LLM output as it arrives
+
+    Only has an effect when the LLM streams (see LLM_STREAMING in app.py).
+    `on_summary` runs as soon as a valid summary object has closed.
+
+    Yields:
+        The IncrementalJSONExtractor fed by the stream
+    """
+    extractor = IncrementalJSONExtractor()
+    _register_stream_handler()
+    key = str(task.id)
+    _stream_watchers[key] = (extractor, on_summary)
+    try:
+        yield extractor
+    finally:
+        _stream_watchers.pop(key, None)
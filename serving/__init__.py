@@ -0,0 +1 @@
+# HTTP serving helpers for AI Agents
@@ -0,0 +1,61 @@
+"""
+Negotiated gzip/brotli compression of dynamic responses
+Markdown results and result lists compress several-fold; small bodies and already-encoded
+or streamed responses are left alone.
+"""
+import gzip
+import os
+
+from flask import request
+
+from serving.file_serving import BROTLI_AVAILABLE
+
+if BROTLI_AVAILABLE:
+    import brotli
+
+COMPRESSIBLE_MIMETYPES = {'application/json', 'text/html', 'text/plain', 'text/csv'}
+MIN_COMPRESS_BYTES = int(os.environ.get('COMPRESS_MIN_BYTES', 1024))
+
+# Fast levels: these bodies are compressed on every request, unlike the precompressed static files
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def negotiate_encoding():
+    """Best encoding the client accepts ("br", "gzip") or None"""
+    if BROTLI_AVAILABLE and request.accept_encodings.quality('br') > 0:
+        return 'br'
+    if request.accept_encodings.quality('gzip') > 0:
+        return 'gzip'
+    return None
+
+
+def compress_response(response):
+    """after_request hook: compress eligible responses for clients that accept it"""
+    if (response.direct_passthrough or response.is_streamed
+            or response.status_code < 200 or response.status_code in (204, 206, 304)
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+            or 'Content-Encoding' in response.headers):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    data = response.get_data()
+    if len(data) < MIN_COMPRESS_BYTES:
+        return response
+    encoding = negotiate_encoding()
+    if encoding is None:
+        return response
+
+    if encoding == 'br':
+        body = brotli.compress(data, quality=BROTLI_QUALITY)
+    else:
+        body = gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+    if response.get_etag()[0]:
+        # The encoded body is a different representation. Clients revalidate with this suffixed
+        # ETag, which the view never sees, so the 304 decision is made here against it.
+        etag, weak = response.get_etag()
+        response.set_etag(f"{etag}.{encoding}", weak=weak)
+        response = response.make_conditional(request)
+    return response
@@ -0,0 +1,44 @@
+"""
+Shared thread pools for provider I/O waits and CPU-bound work
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Provider calls (crewai/LiteLLM, OpenAI TTS) are blocking in the libraries we use,
+# so each in-flight wait needs a thread; idle waiting threads are cheap
+IO_THREADS = int(os.environ.get('ASYNC_IO_THREADS', 256))
+
+# pypdf, Whisper and openpyxl are CPU-bound; running more of them than cores just thrashes
+CPU_WORKERS = int(os.environ.get('CPU_WORKERS', os.cpu_count() or 2))
+
+io_executor = ThreadPoolExecutor(max_workers=IO_THREADS, thread_name_prefix='io')
+cpu_executor = ThreadPoolExecutor(max_workers=CPU_WORKERS, thread_name_prefix='cpu')
+
+_cpu_lock = threading.Lock()
+_cpu_jobs = 0
+
+
+def cpu_queue_depth():
+    """CPU-bound jobs currently running or waiting for a CPU slot"""
+    return _cpu_jobs
+
+
+def cpu_bound(fn, *args, **kwargs):
+    """
+    Run CPU-heavy work on the bounded CPU pool and wait for the result
+
+    Keeps hundreds of concurrent requests from all parsing PDFs or running
+    Whisper at once; requests queue for a CPU slot instead.
+    """
+    if threading.current_thread().name.startswith('cpu'):
+        # Already on a CPU worker: run inline instead of deadlocking on the pool
+        return fn(*args, **kwargs)
+    global _cpu_jobs
+    with _cpu_lock:
+        _cpu_jobs += 1
+    try:
+        return cpu_executor.submit(fn, *args, **kwargs).result()
+    finally:
+        with _cpu_lock:
+            _cpu_jobs -= 1
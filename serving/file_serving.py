@@ -0,0 +1,112 @@
+"""
+Cache-friendly file responses: strong ETags, conditional/range requests and precompressed variants
+"""
+import gzip
+import mimetypes
+import os
+import shutil
+import tempfile
+from typing import Optional
+
+from flask import request, send_file
+
+# Try to import brotli, but don't fail if not available (gzip is always offered)
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+# Content-addressed files never change, so caches may keep them for a year
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+# Only text-like formats benefit from compression (.xlsx is already a zip archive)
+COMPRESSIBLE_EXTENSIONS = {'.csv', '.json', '.txt', '.md', '.html', '.js', '.css', '.svg'}
+MIN_COMPRESS_SIZE = 1024
+
+
+def _write_variant(path: str, variant_path: str, encoding: str) -> None:
+    """Compress `path` into `variant_path` atomically"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(variant_path))
+    try:
+        with os.fdopen(fd, 'wb') as out, open(path, 'rb') as src:
+            if encoding == 'br':
+                out.write(brotli.compress(src.read()))
+            else:
+                with gzip.GzipFile(fileobj=out, mode='wb', compresslevel=9, mtime=0) as gz:
+                    shutil.copyfileobj(src, gz)
+        os.replace(tmp_path, variant_path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def precompressed_variant(path: str, encoding: str) -> str:
+    """Return the path of a gzip/brotli copy of `path`, creating it on first use"""
+    variant_path = path + ('.br' if encoding == 'br' else '.gz')
+    if not os.path.exists(variant_path) or os.path.getmtime(variant_path) < os.path.getmtime(path):
+        _write_variant(path, variant_path, encoding)
+    return variant_path
+
+
+def choose_encoding(path: str) -> Optional[str]:
+    """Pick the best precompressed encoding the client accepts for this file, if any"""
+    if os.path.splitext(path)[1].lower() not in COMPRESSIBLE_EXTENSIONS:
+        return None
+    if os.path.getsize(path) < MIN_COMPRESS_SIZE:
+        return None
+    if BROTLI_AVAILABLE and request.accept_encodings.quality('br') > 0:
+        return 'br'
+    if request.accept_encodings.quality('gzip') > 0:
+        return 'gzip'
+    return None
+
+
+def send_immutable_file(path: str, content_hash: str, download_name: Optional[str] = None,
+                        as_attachment: bool = True, mimetype: Optional[str] = None):
+    """
+    Send a content-addressed file so browsers and CDNs can cache it forever
+
+    The content hash is used as a strong ETag, so If-None-Match gets a 304 and
+    Range/If-Range requests are answered with 206 partial content.
+
+    Args:
+        path: File on disk
+        content_hash: Hash of the file's content (used as the ETag)
+        download_name: Filename presented to the client
+        as_attachment: Send Content-Disposition: attachment
+        mimetype: Content type (default: guessed from download_name)
+
+    Returns:
+        Flask response
+    """
+    download_name = download_name or os.path.basename(path)
+    mimetype = mimetype or mimetypes.guess_type(download_name)[0] or 'application/octet-stream'
+
+    serve_path = path
+    etag = content_hash
+    encoding = choose_encoding(path)
+    if encoding:
+        try:
+            serve_path = precompressed_variant(path, 'br' if encoding == 'br' else 'gzip')
+            etag = f"{content_hash}.{encoding}"
+        except Exception as e:
+            print(f"⚠️ Could not precompress {path}: {e}")
+            encoding = None
+
+    response = send_file(
+        serve_path,
+        mimetype=mimetype,
+        as_attachment=as_attachment,
+        download_name=download_name,
+        etag=etag,
+        max_age=IMMUTABLE_MAX_AGE,
+        conditional=True,
+    )
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    response.vary.add('Accept-Encoding')
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    return response
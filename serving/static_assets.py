@@ -0,0 +1,253 @@
+"""
+Static asset pipeline: minified, content-hashed and precompressed CSS/JS
+`python -m serving.static_assets` writes static/dist/ and a manifest mapping each source file
+(e.g. "js/app.js") to its fingerprinted copy; templates link through asset_url(), so a changed
+file gets a new URL and everything else can be cached by browsers forever.
+"""
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+from typing import Optional
+
+from serving.file_serving import BROTLI_AVAILABLE, precompressed_variant
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static")
+DIST_DIRNAME = "dist"
+MANIFEST_NAME = "manifest.json"
+ASSET_EXTENSIONS = (".css", ".js")
+HASH_LENGTH = 12
+
+_CSS_TOKEN_RE = re.compile(r'"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\'|/\*.*?\*/', re.DOTALL)
+_CSS_PUNCTUATION_RE = re.compile(r"\s*([{};,>])\s*")
+
+# A "/" after one of these (or a keyword like `return`) starts a regex literal, not a division
+_REGEX_PRECEDERS = set("(,=:[!&|?{};+-*%<>~^")
+_REGEX_KEYWORDS = ("return", "typeof", "case", "do", "else", "in", "of", "void", "yield", "await")
+
+
+def _css_code(text: str, transform) -> str:
+    """Apply `transform` to the parts of a stylesheet outside strings (comments are passed through it too)"""
+    parts, position = [], 0
+    for match in _CSS_TOKEN_RE.finditer(text):
+        parts.append(transform(text[position:match.start()]))
+        parts.append(match.group() if match.group()[0] in "\"'" else transform(match.group()))
+        position = match.end()
+    parts.append(transform(text[position:]))
+    return "".join(parts)
+
+
+def minify_css(text: str) -> str:
+    """Drop comments and redundant whitespace, leaving strings untouched"""
+    text = _css_code(text, lambda code: " " if code.startswith("/*") else code)
+    text = _css_code(text, lambda code: _CSS_PUNCTUATION_RE.sub(r"\1", re.sub(r"\s+", " ", code)).replace(";}", "}"))
+    return text.strip() + "\n"
+
+
+def minify_js(text: str) -> str:
+    """
+    Drop comments, indentation and blank lines
+
+    Conservative on purpose: line breaks are kept (so automatic semicolon insertion is
+    unaffected) and strings, template literals and regex literals are copied verbatim.
+    """
+    out = []
+    i, n = 0, len(text)
+    line_start = True
+    last = ""          # last significant character emitted outside strings/comments
+    word = ""          # identifier being emitted, to spot `return /re/`
+    templates = []     # brace depth of each open `${ ... }` inside template literals
+    while i < n:
+        char = text[i]
+        if line_start and char in " \t":
+            i += 1
+            continue
+        if char == "\n":
+            if not line_start:
+                while out and out[-1] in " \t":
+                    out.pop()
+                out.append("\n")
+                line_start = True
+            i += 1
+            continue
+
+        if char == "/" and text.startswith("//", i):
+            i = text.find("\n", i)
+            i = n if i < 0 else i
+            continue
+        if char == "/" and text.startswith("/*", i):
+            end = text.find("*/", i + 2)
+            i = n if end < 0 else end + 2
+            continue
+        line_start = False
+        if char in "\"'" or (char == "/" and (last in _REGEX_PRECEDERS or last == "" or word in _REGEX_KEYWORDS)):
+            # String or regex literal: copy up to the unescaped closing delimiter
+            start = i
+            i += 1
+            in_class = False
+            while i < n and text[i] != "\n":
+                if text[i] == "\\":
+                    i += 2
+                    continue
+                if char == "/" and text[i] in "[]":
+                    in_class = text[i] == "["
+                elif text[i] == char and not in_class:
+                    break
+                i += 1
+            i += 1
+            if char == "/":
+                while i < n and (text[i].isalnum()):
+                    i += 1
+            out.append(text[start:i])
+            last, word = char, ""
+            continue
+        if char == "`" or (char == "}" and templates and templates[-1] == 0):
+            # Template literal (or its continuation after `${...}`): copied verbatim, newlines included
+            if char == "}":
+                templates.pop()
+            start = i
+            i += 1
+            while i < n:
+                if text[i] == "\\":
+                    i += 2
+                    continue
+                if text[i] == "`":
+                    i += 1
+                    break
+                if text.startswith("${", i):
+                    i += 2
+                    templates.append(0)
+                    break
+                i += 1
+            out.append(text[start:i])
+            last, word = "`", ""
+            continue
+
+        if char in " \t" and out and out[-1] in (" ", "\t"):
+            i += 1
+            continue
+        if templates:
+            if char == "{":
+                templates[-1] += 1
+            elif char == "}":
+                templates[-1] -= 1
+        out.append(char)
+        if not char.isspace():
+            word = word + char if (char.isalnum() or char in "_$") else ""
+            last = char if not word else "a"
+        i += 1
+    return "".join(out).strip() + "\n"
+
+
+def content_hash(data: bytes) -> str:
+    """Short hex digest used in fingerprinted filenames"""
+    return hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def source_files(static_dir: str = STATIC_DIR) -> list:
+    """Relative paths of the CSS/JS sources (build output excluded)"""
+    sources = []
+    for root, dirs, files in os.walk(static_dir):
+        dirs[:] = sorted(d for d in dirs if not (root == static_dir and d == DIST_DIRNAME))
+        for name in sorted(files):
+            if name.endswith(ASSET_EXTENSIONS) and ".min." not in name:
+                sources.append(os.path.relpath(os.path.join(root, name), static_dir).replace(os.sep, "/"))
+    return sources
+
+
+def build_assets(static_dir: str = STATIC_DIR) -> dict:
+    """
+    Minify, fingerprint and precompress every CSS/JS source into static/dist/
+
+    Returns:
+        The manifest: source path -> fingerprinted path, both relative to static_dir
+    """
+    dist_dir = os.path.join(static_dir, DIST_DIRNAME)
+    manifest = {}
+    for source in source_files(static_dir):
+        with open(os.path.join(static_dir, source), "r", encoding="utf-8") as f:
+            text = f.read()
+        minified = (minify_css(text) if source.endswith(".css") else minify_js(text)).encode("utf-8")
+        stem, ext = os.path.splitext(source)
+        built = f"{DIST_DIRNAME}/{stem}.{content_hash(minified)}{ext}"
+        built_path = os.path.join(static_dir, built)
+        if not os.path.exists(built_path):
+            _write_atomic(built_path, minified)
+        for encoding in ("br", "gzip") if BROTLI_AVAILABLE else ("gzip",):
+            precompressed_variant(built_path, encoding)
+        manifest[source] = built
+
+    # Drop builds no longer referenced (keeping variants of current files)
+    current = {os.path.join(static_dir, built) for built in manifest.values()}
+    for root, _, files in os.walk(dist_dir):
+        for name in files:
+            path = os.path.join(root, name)
+            if name != MANIFEST_NAME and re.sub(r"\.(gz|br)$", "", path) not in current:
+                os.unlink(path)
+    _write_atomic(os.path.join(dist_dir, MANIFEST_NAME), json.dumps(manifest, indent=2).encode("utf-8"))
+    return manifest
+
+
+class AssetManifest:
+    """Resolve source asset paths to their fingerprinted builds, rebuilding when a source changes"""
+
+    def __init__(self, static_dir: str = STATIC_DIR, auto_build: bool = True):
+        """
+        Args:
+            static_dir: Directory holding the sources and dist/
+            auto_build: Rebuild whenever a source is newer than the manifest (for development);
+                otherwise assets are only built when no manifest exists yet
+        """
+        self.static_dir = static_dir
+        self.auto_build = auto_build
+        self.dist_dir = os.path.join(static_dir, DIST_DIRNAME)
+        self.manifest_path = os.path.join(self.dist_dir, MANIFEST_NAME)
+        self._manifest = None
+        self._lock = threading.Lock()
+
+    def _stale(self) -> bool:
+        """True when a source is newer than the manifest (or the manifest is missing)"""
+        try:
+            built = os.path.getmtime(self.manifest_path)
+        except OSError:
+            return True
+        return any(os.path.getmtime(os.path.join(self.static_dir, source)) > built
+                   for source in source_files(self.static_dir))
+
+    def load(self) -> dict:
+        """Current manifest (empty if the build failed, so callers fall back to the sources)"""
+        with self._lock:
+            missing = self._manifest is None and not os.path.exists(self.manifest_path)
+            rebuild = missing or (self.auto_build and self._stale())
+            if rebuild:
+                try:
+                    build_assets(self.static_dir)
+                except Exception as e:
+                    print(f"⚠️ Could not build static assets: {e}")
+            if self._manifest is None or rebuild:
+                try:
+                    with open(self.manifest_path, "r", encoding="utf-8") as f:
+                        self._manifest = json.load(f)
+                except (OSError, ValueError):
+                    self._manifest = {}
+            return self._manifest
+
+    def resolve(self, filename: str) -> Optional[str]:
+        """Fingerprinted path for a source file, or None if it has no build"""
+        return self.load().get(filename)
+
+
+if __name__ == "__main__":
+    for source, built in build_assets().items():
+        sizes = [os.path.getsize(os.path.join(STATIC_DIR, path)) for path in (source, built, built + ".gz")]
+        print(f"✅ {source} -> {built} ({sizes[0]:,} B, minified {sizes[1]:,} B, gzip {sizes[2]:,} B)")
@@ -0,0 +1,222 @@
+"""
+Opt-in capture of sanitized request envelopes for traffic replay
+With TRAFFIC_CAPTURE=1 every API request appends one JSON line: endpoint, status, duration and
+payload sizes, plus the reading interests and a few options. CVs, job descriptions, documents,
+audio and TTS text are never stored; identical inputs share a salted fingerprint so a replay can
+reproduce the cache-hit mix. benchmarks/replay_traffic.py re-drives a capture file.
+"""
+import hashlib
+import json
+import os
+import random
+import secrets
+import threading
+import time
+from typing import Optional
+
+from flask import g, request
+
+DEFAULT_CAPTURE_PATH = os.path.join("captures", "traffic.jsonl")
+SKIPPED_PATHS = ("/api/health", "/api/ready")
+
+
+def _fingerprint(salt: str, *parts) -> Optional[str]:
+    """Short salted hash identifying identical inputs without revealing them"""
+    if not any(parts):
+        return None
+    digest = hashlib.sha256(salt.encode("utf-8"))
+    for part in parts:
+        digest.update(b"\x00" + str(part or "").encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def load_or_create_salt(capture_path: str) -> str:
+    """
+    Fingerprint salt kept in <capture file>.salt, generated on first use
+
+    Without a secret salt the fingerprints are plain hashes that anyone holding the capture file
+    could test guessed inputs against. The salt file is created atomically and readable only by
+    the owner, so every worker process shares the one salt; don't hand it out with the capture.
+    """
+    salt_path = capture_path + ".salt"
+    if not os.path.exists(salt_path):
+        tmp_path = f"{salt_path}.{os.getpid()}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(secrets.token_hex(32))
+        try:
+            os.link(tmp_path, salt_path)  # fails if another worker created it first
+        except FileExistsError:
+            pass
+        finally:
+            os.unlink(tmp_path)
+    with open(salt_path, "r", encoding="utf-8") as f:
+        return f.read().strip()
+
+
+def _interests(value) -> Optional[list]:
+    if not value:
+        return None
+    if isinstance(value, list):
+        value = ",".join(value)
+    return [interest.strip() for interest in str(value).split(",") if interest.strip()]
+
+
+def _interview_fields(data, salt):
+    cv_text, job_description = data.get("cv_text") or "", data.get("job_description") or ""
+    return {
+        "cv_chars": len(cv_text),
+        "job_chars": len(job_description),
+        "refresh": bool(data.get("refresh")),
+        "fingerprint": _fingerprint(salt, cv_text, job_description),
+    }
+
+
+def _summary_fields(data, salt):
+    return {
+        "interests": _interests(data.get("custom_interests")),
+        "page_range": data.get("page_range") or None,
+        "refresh": bool(data.get("refresh")),
+        # Content hash of the PDF, set by the view once the upload is stored
+        "fingerprint": _fingerprint(salt, g.get("upload_hash")),
+    }
+
+
+def _tts_fields(data, salt):
+    text = data.get("text") or ""
+    return {
+        "text_chars": len(text),
+        "voice": data.get("voice"),
+        "format": request.args.get("format") or data.get("format"),
+        "fingerprint": _fingerprint(salt, text),
+    }
+
+
+def _upload_fields(data, salt):
+    filename = data.get("filename") or ""
+    return {
+        "purpose": data.get("purpose", "summarize"),
+        "size": data.get("size"),
+        "extension": filename.rsplit(".", 1)[-1].lower() if "." in filename else None,
+        "fingerprint": _fingerprint(salt, data.get("sha256")),
+    }
+
+
+# View function name -> extractor of the fields worth replaying (sizes and options only)
+FIELD_EXTRACTORS = {
+    "interview_preparation": _interview_fields,
+    "pdf_summarization": _summary_fields,
+    "finalize_upload": _summary_fields,
+    "text_to_speech": _tts_fields,
+    "create_upload": _upload_fields,
+}
+
+
+class TrafficCapture:
+    """Append one sanitized JSON envelope per API request to a capture file"""
+
+    def __init__(self, path: str = DEFAULT_CAPTURE_PATH, sample_rate: float = 1.0,
+                 max_bytes: Optional[int] = None, salt: Optional[str] = None):
+        """
+        Args:
+            path: JSONL file appended to (shared safely by several worker processes)
+            sample_rate: Fraction of requests captured; upload sessions are sampled as a whole
+            max_bytes: Stop capturing once the file reaches this size (None: no limit)
+            salt: Secret mixed into fingerprints and hashed ids (default: load_or_create_salt)
+        """
+        self.path = path
+        self.sample_rate = sample_rate
+        self.max_bytes = max_bytes
+        self.captured = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.salt = salt or load_or_create_salt(path)
+
+    def install(self, app) -> None:
+        """Register the request hooks (install after compress_response so sizes are of uncompressed bodies)"""
+        app.before_request(self._start)
+        app.after_request(self._finish)
+
+    def _sampled(self, session: Optional[str]) -> bool:
+        if self.sample_rate >= 1:
+            return True
+        if session:
+            # Keep whole upload sessions: create, chunks and finalize together
+            return int(hashlib.sha256(session.encode("utf-8")).hexdigest()[:8], 16) / 0xFFFFFFFF < self.sample_rate
+        return random.random() < self.sample_rate
+
+    def _start(self):
+        if request.path.startswith("/api/") and request.path not in SKIPPED_PATHS:
+            g.capture_started = time.time()
+
+    def envelope(self, response, started: float, session: Optional[str], body) -> dict:
+        """Sanitized description of the current request and its response"""
+        view_args = request.view_args or {}
+        data = request.get_json(silent=True) if request.is_json else request.form
+        extractor = FIELD_EXTRACTORS.get(request.endpoint)
+        user_id = request.headers.get("X-User-Id") or request.args.get("user_id")
+        return {
+            "ts": round(started, 3),
+            "method": request.method,
+            "endpoint": request.url_rule.rule if request.url_rule else request.path,
+            "view": request.endpoint,
+            "status": response.status_code,
+            "duration_ms": round((time.time() - started) * 1000, 1),
+            "request_bytes": request.content_length or 0,
+            "response_bytes": response.calculate_content_length() or 0,
+            "content_type": request.mimetype or None,
+            "user": _fingerprint(self.salt, user_id),
+            "session": _fingerprint(self.salt, session),
+            "index": view_args.get("index"),
+            "fields": extractor(data or {}, self.salt) if extractor else {},
+            "cached": body.get("cached") if isinstance(body, dict) else None,
+            "degraded": body.get("degraded") if isinstance(body, dict) else None,
+        }
+
+    def _finish(self, response):
+        started = g.pop("capture_started", None)
+        if started is None:
+            return response
+        try:
+            body = response.get_json(silent=True) if response.is_json and not response.direct_passthrough else None
+            view_args = request.view_args or {}
+            session = view_args.get("upload_id") or view_args.get("stream_id")
+            if session is None and isinstance(body, dict):
+                # A new session's id is only known from the response
+                session = body.get("upload_id") or body.get("stream_id")
+            if self._sampled(session):
+                self.write(self.envelope(response, started, session, body))
+        except Exception as e:
+            print(f"Warning: Could not capture request: {e}")
+        return response
+
+    def write(self, envelope: dict) -> bool:
+        """Append one envelope; returns False once the size limit is reached"""
+        line = (json.dumps(envelope, separators=(",", ":")) + "\n").encode("utf-8")
+        with self._lock:
+            if self.max_bytes is not None:
+                try:
+                    if os.path.getsize(self.path) + len(line) > self.max_bytes:
+                        return False
+                except OSError:
+                    pass
+            # One O_APPEND write per line keeps lines whole when several workers share the file
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+            try:
+                os.write(fd, line)
+            finally:
+                os.close(fd)
+            self.captured += 1
+        return True
+
+
+def read_capture(path: str) -> list:
+    """Envelopes of a capture file in timestamp order (malformed lines are skipped)"""
+    envelopes = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                envelopes.append(json.loads(line))
+            except ValueError:
+                continue
+    return sorted(envelopes, key=lambda envelope: envelope.get("ts", 0))
@@ -0,0 +1,90 @@
+"""
+Background warm-up and readiness tracking
+Slow one-off initialisation (model loads, client construction, heavy imports) runs in a
+background thread at boot instead of inside the first user request; /api/ready reports
+per-subsystem progress so a load balancer only routes traffic to warm workers.
+"""
+import threading
+import time
+from typing import Callable, Optional
+
+PENDING = "pending"
+RUNNING = "running"
+READY = "ready"
+UNAVAILABLE = "unavailable"   # optional feature not configured/installed on this worker
+FAILED = "failed"
+
+
+class WarmUp:
+    """Ordered warm-up steps run once on a daemon thread"""
+
+    def __init__(self):
+        self._steps = []
+        self._status = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self.started_at = None
+        self.finished_at = None
+
+    def add(self, name: str, fn: Callable[[], object], required: bool = True) -> None:
+        """
+        Register a step
+
+        Args:
+            name: Subsystem name reported by status()
+            fn: Initialiser; a falsy return value means the subsystem is unavailable here
+            required: Whether the worker is not ready until this step succeeds
+        """
+        self._steps.append((name, fn, required))
+        self._status[name] = {"state": PENDING, "required": required, "seconds": None, "error": None}
+
+    def _run(self) -> None:
+        for name, fn, _ in self._steps:
+            with self._lock:
+                self._status[name]["state"] = RUNNING
+            started = time.perf_counter()
+            try:
+                state, error = (READY if fn() else UNAVAILABLE), None
+            except Exception as e:
+                state, error = FAILED, str(e)
+                print(f"⚠️ Warm-up of {name} failed: {e}")
+            with self._lock:
+                self._status[name].update(state=state, error=error,
+                                          seconds=round(time.perf_counter() - started, 3))
+        self.finished_at = time.time()
+        print(f"🔥 Warm-up finished in {self.finished_at - self.started_at:.1f}s")
+
+    def start(self) -> Optional[threading.Thread]:
+        """Run the steps in the background (once)"""
+        with self._lock:
+            if self._thread is not None:
+                return self._thread
+            self.started_at = time.time()
+            self._thread = threading.Thread(target=self._run, name="warmup", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until warm-up is done; returns whether it finished in time"""
+        if self._thread is None:
+            return False
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    def status(self) -> dict:
+        """Overall readiness plus the state and duration of every subsystem"""
+        with self._lock:
+            subsystems = {name: dict(step) for name, step in self._status.items()}
+        ready = self.finished_at is not None and all(
+            step["state"] == READY for step in subsystems.values() if step["required"]
+        )
+        if self.started_at is None:
+            duration = None
+        else:
+            duration = round((self.finished_at or time.time()) - self.started_at, 3)
+        return {
+            "ready": ready,
+            "warming": self.started_at is not None and self.finished_at is None,
+            "warmup_seconds": duration,
+            "subsystems": subsystems,
+        }
@@ -8,8 +8,12 @@ let isRecording = false;
 let recognition = null;
 let isRealtimeTranscribing = false;
 let accumulatedText = ''; // Track accumulated final text
+let serverSttAvailable = false; // Server-side streaming Whisper (preferred over Web Speech API)
+let serverStt = null; // Active server transcription stream
 let currentAudio = null; // Track current playing audio
 let isPlayingTTS = false; // Track TTS playing state
+let ttsSession = 0; // Bumped on stop so a section-by-section playback loop ends
+let speechSections = null; // Interview prep split into sections by the server (read one at a time)
 
 // Default job description
 const DEFAULT_JOB_DESCRIPTION = "Researcher position focused on AI in education with emphasis on marginalized communities and learning design";
@@ -138,6 +142,21 @@ function hideLoading() {
     document.getElementById('loading').style.display = 'none';
 }
 
+// Retry a request once the server says the AI provider is temporarily unavailable (503 + Retry-After).
+// The uploaded file and inputs are kept, so the retry only reruns the AI job.
+const JOB_RETRIES = 2;
+
+async function fetchJob(url, options) {
+    for (let attempt = 0; ; attempt++) {
+        const response = await fetch(url, options);
+        if (response.status !== 503 || attempt >= JOB_RETRIES) {
+            return response;
+        }
+        const seconds = parseFloat(response.headers.get('Retry-After')) || 5;
+        await new Promise(resolve => setTimeout(resolve, seconds * 1000 * (0.5 + Math.random())));
+    }
+}
+
 // Handle interview form submission
 async function handleInterviewSubmit(event) {
     event.preventDefault();
@@ -157,7 +176,7 @@ async function handleInterviewSubmit(event) {
     showLoading();
     
     try {
-        const response = await fetch('/api/interview', {
+        const response = await fetchJob('/api/interview', {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
@@ -168,6 +187,7 @@ async function handleInterviewSubmit(event) {
         const result = await response.json();
         
         if (result.success) {
+            speechSections = result.speech_sections || null;
             displayResult(result.result);
         } else {
             displayError(result.error || 'An error occurred');
@@ -194,22 +214,31 @@ async function handleReadingSubmit(event) {
     
     showResults();
     showLoading();
+    speechSections = null;
     
     try {
-        const response = await fetch('/api/summarize', {
-            method: 'POST',
-            body: formData
-        });
-        
-        const result = await response.json();
+        const file = fileInput.files[0];
+        let result;
+        if (file.size > CHUNKED_UPLOAD_THRESHOLD && window.crypto && crypto.subtle) {
+            // Large files go up in checksummed chunks that survive dropped connections
+            result = await uploadInChunks(file, 'summarize', {
+                custom_interests: formData.get('custom_interests') || ''
+            });
+        } else {
+            const response = await fetchJob('/api/summarize', {
+                method: 'POST',
+                body: formData
+            });
+            result = await response.json();
+        }
         
         if (result.success) {
             // Display result
             displayResult(result.result);
             
-            // Show download link if Excel file was created
+            // Show download links (the files are written on first download)
             if (result.excel_file) {
-                showDownloadLink(result.excel_file);
+                showDownloadLink(result.excel_file, result.exports);
             }
         } else {
             displayError(result.error || 'An error occurred');
@@ -222,6 +251,62 @@ async function handleReadingSubmit(event) {
     }
 }
 
+// Resumable chunked uploads for large files
+const CHUNKED_UPLOAD_THRESHOLD = 8 * 1024 * 1024;
+const CHUNK_RETRIES = 5;
+
+async function sha256Hex(buffer) {
+    const digest = await crypto.subtle.digest('SHA-256', buffer);
+    return Array.from(new Uint8Array(digest)).map(b => b.toString(16).padStart(2, '0')).join('');
+}
+
+async function uploadInChunks(file, purpose, options = {}) {
+    const sessionResponse = await fetch('/api/uploads', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ filename: file.name, size: file.size, purpose: purpose })
+    });
+    const session = await sessionResponse.json();
+    if (!sessionResponse.ok) {
+        return { success: false, error: session.error };
+    }
+    
+    let missing = session.missing;
+    for (let round = 0; missing.length && round <= CHUNK_RETRIES; round++) {
+        for (const index of missing) {
+            const start = index * session.chunk_size;
+            const chunk = await file.slice(start, start + session.chunk_size).arrayBuffer();
+            try {
+                await fetch(`/api/uploads/${session.upload_id}/chunks/${index}`, {
+                    method: 'PUT',
+                    headers: { 'X-Chunk-Sha256': await sha256Hex(chunk) },
+                    body: chunk
+                });
+            } catch (error) {
+                // Dropped connection: wait, then ask the server what is still missing
+                await new Promise(resolve => setTimeout(resolve, 1000 * 2 ** round));
+                break;
+            }
+        }
+        const status = await (await fetch(`/api/uploads/${session.upload_id}`)).json();
+        if (status.error) {
+            return { success: false, error: status.error };
+        }
+        missing = status.missing;
+    }
+    if (missing.length) {
+        return { success: false, error: 'Upload failed after several retries. Please try again.' };
+    }
+    
+    // Finalize is repeatable until it succeeds, so a provider hiccup doesn't cost a re-upload
+    const response = await fetchJob(`/api/uploads/${session.upload_id}/finalize`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify(options)
+    });
+    return response.json();
+}
+
 // Display result
 function displayResult(result) {
     const resultText = document.getElementById('resultText');
@@ -497,11 +582,19 @@ function formatPipeSeparatedResult(text) {
 }
 
 // Show download link
-function showDownloadLink(filename) {
+function showDownloadLink(filename, exports) {
     const downloadSection = document.getElementById('downloadSection');
     const downloadLink = document.getElementById('downloadLink');
     
-    downloadLink.href = `/api/download/${filename}`;
+    downloadLink.href = (exports && exports.xlsx) || `/api/download/${filename}`;
+    // CSV and JSON exports of the same summary, when the server offers them
+    ['csv', 'json'].forEach(format => {
+        const link = document.getElementById(`download${format.toUpperCase()}Link`);
+        if (link) {
+            link.href = (exports && exports[format]) || '#';
+            link.style.display = exports && exports[format] ? '' : 'none';
+        }
+    });
     downloadSection.style.display = 'block';
 }
 
@@ -770,6 +863,9 @@ async function toggleVoiceRecording() {
 }
 
 async function startRealtimeTranscription() {
+    if (serverSttAvailable) {
+        return startServerTranscription();
+    }
     try {
         console.log('Starting real-time transcription...');
         
@@ -874,6 +970,10 @@ async function startRealtimeTranscription() {
 }
 
 function stopRealtimeTranscription() {
+    if (serverStt) {
+        stopServerTranscription();
+        return;
+    }
     if (recognition && isRealtimeTranscribing) {
         recognition.stop();
         isRealtimeTranscribing = false;
@@ -881,6 +981,111 @@ function stopRealtimeTranscription() {
     }
 }
 
+// Server-side streaming transcription: 16 kHz PCM is posted every half second,
+// the server answers with a partial transcript and any finished sentences
+const STT_SEND_SECONDS = 0.5;
+
+async function startServerTranscription() {
+    try {
+        const response = await fetch('/api/stt/stream', { method: 'POST' });
+        const session = await response.json();
+        if (!response.ok) {
+            showVoiceError(session.error || 'Speech-to-text service not available');
+            return;
+        }
+        
+        const media = await navigator.mediaDevices.getUserMedia({ audio: true });
+        const context = new AudioContext({ sampleRate: session.sample_rate });
+        const source = context.createMediaStreamSource(media);
+        const processor = context.createScriptProcessor(4096, 1, 1);
+        const stt = {
+            streamId: session.stream_id,
+            sampleRate: session.sample_rate,
+            media, context, source, processor,
+            pending: [],
+            pendingSamples: 0,
+            sending: Promise.resolve()
+        };
+        
+        accumulatedText = document.getElementById('jobDescription').value.trim();
+        processor.onaudioprocess = (event) => {
+            const input = event.inputBuffer.getChannelData(0);
+            const pcm = new Int16Array(input.length);
+            for (let i = 0; i < input.length; i++) {
+                pcm[i] = Math.max(-1, Math.min(1, input[i])) * 0x7fff;
+            }
+            stt.pending.push(pcm);
+            stt.pendingSamples += pcm.length;
+            if (stt.pendingSamples >= stt.sampleRate * STT_SEND_SECONDS) {
+                const body = takePendingAudio(stt);
+                stt.sending = stt.sending
+                    .then(() => fetch(`/api/stt/stream/${stt.streamId}`, { method: 'POST', body: body }))
+                    .then(r => r.json())
+                    .then(applyServerTranscript)
+                    .catch(error => console.error('Streaming STT error:', error));
+            }
+        };
+        source.connect(processor);
+        processor.connect(context.destination);
+        
+        serverStt = stt;
+        isRealtimeTranscribing = true;
+        updateVoiceUI(true);
+    } catch (error) {
+        console.error('Error starting server transcription:', error);
+        showVoiceError('Could not start speech recognition. Please check your microphone.');
+    }
+}
+
+function takePendingAudio(stt) {
+    const audio = new Int16Array(stt.pendingSamples);
+    let offset = 0;
+    for (const chunk of stt.pending) {
+        audio.set(chunk, offset);
+        offset += chunk.length;
+    }
+    stt.pending = [];
+    stt.pendingSamples = 0;
+    return audio.buffer;
+}
+
+function applyServerTranscript(update) {
+    if (!update || update.error) {
+        return;
+    }
+    for (const segment of update.final || []) {
+        accumulatedText += (accumulatedText ? ' ' : '') + segment;
+    }
+    const partial = update.partial || '';
+    document.getElementById('jobDescription').value = accumulatedText + (partial ? ' ' + partial : '');
+    if (partial) {
+        updateVoiceStatus(`Speaking: "${partial}"`);
+    } else if (update.final && update.final.length) {
+        updateVoiceStatus(`Added: "${update.final.join(' ')}"`);
+    }
+}
+
+async function stopServerTranscription() {
+    const stt = serverStt;
+    serverStt = null;
+    stt.processor.disconnect();
+    stt.source.disconnect();
+    stt.media.getTracks().forEach(track => track.stop());
+    stt.context.close();
+    isRealtimeTranscribing = false;
+    updateVoiceUI(false);
+    
+    try {
+        const body = takePendingAudio(stt);
+        await stt.sending;
+        const response = await fetch(`/api/stt/stream/${stt.streamId}/finish`, { method: 'POST', body: body });
+        const result = await response.json();
+        applyServerTranscript({ final: result.final, partial: '' });
+    } catch (error) {
+        console.error('Error finishing server transcription:', error);
+    }
+}
+
 function updateVoiceUI(transcribing) {
     const btn = document.getElementById('voiceRecordBtn');
     const btnText = document.getElementById('voiceBtnText');
@@ -945,8 +1150,17 @@ function showVoiceError(message) {
 // Check voice service availability on page load
 async function checkVoiceAvailability() {
     try {
-        // Check if browser supports Web Speech API
-        if (!('webkitSpeechRecognition' in window) && !('SpeechRecognition' in window)) {
+        // Server-side streaming Whisper works in every browser with a microphone
+        let voiceStatus = {};
+        try {
+            voiceStatus = await (await fetch('/api/voice-status')).json();
+            serverSttAvailable = Boolean(voiceStatus.streaming_stt_available);
+        } catch (error) {
+            console.error('Error checking voice status:', error);
+        }
+        
+        // Otherwise the browser must support the Web Speech API
+        if (!serverSttAvailable && !('webkitSpeechRecognition' in window) && !('SpeechRecognition' in window)) {
             const btn = document.getElementById('voiceRecordBtn');
             btn.disabled = true;
             btn.title = 'Real-time speech recognition not supported in this browser. Please use Chrome or Edge.';
@@ -967,8 +1181,7 @@ async function checkVoiceAvailability() {
         
         // Check TTS availability
         try {
-            const response = await fetch('/api/voice-status');
-            const result = await response.json();
+            const result = voiceStatus;
             
             const ttsBtn = document.getElementById('ttsBtn');
             if (ttsBtn) {
@@ -1061,83 +1274,51 @@ async function startTextToSpeech() {
             return;
         }
         
-        // Limit text length for TTS
-        if (textToRead.length > 4000) {
-            textToRead = textToRead.substring(0, 4000) + '...';
+        // Interview preps are read section by section: the first sections are usually
+        // synthesized ahead of time, and each next one is fetched while the current one plays
+        let parts;
+        if (!summaryTable && speechSections && speechSections.length) {
+            parts = speechSections;
+        } else {
+            // Limit text length for TTS
+            if (textToRead.length > 4000) {
+                textToRead = textToRead.substring(0, 4000) + '...';
+            }
+            parts = [textToRead];
         }
         
-        console.log('Converting text to speech:', textToRead.length, 'characters');
-        console.log('Text preview:', textToRead.substring(0, 100));
+        console.log('Converting text to speech:', parts.length, 'section(s)');
         
         // Update UI to show loading
         updateTtsUI('loading');
         
-        // Call TTS API
-        console.log('Calling /api/text-to-speech endpoint...');
-        const response = await fetch('/api/text-to-speech', {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json',
-            },
-            body: JSON.stringify({
-                text: textToRead,
-                voice: 'nova' // Female voice
-            })
-        });
-        
-        console.log('TTS Response status:', response.status);
-        
-        if (!response.ok) {
-            const errorData = await response.json();
-            console.error('TTS Error response:', errorData);
-            if (errorData.error && errorData.error.includes('API key')) {
-                throw new Error('Text-to-Speech service error: ' + errorData.error);
+        const session = ++ttsSession;
+        let next = fetchSpeech(parts[0]);
+        for (let i = 0; i < parts.length; i++) {
+            const audioBlob = await next;
+            if (session !== ttsSession) {
+                return; // Stopped while loading
+            }
+            next = i + 1 < parts.length ? fetchSpeech(parts[i + 1]) : null;
+            if (next) {
+                next.catch(() => {}); // Reported when awaited; ignored if playback stops first
             }
-            throw new Error(errorData.error || 'TTS request failed');
-        }
-        
-        const result = await response.json();
-        console.log('TTS Result received:', result.success, 'audio length:', result.audio_data?.length);
-        
-        if (result.success && result.audio_data) {
-            // Create audio element and play
-            const audioBlob = new Blob([Uint8Array.from(atob(result.audio_data), c => c.charCodeAt(0))], { type: 'audio/mpeg' });
-            const audioUrl = URL.createObjectURL(audioBlob);
-            
-            currentAudio = new Audio(audioUrl);
-            currentAudio.onended = () => {
-                console.log('Audio playback ended');
-                isPlayingTTS = false;
-                updateTtsUI(false);
-                URL.revokeObjectURL(audioUrl);
-                // Re-enable button
-                const btn = document.getElementById('ttsBtn');
-                btn.disabled = false;
-            };
-            
-            currentAudio.onerror = () => {
-                console.error('Error playing audio');
-                // Don't show error alert - just stop silently
-                isPlayingTTS = false;
-                updateTtsUI(false);
-                const btn = document.getElementById('ttsBtn');
-                btn.disabled = false;
-            };
             
             isPlayingTTS = true;
             updateTtsUI(true);
-            
             // Re-enable button so user can stop
-            const btn = document.getElementById('ttsBtn');
-            btn.disabled = false;
-            
-            await currentAudio.play();
-            console.log('Audio playback started');
+            document.getElementById('ttsBtn').disabled = false;
             
-        } else {
-            throw new Error('No audio data received');
+            await playSpeech(audioBlob);
+            if (session !== ttsSession) {
+                return; // Stopped while playing
+            }
         }
         
+        console.log('Audio playback ended');
+        isPlayingTTS = false;
+        updateTtsUI(false);
+        
     } catch (error) {
         console.error('TTS Error:', error);
         // Only show alert for real errors, not for user-initiated stops
@@ -1151,8 +1332,73 @@ async function startTextToSpeech() {
     }
 }
 
+async function fetchSpeech(text) {
+    // Ask for raw MP3 so the audio plays straight from an object URL (errors still come back as JSON)
+    const response = await fetch('/api/text-to-speech?format=mp3', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+            'Accept': 'audio/mpeg, application/json',
+        },
+        body: JSON.stringify({
+            text: text,
+            voice: 'nova' // Female voice
+        })
+    });
+    
+    console.log('TTS Response status:', response.status, response.headers.get('X-TTS-Cache') || '');
+    
+    if (!response.ok) {
+        const errorData = await response.json();
+        console.error('TTS Error response:', errorData);
+        if (errorData.error && errorData.error.includes('API key')) {
+            throw new Error('Text-to-Speech service error: ' + errorData.error);
+        }
+        throw new Error(errorData.error || 'TTS request failed');
+    }
+    
+    let audioBlob = null;
+    if ((response.headers.get('Content-Type') || '').startsWith('audio/')) {
+        audioBlob = await response.blob();
+    } else {
+        // Older servers only send base64 inside JSON
+        const result = await response.json();
+        if (result.success && result.audio_data) {
+            audioBlob = new Blob([Uint8Array.from(atob(result.audio_data), c => c.charCodeAt(0))], { type: 'audio/mpeg' });
+        }
+    }
+    console.log('TTS audio received:', audioBlob?.size, 'bytes');
+    
+    if (!audioBlob || audioBlob.size === 0) {
+        throw new Error('No audio data received');
+    }
+    return audioBlob;
+}
+
+function playSpeech(audioBlob) {
+    // Resolves when the clip ends, fails to play, or is stopped
+    return new Promise((resolve) => {
+        const audioUrl = URL.createObjectURL(audioBlob);
+        const done = () => {
+            URL.revokeObjectURL(audioUrl);
+            resolve();
+        };
+        
+        currentAudio = new Audio(audioUrl);
+        currentAudio.onended = done;
+        currentAudio.onpause = done;
+        currentAudio.onerror = () => {
+            // Don't show error alert - just move on silently
+            console.error('Error playing audio');
+            done();
+        };
+        currentAudio.play().catch(done);
+    });
+}
+
 function stopTextToSpeech() {
     console.log('Stopping TTS...');
+    ttsSession++;
     if (currentAudio) {
         currentAudio.pause();
         currentAudio.currentTime = 0;
@@ -0,0 +1 @@
+# Storage module for AI Agents
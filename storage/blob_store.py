@@ -0,0 +1,331 @@
+"""
+Content-addressed blob storage for uploads and generated files
+"""
+import hashlib
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+HASH_LENGTH = 64
+READ_CHUNK_SIZE = 1024 * 1024
+
+# Derived files kept next to a blob (e.g. precompressed copies) and deleted with it
+VARIANT_SUFFIXES = ('.gz', '.br')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    hash TEXT PRIMARY KEY,
+    ext TEXT NOT NULL DEFAULT '',
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS refs (
+    hash TEXT NOT NULL,
+    ref TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (hash, ref)
+);
+CREATE INDEX IF NOT EXISTS idx_blobs_last_access ON blobs (last_access);
+"""
+
+
+def is_blob_hash(value: str) -> bool:
+    """Check whether a string looks like a blob key (hex SHA-256)"""
+    return len(value) == HASH_LENGTH and all(c in "0123456789abcdef" for c in value)
+
+
+class BlobStore:
+    """Store files once per content hash, with reference counting and GC"""
+
+    def __init__(
+        self,
+        root: str,
+        max_total_bytes: Optional[int] = None,
+        max_age_seconds: Optional[float] = None,
+        unreferenced_grace: float = 3600,
+    ):
+        """
+        Open (and create if needed) a blob store
+
+        Args:
+            root: Directory holding the blobs and their index
+            max_total_bytes: Evict least recently used blobs above this size (None = no limit)
+            max_age_seconds: Evict blobs not accessed for this long (None = no limit)
+            unreferenced_grace: Seconds an unreferenced blob is kept before GC may delete it
+        """
+        self.root = os.path.abspath(root)
+        self.tmp_dir = os.path.join(self.root, "tmp")
+        self.index_path = os.path.join(self.root, "index.sqlite3")
+        self.max_total_bytes = max_total_bytes
+        self.max_age_seconds = max_age_seconds
+        self.unreferenced_grace = unreferenced_grace
+        # Longer grace for scratch files other components keep in tmp/, by suffix (e.g. upload parts)
+        self.scratch_grace = {}
+        self._gc_thread = None
+        self._gc_stop = threading.Event()
+
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        """Open a short-lived connection to the blob index"""
+        conn = sqlite3.connect(self.index_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _blob_path(self, blob_hash: str, ext: str) -> str:
+        """Location of a blob on disk, sharded by hash prefix"""
+        return os.path.join(self.root, blob_hash[:2], blob_hash + ext)
+
+    def temp_path(self, suffix: str = "") -> str:
+        """Reserve a scratch file inside the store (same filesystem, so ingest is a rename)"""
+        fd, path = tempfile.mkstemp(suffix=suffix, dir=self.tmp_dir)
+        os.close(fd)
+        return path
+
+    def put_bytes(self, data: bytes, ext: str = "") -> str:
+        """Store raw bytes and return their content hash"""
+        path = self.temp_path(ext)
+        with open(path, "wb") as f:
+            f.write(data)
+        return self.put_file(path, ext=ext)
+
+    def put_stream(self, stream, ext: str = "") -> str:
+        """Store a readable binary stream (e.g. an uploaded file) and return its hash"""
+        path = self.temp_path(ext)
+        with open(path, "wb") as f:
+            shutil.copyfileobj(stream, f, READ_CHUNK_SIZE)
+        return self.put_file(path, ext=ext)
+
+    def put_file(self, path: str, ext: Optional[str] = None, move: bool = True) -> str:
+        """
+        Ingest a file from disk
+
+        Args:
+            path: File to ingest
+            ext: Extension to keep on the stored blob (default: the file's own)
+            move: Move the file into the store instead of copying it
+
+        Returns:
+            Content hash (hex SHA-256) of the file
+        """
+        if ext is None:
+            ext = os.path.splitext(path)[1].lower()
+
+        digest = hashlib.sha256()
+        size = 0
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(READ_CHUNK_SIZE), b""):
+                digest.update(chunk)
+                size += len(chunk)
+        blob_hash = digest.hexdigest()
+
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute("SELECT ext FROM blobs WHERE hash = ?", (blob_hash,)).fetchone()
+            if row is not None and os.path.exists(self._blob_path(blob_hash, row["ext"])):
+                # Already stored: drop the duplicate and just refresh the access time
+                conn.execute("UPDATE blobs SET last_access = ? WHERE hash = ?", (now, blob_hash))
+                if move:
+                    os.unlink(path)
+                return blob_hash
+
+            target = self._blob_path(blob_hash, ext)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            if move:
+                os.replace(path, target)
+            else:
+                shutil.copyfile(path, target)
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO blobs (hash, ext, size, created_at, last_access)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (blob_hash, ext, size, now, now),
+            )
+        return blob_hash
+
+    def info(self, blob_hash: str) -> Optional[dict]:
+        """Return size, extension, timestamps and refcount for a blob"""
+        with self._connect() as conn:
+            row = conn.execute(
+                """
+                SELECT b.*, (SELECT COUNT(*) FROM refs r WHERE r.hash = b.hash) AS refcount
+                FROM blobs b WHERE b.hash = ?
+                """,
+                (blob_hash,),
+            ).fetchone()
+        if row is None:
+            return None
+        record = dict(row)
+        record["path"] = self._blob_path(blob_hash, record["ext"])
+        return record
+
+    def path_for(self, blob_hash: str, touch: bool = True) -> Optional[str]:
+        """Return the on-disk path of a blob, or None if it is not stored"""
+        if not is_blob_hash(blob_hash):
+            return None
+        with self._connect() as conn:
+            row = conn.execute("SELECT ext FROM blobs WHERE hash = ?", (blob_hash,)).fetchone()
+            if row is None:
+                return None
+            path = self._blob_path(blob_hash, row["ext"])
+            if not os.path.exists(path):
+                conn.execute("DELETE FROM blobs WHERE hash = ?", (blob_hash,))
+                return None
+            if touch:
+                conn.execute(
+                    "UPDATE blobs SET last_access = ? WHERE hash = ?", (time.time(), blob_hash)
+                )
+        return path
+
+    def exists(self, blob_hash: str) -> bool:
+        """Check whether a blob is stored"""
+        return self.path_for(blob_hash, touch=False) is not None
+
+    def add_ref(self, blob_hash: str, ref: str) -> None:
+        """Record that `ref` (e.g. "result:12") depends on a blob"""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO refs (hash, ref, created_at) VALUES (?, ?, ?)",
+                (blob_hash, ref, time.time()),
+            )
+
+    def release(self, blob_hash: str, ref: str) -> None:
+        """Drop a reference; unreferenced blobs become eligible for GC"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM refs WHERE hash = ? AND ref = ?", (blob_hash, ref))
+
+    def total_size(self) -> int:
+        """Total bytes currently stored"""
+        with self._connect() as conn:
+            return conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+
+    def _delete(self, conn, blob_hash: str, ext: str) -> None:
+        """Remove a blob file, its variants and its index entries"""
+        path = self._blob_path(blob_hash, ext)
+        for candidate in (path,) + tuple(path + suffix for suffix in VARIANT_SUFFIXES):
+            try:
+                os.unlink(candidate)
+            except FileNotFoundError:
+                pass
+        conn.execute("DELETE FROM blobs WHERE hash = ?", (blob_hash,))
+        conn.execute("DELETE FROM refs WHERE hash = ?", (blob_hash,))
+
+    def collect_garbage(self) -> dict:
+        """
+        Enforce the age and size limits and remove stray files
+
+        Order of eviction:
+            1) blobs not accessed within max_age_seconds (referenced or not)
+            2) unreferenced blobs older than the grace period
+            3) least recently used blobs, unreferenced first, until under max_total_bytes
+            4) files in the store directory that are not indexed (e.g. old scratch files)
+
+        Returns:
+            Counts of deleted blobs/files and bytes freed
+        """
+        now = time.time()
+        stats = {"expired": 0, "unreferenced": 0, "evicted": 0, "orphans": 0, "bytes_freed": 0}
+
+        with self._connect() as conn:
+            if self.max_age_seconds is not None:
+                rows = conn.execute(
+                    "SELECT hash, ext, size FROM blobs WHERE last_access < ?",
+                    (now - self.max_age_seconds,),
+                ).fetchall()
+                for row in rows:
+                    self._delete(conn, row["hash"], row["ext"])
+                    stats["expired"] += 1
+                    stats["bytes_freed"] += row["size"]
+
+            rows = conn.execute(
+                """
+                SELECT hash, ext, size FROM blobs b
+                WHERE last_access < ? AND NOT EXISTS (SELECT 1 FROM refs r WHERE r.hash = b.hash)
+                """,
+                (now - self.unreferenced_grace,),
+            ).fetchall()
+            for row in rows:
+                self._delete(conn, row["hash"], row["ext"])
+                stats["unreferenced"] += 1
+                stats["bytes_freed"] += row["size"]
+
+            if self.max_total_bytes is not None:
+                total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+                if total > self.max_total_bytes:
+                    rows = conn.execute(
+                        """
+                        SELECT hash, ext, size,
+                               EXISTS (SELECT 1 FROM refs r WHERE r.hash = b.hash) AS referenced
+                        FROM blobs b ORDER BY referenced ASC, last_access ASC
+                        """
+                    ).fetchall()
+                    for row in rows:
+                        if total <= self.max_total_bytes:
+                            break
+                        self._delete(conn, row["hash"], row["ext"])
+                        total -= row["size"]
+                        stats["evicted"] += 1
+                        stats["bytes_freed"] += row["size"]
+
+            indexed = {
+                self._blob_path(row["hash"], row["ext"])
+                for row in conn.execute("SELECT hash, ext FROM blobs").fetchall()
+            }
+
+        # Stray files: interrupted ingests, scratch text files, anything not in the index
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                base, suffix = os.path.splitext(path)
+                if path in indexed or path.startswith(self.index_path):
+                    continue
+                if suffix in VARIANT_SUFFIXES and base in indexed:
+                    continue
+                grace = self.scratch_grace.get(suffix, self.unreferenced_grace)
+                try:
+                    if os.path.getmtime(path) < now - grace:
+                        size = os.path.getsize(path)
+                        os.unlink(path)
+                        stats["orphans"] += 1
+                        stats["bytes_freed"] += size
+                except FileNotFoundError:
+                    continue
+
+        return stats
+
+    def start_gc_thread(self, interval: float = 600) -> None:
+        """Run collect_garbage every `interval` seconds in a daemon thread"""
+        if self._gc_thread is not None and self._gc_thread.is_alive():
+            return
+
+        def _run():
+            while not self._gc_stop.wait(interval):
+                try:
+                    stats = self.collect_garbage()
+                    if stats["bytes_freed"]:
+                        print(f"🧹 Blob GC: {stats}")
+                except Exception as e:
+                    print(f"⚠️ Blob GC failed: {e}")
+
+        self._gc_stop.clear()
+        self._gc_thread = threading.Thread(target=_run, name="blob-gc", daemon=True)
+        self._gc_thread.start()
+
+    def stop_gc_thread(self) -> None:
+        """Stop the background GC thread"""
+        self._gc_stop.set()
@@ -0,0 +1,283 @@
+"""
+Resumable chunked uploads assembled directly inside the blob store
+A client opens a session, PUTs fixed-size chunks (each with its SHA-256) in any order and
+as often as needed, asks which chunks are still missing after a dropped connection, and
+finalizes once everything has arrived; the assembled file is ingested as a normal blob.
+Finalizing is idempotent: the upload id keeps pointing at its blob (which stays referenced) until
+the caller releases it, so a request that fails after finalize can simply be repeated.
+"""
+import hashlib
+import os
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Optional
+
+from storage.blob_store import BlobStore
+
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+DEFAULT_SESSION_TTL = 24 * 3600
+DEFAULT_FINALIZED_TTL = 24 * 3600
+PART_SUFFIX = ".part"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS upload_sessions (
+    id TEXT PRIMARY KEY,
+    filename TEXT NOT NULL,
+    ext TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    chunk_size INTEGER NOT NULL,
+    sha256 TEXT,
+    purpose TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS upload_chunks (
+    upload_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    sha256 TEXT NOT NULL,
+    PRIMARY KEY (upload_id, idx)
+);
+CREATE TABLE IF NOT EXISTS finalized_uploads (
+    id TEXT PRIMARY KEY,
+    hash TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    purpose TEXT,
+    finalized_at REAL NOT NULL
+);
+"""
+
+
+class UploadError(Exception):
+    """A chunked-upload request the client must fix (bad checksum, unknown session, ...)"""
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+
+class ChunkedUploads:
+    """Upload sessions stored in the blob index, with part files in the store's scratch dir"""
+
+    def __init__(self, blobs: BlobStore, chunk_size: int = DEFAULT_CHUNK_SIZE, max_size: Optional[int] = None,
+                 session_ttl: float = DEFAULT_SESSION_TTL, finalized_ttl: float = DEFAULT_FINALIZED_TTL):
+        """
+        Args:
+            blobs: Blob store that receives finalized uploads
+            chunk_size: Size of every chunk except the last
+            max_size: Largest accepted upload in bytes (None = no limit)
+            session_ttl: Seconds an unfinished session may sit without a new chunk before it expires
+            finalized_ttl: Seconds a finalized upload that was never released stays repeatable
+        """
+        self.blobs = blobs
+        self.chunk_size = chunk_size
+        self.max_size = max_size
+        self.session_ttl = session_ttl
+        self.finalized_ttl = finalized_ttl
+        # Part files live in the blob store's scratch dir: keep them for the session TTL,
+        # not the much shorter grace the GC gives stray files
+        blobs.scratch_grace[PART_SUFFIX] = session_ttl
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        """Open a short-lived connection to the blob index"""
+        conn = sqlite3.connect(self.blobs.index_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _part_path(self, upload_id: str) -> str:
+        """Partially assembled file (blob GC removes it once the session has been idle for session_ttl)"""
+        return os.path.join(self.blobs.tmp_dir, f"upload_{upload_id}{PART_SUFFIX}")
+
+    def _chunk_count(self, session) -> int:
+        return max(1, -(-session["size"] // session["chunk_size"]))
+
+    def _session(self, conn, upload_id: str):
+        row = conn.execute("SELECT * FROM upload_sessions WHERE id = ?", (upload_id,)).fetchone()
+        if row is None:
+            raise UploadError("Unknown upload", 404)
+        if row["updated_at"] < time.time() - self.session_ttl or not os.path.exists(self._part_path(upload_id)):
+            # Idle past the session TTL (the blob GC may already have swept the part file)
+            self._discard(conn, upload_id)
+            raise UploadError("Upload expired; start a new one", 410)
+        return row
+
+    def _discard(self, conn, upload_id: str) -> None:
+        conn.execute("DELETE FROM upload_chunks WHERE upload_id = ?", (upload_id,))
+        conn.execute("DELETE FROM upload_sessions WHERE id = ?", (upload_id,))
+        try:
+            os.unlink(self._part_path(upload_id))
+        except FileNotFoundError:
+            pass
+
+    def create(self, filename: str, size: int, ext: str = "", sha256: Optional[str] = None,
+               purpose: Optional[str] = None) -> dict:
+        """
+        Open an upload session
+
+        Args:
+            filename: Original file name (returned at finalize)
+            size: Total size in bytes
+            ext: Extension for the stored blob (e.g. ".pdf")
+            sha256: Optional hex SHA-256 of the whole file, checked at finalize
+            purpose: What the upload is for ("summarize", "transcribe")
+
+        Returns:
+            Session status (see status())
+        """
+        if size <= 0:
+            raise UploadError("Upload size must be positive")
+        if self.max_size is not None and size > self.max_size:
+            raise UploadError(f"Upload exceeds the {self.max_size // (1024 * 1024)} MB limit", 413)
+
+        self._expire_sessions()
+        upload_id = uuid.uuid4().hex
+        with open(self._part_path(upload_id), "wb") as f:
+            f.truncate(size)
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT INTO upload_sessions (id, filename, ext, size, chunk_size, sha256, purpose, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (upload_id, filename, ext, size, self.chunk_size, sha256.lower() if sha256 else None, purpose, now, now),
+            )
+        return self.status(upload_id)
+
+    def status(self, upload_id: str) -> dict:
+        """Return the session with received and missing chunk indexes"""
+        with self._connect() as conn:
+            session = self._session(conn, upload_id)
+            received = [row["idx"] for row in conn.execute(
+                "SELECT idx FROM upload_chunks WHERE upload_id = ? ORDER BY idx", (upload_id,)
+            )]
+        total = self._chunk_count(session)
+        received_set = set(received)
+        return {
+            "upload_id": upload_id,
+            "filename": session["filename"],
+            "size": session["size"],
+            "chunk_size": session["chunk_size"],
+            "chunk_count": total,
+            "purpose": session["purpose"],
+            "received": received,
+            "missing": [index for index in range(total) if index not in received_set],
+        }
+
+    def write_chunk(self, upload_id: str, index: int, data: bytes, sha256: Optional[str]) -> dict:
+        """
+        Verify and store one chunk at its offset (re-sending a chunk is harmless)
+
+        Raises:
+            UploadError: Unknown/expired session, bad index or size, or checksum mismatch
+        """
+        if not sha256:
+            raise UploadError("Chunk checksum (X-Chunk-Sha256) is required")
+        if hashlib.sha256(data).hexdigest() != sha256.lower():
+            raise UploadError("Chunk checksum mismatch; resend the chunk", 422)
+
+        with self._connect() as conn:
+            session = self._session(conn, upload_id)
+            total = self._chunk_count(session)
+            if not 0 <= index < total:
+                raise UploadError(f"Chunk index must be between 0 and {total - 1}")
+            offset = index * session["chunk_size"]
+            expected = min(session["chunk_size"], session["size"] - offset)
+            if len(data) != expected:
+                raise UploadError(f"Chunk {index} must be {expected} bytes, got {len(data)}")
+
+            with open(self._part_path(upload_id), "r+b") as f:
+                f.seek(offset)
+                f.write(data)
+            conn.execute(
+                "INSERT OR REPLACE INTO upload_chunks (upload_id, idx, size, sha256) VALUES (?, ?, ?, ?)",
+                (upload_id, index, len(data), sha256.lower()),
+            )
+            conn.execute("UPDATE upload_sessions SET updated_at = ? WHERE id = ?", (time.time(), upload_id))
+        return self.status(upload_id)
+
+    def finalize(self, upload_id: str) -> dict:
+        """
+        Ingest a complete upload into the blob store and close the session
+
+        Returns:
+            {"hash", "filename", "size", "purpose"} of the stored blob
+        """
+        self._expire_finalized()
+        with self._connect() as conn:
+            done = conn.execute("SELECT * FROM finalized_uploads WHERE id = ?", (upload_id,)).fetchone()
+        if done is not None:
+            if not self.blobs.exists(done["hash"]):
+                self.release(upload_id)
+                raise UploadError("Upload expired; start a new one", 410)
+            return {"hash": done["hash"], "filename": done["filename"], "size": done["size"], "purpose": done["purpose"]}
+
+        status = self.status(upload_id)
+        if status["missing"]:
+            raise UploadError(f"Upload incomplete: {len(status['missing'])} chunks missing", 409)
+
+        with self._connect() as conn:
+            session = self._session(conn, upload_id)
+        part_path = self._part_path(upload_id)
+        if session["sha256"]:
+            digest = hashlib.sha256()
+            with open(part_path, "rb") as f:
+                for block in iter(lambda: f.read(1024 * 1024), b""):
+                    digest.update(block)
+            if digest.hexdigest() != session["sha256"]:
+                with self._connect() as conn:
+                    self._discard(conn, upload_id)
+                raise UploadError("File checksum mismatch; upload discarded", 422)
+
+        blob_hash = self.blobs.put_file(part_path, ext=session["ext"])
+        self.blobs.add_ref(blob_hash, f"upload:{upload_id}")
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO finalized_uploads (id, hash, filename, size, purpose, finalized_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (upload_id, blob_hash, session["filename"], session["size"], session["purpose"], time.time()),
+            )
+            self._discard(conn, upload_id)
+        return {"hash": blob_hash, "filename": session["filename"], "size": session["size"], "purpose": session["purpose"]}
+
+    def release(self, upload_id: str) -> None:
+        """Forget a finalized upload once its request has succeeded (or failed for good)"""
+        with self._connect() as conn:
+            done = conn.execute("SELECT hash FROM finalized_uploads WHERE id = ?", (upload_id,)).fetchone()
+            conn.execute("DELETE FROM finalized_uploads WHERE id = ?", (upload_id,))
+        if done is not None:
+            self.blobs.release(done["hash"], f"upload:{upload_id}")
+
+    def _expire_sessions(self) -> None:
+        """Drop unfinished sessions that received no chunk within session_ttl"""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT id FROM upload_sessions WHERE updated_at < ?",
+                                (time.time() - self.session_ttl,)).fetchall()
+            for row in rows:
+                self._discard(conn, row["id"])
+
+    def _expire_finalized(self) -> None:
+        """Release finalized uploads nobody came back for within finalized_ttl"""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT id FROM finalized_uploads WHERE finalized_at < ?",
+                                (time.time() - self.finalized_ttl,)).fetchall()
+        for row in rows:
+            self.release(row["id"])
+
+    def abort(self, upload_id: str) -> None:
+        """Drop a session and its partial file (or a finalized upload kept for a retry)"""
+        with self._connect() as conn:
+            self._discard(conn, upload_id)
+        self.release(upload_id)
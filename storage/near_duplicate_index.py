@@ -0,0 +1,109 @@
+"""
+SQLite-backed MinHash/LSH index of job descriptions behind stored interview preps
+"""
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+from processing.minhash import (
+    band_keys,
+    estimate_similarity,
+    minhash_signature,
+    signature_from_bytes,
+    signature_to_bytes,
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS job_signatures (
+    result_id INTEGER PRIMARY KEY,
+    scope TEXT NOT NULL,
+    signature BLOB NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS job_lsh_buckets (
+    scope TEXT NOT NULL,
+    bucket TEXT NOT NULL,
+    result_id INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_job_lsh_lookup ON job_lsh_buckets (scope, bucket);
+"""
+
+
+class NearDuplicateIndex:
+    """Find earlier job descriptions that are near-duplicates of a new one"""
+
+    def __init__(self, db_path: str, threshold: float = 0.85):
+        """
+        Args:
+            db_path: SQLite file (shared with the result store)
+            threshold: Minimum estimated Jaccard similarity to count as a near-duplicate
+        """
+        self.db_path = db_path
+        self.threshold = threshold
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        """Open a short-lived connection"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def add(self, result_id: int, scope: str, text: str) -> None:
+        """
+        Index the job description behind a stored result
+
+        Args:
+            result_id: Result store id of the interview prep
+            scope: Everything else that must match for reuse (CV and model hash)
+            text: The job description
+        """
+        signature = minhash_signature(text)
+        if signature is None:
+            # Nothing to compare on (no words); never reused for another posting
+            return
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO job_signatures (result_id, scope, signature, created_at) VALUES (?, ?, ?, ?)",
+                (result_id, scope, signature_to_bytes(signature), time.time()),
+            )
+            conn.executemany(
+                "INSERT INTO job_lsh_buckets (scope, bucket, result_id) VALUES (?, ?, ?)",
+                [(scope, key, result_id) for key in band_keys(signature)],
+            )
+
+    def find(self, scope: str, text: str) -> Optional[tuple]:
+        """
+        Look up the most similar indexed job description in the same scope
+
+        Returns:
+            (result_id, similarity) of the best match above the threshold, or None
+        """
+        signature = minhash_signature(text)
+        if signature is None:
+            return None
+        keys = band_keys(signature)
+        placeholders = ",".join("?" * len(keys))
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"""
+                SELECT s.result_id, s.signature FROM job_signatures s
+                WHERE s.result_id IN (
+                    SELECT DISTINCT result_id FROM job_lsh_buckets
+                    WHERE scope = ? AND bucket IN ({placeholders})
+                )
+                """,
+                [scope, *keys],
+            ).fetchall()
+
+        best = None
+        for result_id, stored in rows:
+            similarity = estimate_similarity(signature, signature_from_bytes(stored))
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (result_id, similarity)
+        return best
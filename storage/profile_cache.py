@@ -0,0 +1,125 @@
+"""
+In-memory cache of the CV profile, invalidated when resources/cv.json changes
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import namedtuple
+from typing import Optional
+
+DEFAULT_CV_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "resources", "cv.json"
+)
+
+# data: parsed CV, json_bytes: response body, etag: content hash, prompt_text: compact rendering
+CVSnapshot = namedtuple("CVSnapshot", ["data", "json_bytes", "etag", "prompt_text"])
+
+
+def _label(key: str) -> str:
+    """Turn a JSON key like "professional_experience" into "Professional Experience" """
+    return key.replace("_", " ").strip().title()
+
+
+def _render(value, indent: int, lines: list) -> None:
+    """Append an outline rendering of `value` to `lines`"""
+    pad = "  " * indent
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if isinstance(item, (dict, list)):
+                lines.append(f"{pad}{_label(key)}:")
+                _render(item, indent + 1, lines)
+            else:
+                lines.append(f"{pad}{_label(key)}: {item}")
+    elif isinstance(value, list):
+        for item in value:
+            if isinstance(item, dict):
+                # One line per entry with its scalar fields, nested lists indented below it
+                scalars = [str(v) for v in item.values() if not isinstance(v, (dict, list)) and v != ""]
+                lines.append(f"{pad}- " + " | ".join(scalars))
+                for key, nested in item.items():
+                    if isinstance(nested, (dict, list)):
+                        _render(nested, indent + 1, lines)
+            elif isinstance(item, list):
+                _render(item, indent + 1, lines)
+            else:
+                lines.append(f"{pad}- {item}")
+    else:
+        lines.append(f"{pad}{value}")
+
+
+def render_cv_for_prompt(data) -> str:
+    """
+    Render CV data as a compact outline for prompts
+
+    Drops JSON punctuation and indentation whitespace, which are pure token
+    overhead, while keeping every value and the section structure.
+    """
+    if not isinstance(data, (dict, list)):
+        return str(data)
+    lines = []
+    if isinstance(data, dict):
+        for key, section in data.items():
+            lines.append(f"{_label(key).upper()}")
+            _render(section, 0, lines)
+    else:
+        _render(data, 0, lines)
+    return "\n".join(lines)
+
+
+class ProfileCache:
+    """Parse the CV once and serve precomputed renderings until the file changes"""
+
+    def __init__(self, cv_path: Optional[str] = None):
+        """
+        Args:
+            cv_path: Path to the CV JSON file (default: resources/cv.json)
+        """
+        self.cv_path = cv_path or DEFAULT_CV_PATH
+        self._lock = threading.Lock()
+        self._stat_key = None
+        self._snapshot = None
+
+    def _load(self, raw: bytes) -> CVSnapshot:
+        """Build a snapshot from the raw file content"""
+        etag = hashlib.sha256(raw).hexdigest()
+        if self._snapshot is not None and self._snapshot.etag == etag:
+            # Touched but unchanged: keep the existing renderings
+            return self._snapshot
+        data = json.loads(raw.decode("utf-8"))
+        json_bytes = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        return CVSnapshot(data, json_bytes, etag, render_cv_for_prompt(data))
+
+    def get(self) -> CVSnapshot:
+        """Return the current CV snapshot, reloading only if mtime or size changed"""
+        stat = os.stat(self.cv_path)
+        stat_key = (stat.st_mtime_ns, stat.st_size)
+        if self._snapshot is not None and stat_key == self._stat_key:
+            return self._snapshot
+
+        with self._lock:
+            if self._snapshot is None or stat_key != self._stat_key:
+                with open(self.cv_path, "rb") as f:
+                    raw = f.read()
+                self._snapshot = self._load(raw)
+                self._stat_key = stat_key
+        return self._snapshot
+
+    def prompt_text_for(self, cv_text: str) -> str:
+        """
+        Return the prompt rendering for CV text submitted by a client
+
+        The stored CV (as sent by /api/cv) reuses the cached rendering; other JSON
+        is rendered on the fly, and free text is passed through unchanged.
+        """
+        try:
+            data = json.loads(cv_text)
+        except (TypeError, ValueError):
+            return cv_text
+        try:
+            snapshot = self.get()
+            if data == snapshot.data:
+                return snapshot.prompt_text
+        except (OSError, ValueError):
+            pass
+        return render_cv_for_prompt(data) if isinstance(data, (dict, list)) else cv_text
@@ -0,0 +1,242 @@
+"""
+SQLite-backed store for summary and interview results
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Optional
+
+DEFAULT_DB_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "db", "results.sqlite3"
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    user_id TEXT,
+    input_hash TEXT NOT NULL,
+    pdf_hash TEXT,
+    model TEXT,
+    input_tokens INTEGER,
+    output_tokens INTEGER,
+    duration_ms REAL,
+    timings TEXT,
+    result TEXT NOT NULL,
+    metadata TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_results_user ON results (user_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_results_pdf ON results (pdf_hash, created_at);
+CREATE INDEX IF NOT EXISTS idx_results_created ON results (created_at);
+CREATE INDEX IF NOT EXISTS idx_results_input ON results (kind, input_hash, model, created_at);
+"""
+
+RESULT_KINDS = ("summary", "interview")
+
+
+def hash_bytes(data: bytes) -> str:
+    """Return the hex SHA-256 digest of raw bytes"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_inputs(*parts) -> str:
+    """Return a stable hash for a sequence of request inputs"""
+    digest = hashlib.sha256()
+    for part in parts:
+        if not isinstance(part, str):
+            part = json.dumps(part, sort_keys=True, ensure_ascii=False)
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+def parse_timestamp(value) -> Optional[float]:
+    """Parse an epoch number or ISO date string into epoch seconds"""
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return datetime.fromisoformat(str(value)).timestamp()
+
+
+class ResultStore:
+    """Record and look up generated summaries and interview preps"""
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Open (and create if needed) the result database
+
+        Args:
+            db_path: Path to the SQLite file (default: db/results.sqlite3)
+        """
+        self.db_path = db_path or DEFAULT_DB_PATH
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        """Open a short-lived connection; one per call keeps worker threads independent"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _row_to_dict(row: sqlite3.Row, include_result: bool = True) -> dict:
+        """Convert a database row into a JSON-serializable dict"""
+        record = dict(row)
+        record["timings"] = json.loads(record["timings"]) if record.get("timings") else {}
+        record["metadata"] = json.loads(record["metadata"]) if record.get("metadata") else {}
+        record["created_at_iso"] = datetime.fromtimestamp(record["created_at"]).isoformat()
+        if not include_result:
+            record.pop("result", None)
+        return record
+
+    def record_result(
+        self,
+        kind: str,
+        result: str,
+        input_hash: str,
+        user_id: Optional[str] = None,
+        pdf_hash: Optional[str] = None,
+        model: Optional[str] = None,
+        input_tokens: Optional[int] = None,
+        output_tokens: Optional[int] = None,
+        timings: Optional[dict] = None,
+        metadata: Optional[dict] = None,
+    ) -> int:
+        """
+        Store a generated result
+
+        Args:
+            kind: "summary" or "interview"
+            result: Text returned by the crew
+            input_hash: Hash of everything that determines the result
+            user_id: Optional caller identifier
+            pdf_hash: Content hash of the summarized PDF (summaries only)
+            model: Model identifier used for generation
+            input_tokens: Prompt tokens reported by the provider
+            output_tokens: Completion tokens reported by the provider
+            timings: Stage name -> milliseconds
+            metadata: Any extra JSON-serializable details
+
+        Returns:
+            Row id of the stored result
+        """
+        if kind not in RESULT_KINDS:
+            raise ValueError(f"Unknown result kind: {kind}")
+
+        timings = timings or {}
+        with self._connect() as conn:
+            cursor = conn.execute(
+                """
+                INSERT INTO results (kind, user_id, input_hash, pdf_hash, model, input_tokens,
+                                     output_tokens, duration_ms, timings, result, metadata, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    kind,
+                    user_id,
+                    input_hash,
+                    pdf_hash,
+                    model,
+                    input_tokens,
+                    output_tokens,
+                    timings.get("total_ms"),
+                    json.dumps(timings),
+                    result,
+                    json.dumps(metadata or {}),
+                    time.time(),
+                ),
+            )
+            return cursor.lastrowid
+
+    def find_result(self, kind: str, input_hash: str, model: Optional[str] = None) -> Optional[dict]:
+        """Return the most recent result generated from identical inputs, if any"""
+        query = "SELECT * FROM results WHERE kind = ? AND input_hash = ?"
+        params = [kind, input_hash]
+        if model is not None:
+            query += " AND model = ?"
+            params.append(model)
+        query += " ORDER BY created_at DESC LIMIT 1"
+
+        with self._connect() as conn:
+            row = conn.execute(query, params).fetchone()
+        return self._row_to_dict(row) if row else None
+
+    def get_result(self, result_id: int) -> Optional[dict]:
+        """Fetch a single result by id"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM results WHERE id = ?", (result_id,)).fetchone()
+        return self._row_to_dict(row) if row else None
+
+    def update_metadata(self, result_id: int, **fields) -> None:
+        """Merge fields into a stored result's metadata"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT metadata FROM results WHERE id = ?", (result_id,)).fetchone()
+            if row is None:
+                return
+            metadata = json.loads(row["metadata"]) if row["metadata"] else {}
+            metadata.update(fields)
+            conn.execute(
+                "UPDATE results SET metadata = ? WHERE id = ?", (json.dumps(metadata), result_id)
+            )
+
+    def list_results(
+        self,
+        kind: Optional[str] = None,
+        user_id: Optional[str] = None,
+        pdf_hash: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        limit: int = 50,
+        offset: int = 0,
+    ) -> list:
+        """
+        List stored results, newest first, without their full text
+
+        Args:
+            kind: Filter by "summary" or "interview"
+            user_id: Filter by caller identifier
+            pdf_hash: Filter by PDF content hash
+            since: Only results created at or after this epoch time
+            until: Only results created before this epoch time
+            limit: Maximum number of rows (capped at 500)
+            offset: Number of rows to skip
+
+        Returns:
+            List of result dicts
+        """
+        clauses = []
+        params = []
+        for column, value in (("kind", kind), ("user_id", user_id), ("pdf_hash", pdf_hash)):
+            if value:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            clauses.append("created_at >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("created_at < ?")
+            params.append(until)
+
+        query = "SELECT * FROM results"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY created_at DESC LIMIT ? OFFSET ?"
+        params.extend([max(1, min(int(limit), 500)), max(0, int(offset))])
+
+        with self._connect() as conn:
+            rows = conn.execute(query, params).fetchall()
+        return [self._row_to_dict(row, include_result=False) for row in rows]
@@ -0,0 +1,102 @@
+"""
+Synthesized speech cached by (voice, text), with the MP3s kept in the blob store
+Entries are not referenced, so the blob store's GC drops them after its grace period or
+under size pressure; a lookup whose blob is gone is a miss and removes the entry.
+"""
+import hashlib
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS speech_audio (
+    key TEXT PRIMARY KEY,
+    blob_hash TEXT NOT NULL,
+    voice TEXT,
+    model TEXT,
+    characters INTEGER,
+    source TEXT,
+    created_at REAL NOT NULL
+);
+"""
+
+
+def speech_key(text: str, voice: str) -> str:
+    """Cache key of a text spoken in a voice (surrounding whitespace ignored)"""
+    return hashlib.sha256(f"{voice}\x00{text.strip()}".encode("utf-8")).hexdigest()
+
+
+class SpeechCache:
+    """Look up and store synthesized MP3s"""
+
+    def __init__(self, db_path: str, blobs):
+        """
+        Args:
+            db_path: SQLite file (shared with the result store)
+            blobs: BlobStore holding the audio
+        """
+        self.db_path = db_path
+        self.blobs = blobs
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        """Open a short-lived connection"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, text: str, voice: str) -> Optional[dict]:
+        """
+        Cached audio for a text and voice
+
+        Returns:
+            {"audio": MP3 bytes, "model", "source"} or None
+        """
+        key = speech_key(text, voice)
+        with self._connect() as conn:
+            row = conn.execute("SELECT blob_hash, model, source FROM speech_audio WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        path = self.blobs.path_for(row["blob_hash"])
+        if not path:
+            with self._connect() as conn:
+                conn.execute("DELETE FROM speech_audio WHERE key = ?", (key,))
+            return None
+        with open(path, "rb") as f:
+            return {"audio": f.read(), "model": row["model"], "source": row["source"]}
+
+    def contains(self, text: str, voice: str) -> bool:
+        """Whether audio for a text and voice is cached (without reading it)"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT blob_hash FROM speech_audio WHERE key = ?",
+                               (speech_key(text, voice),)).fetchone()
+        return row is not None and self.blobs.exists(row["blob_hash"])
+
+    def put(self, text: str, voice: str, audio: bytes, model: Optional[str] = None,
+            source: Optional[str] = None) -> str:
+        """
+        Store audio for a text and voice
+
+        Args:
+            source: What produced it ("request", "speculative")
+
+        Returns:
+            The audio's blob hash
+        """
+        blob_hash = self.blobs.put_bytes(audio, ext=".mp3")
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO speech_audio (key, blob_hash, voice, model, characters, source, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (speech_key(text, voice), blob_hash, voice, model, len(text), source, time.time()),
+            )
+        return blob_hash
@@ -0,0 +1,91 @@
+"""
+Checkpoints of finished crew tasks, so a failed or retried job resumes instead of restarting
+Each task's output is saved as soon as the task completes, keyed by the job (its input hash and
+model) and the task's position. A rerun of the same job skips every task with a checkpoint.
+Checkpoints are removed once the job's result is stored, and expire after max_age_seconds.
+"""
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS task_checkpoints (
+    job_key TEXT NOT NULL,
+    task_index INTEGER NOT NULL,
+    task_name TEXT,
+    output TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (job_key, task_index)
+);
+CREATE INDEX IF NOT EXISTS idx_checkpoints_created ON task_checkpoints (created_at);
+"""
+
+
+class TaskCheckpointStore:
+    """Save, load and clear per-task outputs of crew jobs"""
+
+    def __init__(self, db_path: str, max_age_seconds: float = 24 * 3600):
+        """
+        Args:
+            db_path: SQLite file (shared with the result store, or a batch's own file)
+            max_age_seconds: Older checkpoints are ignored and pruned
+        """
+        self.db_path = db_path
+        self.max_age_seconds = max_age_seconds
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+        self.prune()
+
+    @contextmanager
+    def _connect(self):
+        """Open a short-lived connection"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def load(self, job_key: str) -> dict:
+        """
+        Outputs of a job's finished tasks
+
+        Returns:
+            {task index: output text}
+        """
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT task_index, output FROM task_checkpoints WHERE job_key = ? AND created_at >= ?",
+                (job_key, time.time() - self.max_age_seconds),
+            ).fetchall()
+        return {row["task_index"]: row["output"] for row in rows}
+
+    def save(self, job_key: str, task_index: int, output: str, task_name: Optional[str] = None) -> None:
+        """Record a finished task's output"""
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO task_checkpoints (job_key, task_index, task_name, output, created_at)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (job_key, task_index, task_name, output, time.time()),
+            )
+
+    def clear(self, job_key: str) -> None:
+        """Drop a job's checkpoints (its result has been stored)"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM task_checkpoints WHERE job_key = ?", (job_key,))
+
+    def prune(self) -> int:
+        """
+        Delete expired checkpoints
+
+        Returns:
+            Number of checkpoints removed
+        """
+        with self._connect() as conn:
+            cursor = conn.execute("DELETE FROM task_checkpoints WHERE created_at < ?",
+                                  (time.time() - self.max_age_seconds,))
+        return cursor.rowcount
@@ -0,0 +1,48 @@
+"""
+Temporary file lifecycle management
+Each manager owns one private directory; everything in it is removed on cleanup(),
+when the manager is garbage-collected, or at interpreter exit, whichever comes first.
+"""
+import os
+import shutil
+import tempfile
+import uuid
+import weakref
+from typing import Optional
+
+DEFAULT_TEMP_ROOT = os.environ.get("PROCESSING_TMP_DIR") or None
+
+
+class TempFileManager:
+    """Hand out temp file paths and guarantee they are deleted"""
+
+    def __init__(self, root: Optional[str] = DEFAULT_TEMP_ROOT, prefix: str = "ai_agents_"):
+        """
+        Args:
+            root: Parent directory (default: PROCESSING_TMP_DIR or the system temp dir)
+            prefix: Name prefix of the private directory
+        """
+        if root:
+            os.makedirs(root, exist_ok=True)
+        self.directory = tempfile.mkdtemp(prefix=prefix, dir=root)
+        self._finalizer = weakref.finalize(self, shutil.rmtree, self.directory, ignore_errors=True)
+
+    def path(self, suffix: str = "", name: Optional[str] = None) -> str:
+        """Return a fresh path inside the managed directory (the file is not created)"""
+        if not self._finalizer.alive:
+            raise RuntimeError("Temp files were already cleaned up")
+        return os.path.join(self.directory, (name or uuid.uuid4().hex) + suffix)
+
+    @property
+    def closed(self) -> bool:
+        return not self._finalizer.alive
+
+    def cleanup(self) -> None:
+        """Delete the directory and everything in it (safe to call repeatedly)"""
+        self._finalizer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.cleanup()
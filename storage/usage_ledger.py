@@ -0,0 +1,310 @@
+"""
+SQLite-backed ledger of provider usage: tokens, estimated cost and latency per call
+Also evaluates spend and latency budgets, which the app uses to switch to cheaper or
+faster modes while a budget is exceeded.
+"""
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+import numpy as np
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS usage_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    provider TEXT,
+    model TEXT,
+    user_id TEXT,
+    input_tokens INTEGER,
+    cached_input_tokens INTEGER,
+    output_tokens INTEGER,
+    characters INTEGER,
+    cost_usd REAL,
+    latency_ms REAL,
+    timings TEXT,
+    degraded INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_usage_created ON usage_events (created_at);
+CREATE INDEX IF NOT EXISTS idx_usage_kind ON usage_events (kind, created_at);
+"""
+
+# USD per million tokens: (input, cached input, output). Unknown models are costed at 0.
+TOKEN_PRICES = {
+    "gpt-3.5-turbo": (0.50, 0.50, 1.50),
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+    "gpt-4o": (2.50, 1.25, 10.00),
+    "gpt-4.1-mini": (0.40, 0.10, 1.60),
+    "gpt-4.1-nano": (0.10, 0.025, 0.40),
+    "gemini-1.5-flash-8b": (0.0375, 0.01, 0.15),
+    "gemini-1.5-flash": (0.075, 0.01875, 0.30),
+    "gemini-1.5-pro": (1.25, 0.3125, 5.00),
+    "gemini-2.0-flash-lite": (0.075, 0.075, 0.30),
+    "gemini-2.0-flash": (0.10, 0.025, 0.40),
+}
+
+# USD per million characters of synthesized speech
+TTS_PRICES = {"tts-1": 15.0, "tts-1-hd": 30.0, "gtts": 0.0}
+
+GROUP_COLUMNS = {"kind": "kind", "model": "model", "provider": "provider", "user": "user_id",
+                 "day": "date(created_at, 'unixepoch')", "hour": "strftime('%Y-%m-%d %H:00', created_at, 'unixepoch')"}
+
+
+def provider_for(model: Optional[str]) -> Optional[str]:
+    """Provider name from a model identifier ("gemini/gemini-2.0-flash" -> "gemini")"""
+    if not model:
+        return None
+    if "/" in model:
+        return model.split("/", 1)[0]
+    if model.startswith("gemini"):
+        return "gemini"
+    if model in TTS_PRICES:
+        return "google" if model == "gtts" else "openai"
+    return "openai"
+
+
+def estimate_cost(model: Optional[str], input_tokens=None, output_tokens=None,
+                  cached_input_tokens=None, characters=None) -> Optional[float]:
+    """Estimated USD cost of one call (None if the model's price is unknown)"""
+    name = (model or "").split("/")[-1]
+    if name in TTS_PRICES:
+        return (characters or 0) * TTS_PRICES[name] / 1e6
+    prices = TOKEN_PRICES.get(name)
+    if prices is None:
+        # Versioned names ("gpt-4o-mini-2024-07-18") are priced like their base model
+        prices = next((TOKEN_PRICES[base] for base in sorted(TOKEN_PRICES, key=len, reverse=True)
+                       if name.startswith(base)), None)
+    if prices is None:
+        return None
+    cached = min(cached_input_tokens or 0, input_tokens or 0)
+    return ((input_tokens or 0) - cached) * prices[0] / 1e6 + cached * prices[1] / 1e6 \
+        + (output_tokens or 0) * prices[2] / 1e6
+
+
+class UsageLedger:
+    """Record provider calls and aggregate their cost and latency"""
+
+    def __init__(self, db_path: str):
+        """
+        Args:
+            db_path: SQLite file (shared with the result store)
+        """
+        self.db_path = db_path
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        """Open a short-lived connection"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def record(self, kind: str, model: Optional[str] = None, user_id: Optional[str] = None,
+               input_tokens: Optional[int] = None, cached_input_tokens: Optional[int] = None,
+               output_tokens: Optional[int] = None, characters: Optional[int] = None,
+               latency_ms: Optional[float] = None, timings: Optional[dict] = None,
+               degraded: bool = False) -> dict:
+        """
+        Record one provider call
+
+        Args:
+            kind: "interview", "summary", "tts", ...
+            model: Model identifier (the provider is derived from it)
+            user_id: Optional caller identifier
+            input_tokens / cached_input_tokens / output_tokens: Token usage reported by the provider
+            characters: Characters synthesized (TTS)
+            latency_ms: End-to-end latency of the request
+            timings: Stage name -> milliseconds
+            degraded: Whether a budget had switched the request to a cheaper/faster mode
+
+        Returns:
+            The stored event
+        """
+        event = {
+            "kind": kind,
+            "provider": provider_for(model),
+            "model": model,
+            "user_id": user_id,
+            "input_tokens": input_tokens,
+            "cached_input_tokens": cached_input_tokens,
+            "output_tokens": output_tokens,
+            "characters": characters,
+            "cost_usd": estimate_cost(model, input_tokens, output_tokens, cached_input_tokens, characters),
+            "latency_ms": latency_ms,
+            "timings": json.dumps(timings or {}),
+            "degraded": int(bool(degraded)),
+            "created_at": time.time(),
+        }
+        with self._connect() as conn:
+            cursor = conn.execute(
+                f"INSERT INTO usage_events ({', '.join(event)}) VALUES ({', '.join('?' * len(event))})",
+                tuple(event.values()),
+            )
+        event["id"] = cursor.lastrowid
+        event["timings"] = timings or {}
+        return event
+
+    def spend(self, since: float, kinds: Optional[tuple] = None) -> float:
+        """Total estimated USD since an epoch time"""
+        query = "SELECT COALESCE(SUM(cost_usd), 0) FROM usage_events WHERE created_at >= ?"
+        params = [since]
+        if kinds:
+            query += f" AND kind IN ({', '.join('?' * len(kinds))})"
+            params.extend(kinds)
+        with self._connect() as conn:
+            return float(conn.execute(query, params).fetchone()[0])
+
+    def latencies(self, since: float, kinds: Optional[tuple] = None, limit: int = 2000) -> np.ndarray:
+        """Latencies (ms) of the most recent calls since an epoch time"""
+        query = "SELECT latency_ms FROM usage_events WHERE created_at >= ? AND latency_ms IS NOT NULL"
+        params = [since]
+        if kinds:
+            query += f" AND kind IN ({', '.join('?' * len(kinds))})"
+            params.extend(kinds)
+        query += " ORDER BY created_at DESC LIMIT ?"
+        params.append(limit)
+        with self._connect() as conn:
+            return np.array([row[0] for row in conn.execute(query, params)], dtype=np.float64)
+
+    def summary(self, since: Optional[float] = None, until: Optional[float] = None,
+                group_by: str = "kind") -> list:
+        """
+        Aggregate calls, costs, tokens and latency percentiles
+
+        Args:
+            since / until: Epoch time bounds
+            group_by: "kind", "model", "provider", "user", "day" or "hour"
+
+        Returns:
+            One dict per group
+        """
+        if group_by not in GROUP_COLUMNS:
+            raise ValueError(f"Unknown group_by: {group_by}")
+        clauses, params = [], []
+        if since is not None:
+            clauses.append("created_at >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("created_at < ?")
+            params.append(until)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        column = GROUP_COLUMNS[group_by]
+
+        with self._connect() as conn:
+            totals = conn.execute(
+                f"""
+                SELECT {column} AS grp, COUNT(*) AS calls, SUM(degraded) AS degraded_calls,
+                       COALESCE(SUM(cost_usd), 0) AS cost_usd, SUM(input_tokens) AS input_tokens,
+                       SUM(cached_input_tokens) AS cached_input_tokens, SUM(output_tokens) AS output_tokens,
+                       SUM(characters) AS characters
+                FROM usage_events{where} GROUP BY grp ORDER BY grp
+                """,
+                params,
+            ).fetchall()
+            latency_rows = conn.execute(
+                f"SELECT {column} AS grp, latency_ms FROM usage_events{where}"
+                f"{' AND' if where else ' WHERE'} latency_ms IS NOT NULL",
+                params,
+            ).fetchall()
+
+        latencies = {}
+        for row in latency_rows:
+            latencies.setdefault(row["grp"], []).append(row["latency_ms"])
+        groups = []
+        for row in totals:
+            group = dict(row)
+            group[group_by] = group.pop("grp")
+            group["cost_usd"] = round(group["cost_usd"], 6)
+            values = latencies.get(group[group_by])
+            if values:
+                p50, p95, p99 = np.percentile(values, [50, 95, 99])
+                group.update(p50_ms=round(float(p50), 1), p95_ms=round(float(p95), 1), p99_ms=round(float(p99), 1))
+            groups.append(group)
+        return groups
+
+
+class BudgetPolicy:
+    """
+    Decide whether requests should run in a degraded (cheaper/faster) mode
+
+    A budget is exceeded when the estimated spend over the last hour or day is above its
+    limit, or when the recent p95 latency is above the SLO. Decisions are cached for a
+    few seconds so the ledger is not queried on every request.
+    """
+
+    def __init__(self, ledger: UsageLedger, hourly_usd: Optional[float] = None, daily_usd: Optional[float] = None,
+                 p95_seconds: Optional[float] = None, latency_window_seconds: float = 900,
+                 min_samples: int = 20, cache_seconds: float = 15):
+        """
+        Args:
+            ledger: Where spend and latency are read from
+            hourly_usd / daily_usd: Spend limits over the trailing hour / day (None: no limit)
+            p95_seconds: Latency SLO for LLM requests (None: no limit)
+            latency_window_seconds: How far back the p95 is measured
+            min_samples: Calls needed before the p95 is trusted
+            cache_seconds: How long a decision is reused
+        """
+        self.ledger = ledger
+        self.hourly_usd = hourly_usd
+        self.daily_usd = daily_usd
+        self.p95_seconds = p95_seconds
+        self.latency_window_seconds = latency_window_seconds
+        self.min_samples = min_samples
+        self.cache_seconds = cache_seconds
+        self._state = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def state(self, force: bool = False) -> dict:
+        """
+        Current budget usage
+
+        Returns:
+            {"degraded": bool, "over_spend": bool, "over_latency": bool, "reasons": [...], plus the measurements}
+        """
+        with self._lock:
+            now = time.time()
+            if not force and self._state is not None and now - self._checked_at < self.cache_seconds:
+                return self._state
+
+            reasons = []
+            hourly = self.ledger.spend(now - 3600)
+            daily = self.ledger.spend(now - 86400)
+            if self.hourly_usd is not None and hourly >= self.hourly_usd:
+                reasons.append(f"hourly spend ${hourly:.2f} >= ${self.hourly_usd:.2f}")
+            if self.daily_usd is not None and daily >= self.daily_usd:
+                reasons.append(f"daily spend ${daily:.2f} >= ${self.daily_usd:.2f}")
+            over_spend = bool(reasons)
+
+            latencies = self.ledger.latencies(now - self.latency_window_seconds, kinds=("interview", "summary"))
+            p95 = float(np.percentile(latencies, 95)) / 1000 if len(latencies) >= self.min_samples else None
+            over_latency = self.p95_seconds is not None and p95 is not None and p95 > self.p95_seconds
+            if over_latency:
+                reasons.append(f"p95 latency {p95:.1f}s > {self.p95_seconds:.1f}s")
+
+            if reasons and not (self._state or {}).get("degraded"):
+                print(f"💸 Budget exceeded, switching to degraded mode: {'; '.join(reasons)}")
+            elif not reasons and (self._state or {}).get("degraded"):
+                print("💸 Back within budget, leaving degraded mode")
+
+            self._state = {
+                "degraded": bool(reasons),
+                "over_spend": over_spend,
+                "over_latency": over_latency,
+                "reasons": reasons,
+                "hourly_spend_usd": round(hourly, 6),
+                "daily_spend_usd": round(daily, 6),
+                "p95_seconds": round(p95, 3) if p95 is not None else None,
+                "limits": {"hourly_usd": self.hourly_usd, "daily_usd": self.daily_usd, "p95_seconds": self.p95_seconds},
+            }
+            self._checked_at = now
+            return self._state
@@ -1,28 +1,123 @@
 """
 Audio utilities for voice processing
 """
-import pyaudio
 import wave
 import os
 import tempfile
-from typing import Optional
+from collections import deque
+from typing import Callable, Optional, Tuple
+
+import numpy as np
+
+# PyAudio is only needed for local microphone capture
+try:
+    import pyaudio
+    PYAUDIO_AVAILABLE = True
+except ImportError:
+    pyaudio = None
+    PYAUDIO_AVAILABLE = False
+
+
+def pcm16_to_float(data: bytes) -> np.ndarray:
+    """Convert 16-bit little-endian PCM bytes to float32 samples in [-1, 1]"""
+    return np.frombuffer(data, dtype="<i2").astype(np.float32) / 32768.0
+
+
+def pcm_to_float(data: bytes, dtype: np.dtype) -> np.ndarray:
+    """Convert PCM bytes of any integer or float sample type to float32 samples in [-1, 1]"""
+    samples = np.frombuffer(data, dtype=dtype)
+    if dtype.kind == "f":
+        return samples.astype(np.float32)
+    if dtype.kind == "u":
+        # Unsigned PCM is centred on the middle of its range
+        midpoint = 2 ** (8 * dtype.itemsize - 1)
+        return (samples.astype(np.float32) - midpoint) / midpoint
+    return samples.astype(np.float32) / float(2 ** (8 * dtype.itemsize - 1))
+
+
+class EnergyVAD:
+    """Energy-based voice activity detection with an adaptive noise floor"""
+
+    def __init__(self, threshold_db: float = -45.0, noise_margin_db: float = 12.0, noise_adapt: float = 0.05):
+        """
+        Args:
+            threshold_db: Frames quieter than this (dBFS) are never speech
+            noise_margin_db: Speech must also be this far above the running noise floor
+            noise_adapt: How fast the noise floor follows non-speech frames (0-1)
+        """
+        self.threshold_db = threshold_db
+        self.noise_margin_db = noise_margin_db
+        self.noise_adapt = noise_adapt
+        self.noise_floor_db = None
+
+    @staticmethod
+    def frame_db(samples: np.ndarray) -> float:
+        """RMS level of a frame in dBFS"""
+        if samples.size == 0:
+            return -120.0
+        rms = float(np.sqrt(np.mean(np.square(samples, dtype=np.float64))))
+        return 20.0 * np.log10(max(rms, 1e-6))
+
+    def is_speech(self, samples: np.ndarray) -> bool:
+        """Classify one frame of float samples, updating the noise floor on silence"""
+        level = self.frame_db(samples)
+        if self.noise_floor_db is None:
+            self.noise_floor_db = min(level, self.threshold_db)
+        speech = level > max(self.threshold_db, self.noise_floor_db + self.noise_margin_db)
+        if not speech:
+            self.noise_floor_db += self.noise_adapt * (level - self.noise_floor_db)
+        return speech
+
+
+def voiced_span(samples: np.ndarray, rate: int, vad: Optional[EnergyVAD] = None,
+                frame_ms: int = 30, padding_ms: int = 200) -> Tuple[int, int]:
+    """
+    Sample range of the voiced part of float samples
+
+    Returns:
+        (start, end) of the voiced span plus padding_ms on each side ((0, 0) if no speech was found)
+    """
+    vad = vad or EnergyVAD()
+    frame = max(1, rate * frame_ms // 1000)
+    voiced = [index for index, start in enumerate(range(0, len(samples), frame))
+              if vad.is_speech(samples[start:start + frame])]
+    if not voiced:
+        return 0, 0
+    padding = rate * padding_ms // 1000
+    return max(0, voiced[0] * frame - padding), min(len(samples), (voiced[-1] + 1) * frame + padding)
+
 
 class AudioRecorder:
-    """Simple audio recorder for capturing voice input"""
+    """Audio recorder for capturing voice input
+
+    Captured chunks go into a fixed-size ring buffer, so memory stays bounded however
+    long the microphone is left open. record_until_silence() keeps only the voiced
+    part of the recording and stops by itself once the speaker goes quiet.
+    """
     
-    def __init__(self, chunk=1024, format=pyaudio.paInt16, channels=1, rate=44100):
+    def __init__(self, chunk=1024, format=None, channels=1, rate=44100, max_seconds=60,
+                 vad: Optional[EnergyVAD] = None):
+        if not PYAUDIO_AVAILABLE:
+            raise RuntimeError("PyAudio not installed. Install pyaudio for local microphone capture.")
         self.chunk = chunk
-        self.format = format
+        self.format = format if format is not None else pyaudio.paInt16
+        self.sample_dtype = self._sample_dtype(self.format)
         self.channels = channels
         self.rate = rate
+        self.max_chunks = max(1, int(rate / chunk * max_seconds))
+        self.vad = vad or EnergyVAD()
         self.audio = pyaudio.PyAudio()
-        self.frames = []
+        self.frames = deque(maxlen=self.max_chunks)
         self.is_recording = False
         self.stream = None
     
+    @property
+    def chunk_seconds(self) -> float:
+        return self.chunk / self.rate
+
     def start_recording(self):
         """Start recording audio"""
-        self.frames = []
+        self.frames = deque(maxlen=self.max_chunks)
         self.is_recording = True
         
         self.stream = self.audio.open(
@@ -33,14 +128,45 @@ class AudioRecorder:
             frames_per_buffer=self.chunk
         )
     
+    def _read_chunk(self) -> bytes:
+        return self.stream.read(self.chunk, exception_on_overflow=False)
+
+    @staticmethod
+    def _sample_dtype(format) -> np.dtype:
+        """numpy dtype of one sample in a PyAudio format"""
+        dtypes = {
+            pyaudio.paInt8: np.dtype("i1"),
+            pyaudio.paUInt8: np.dtype("u1"),
+            pyaudio.paInt16: np.dtype("<i2"),
+            pyaudio.paInt32: np.dtype("<i4"),
+            pyaudio.paFloat32: np.dtype("<f4"),
+        }
+        if format not in dtypes:
+            raise ValueError("Unsupported PyAudio sample format (use paInt8, paUInt8, paInt16, paInt32 or paFloat32)")
+        return dtypes[format]
+
+    def _mono_samples(self, data: bytes) -> np.ndarray:
+        """Float mono samples of captured PCM"""
+        samples = pcm_to_float(data, self.sample_dtype)
+        if self.channels > 1:
+            samples = samples.reshape(-1, self.channels).mean(axis=1)
+        return samples
+
+    def _is_speech(self, data: bytes) -> bool:
+        return self.vad.is_speech(self._mono_samples(data))
+
+    def _close_stream(self):
+        self.is_recording = False
+        self.stream.stop_stream()
+        self.stream.close()
+        self.stream = None
+
     def stop_recording(self) -> str:
         """Stop recording and save to temporary file"""
         if not self.is_recording or not self.stream:
             return None
             
-        self.is_recording = False
-        self.stream.stop_stream()
-        self.stream.close()
+        self._close_stream()
         
         # Create temporary file
         temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.wav')
@@ -54,16 +180,103 @@ class AudioRecorder:
         
         return temp_file.name
     
-    def record_audio(self, duration: int = 5) -> str:
-        """Record audio for specified duration in seconds"""
+    def _trim_frames(self) -> bool:
+        """
+        Keep only the voiced span of the captured frames (see voiced_span)
+
+        Returns:
+            False if the recording holds no speech
+        """
+        data = b''.join(self.frames)
+        # A fresh detector: the recorder's own noise floor describes the end of the recording
+        vad = EnergyVAD(self.vad.threshold_db, self.vad.noise_margin_db, self.vad.noise_adapt)
+        start, end = voiced_span(self._mono_samples(data), self.rate, vad)
+        frame_bytes = self.sample_dtype.itemsize * self.channels
+        self.frames = deque([data[start * frame_bytes:end * frame_bytes]], maxlen=self.max_chunks)
+        return end > start
+
+    def record_audio(self, duration: int = 5, trim: bool = True) -> Optional[str]:
+        """
+        Record audio for specified duration in seconds
+
+        Args:
+            duration: Seconds to record (the ring buffer keeps at most max_seconds)
+            trim: Drop leading and trailing silence before saving
+
+        Returns:
+            Path of a WAV file, or None if trim is set and nobody spoke
+        """
         self.start_recording()
         
-        # Record for specified duration
+        # Record for specified duration (the ring buffer keeps at most max_seconds)
         for _ in range(0, int(self.rate / self.chunk * duration)):
             if self.is_recording:
-                data = self.stream.read(self.chunk)
-                self.frames.append(data)
+                self.frames.append(self._read_chunk())
         
+        if trim and not self._trim_frames():
+            self._close_stream()
+            return None
+        return self.stop_recording()
+
+    def record_until_silence(self, silence_timeout: float = 1.2, start_timeout: float = 10.0,
+                             pre_roll: float = 0.3, on_frames: Optional[Callable[[bytes], None]] = None) -> Optional[str]:
+        """
+        Record one utterance: wait for speech, stop after silence_timeout of quiet
+
+        Leading silence (beyond pre_roll seconds kept for soft onsets) and trailing
+        silence are never stored. The recording also stops when the ring buffer is
+        full (max_seconds).
+
+        Args:
+            silence_timeout: Seconds of silence that end the utterance
+            start_timeout: Give up if no speech starts within this many seconds
+            pre_roll: Seconds of audio kept before the detected speech onset
+            on_frames: Called with each voiced block of PCM as it is captured,
+                for incremental transcription
+
+        Returns:
+            Path of a WAV file with the trimmed utterance, or None if nobody spoke
+        """
+        self.start_recording()
+        lead = deque(maxlen=max(1, int(pre_roll / self.chunk_seconds)))
+        pending_silence = []
+        silence_chunks = max(1, int(silence_timeout / self.chunk_seconds))
+        waited = 0
+
+        try:
+            # Wait for speech onset, keeping only a short pre-roll
+            while self.is_recording:
+                data = self._read_chunk()
+                if self._is_speech(data):
+                    self.frames.extend(lead)
+                    self.frames.append(data)
+                    if on_frames:
+                        on_frames(b''.join(lead) + data)
+                    break
+                lead.append(data)
+                waited += 1
+                if waited * self.chunk_seconds >= start_timeout:
+                    self._close_stream()
+                    return None
+
+            # Capture until the speaker has been quiet for silence_timeout
+            while self.is_recording and len(self.frames) + len(pending_silence) < self.max_chunks:
+                data = self._read_chunk()
+                if self._is_speech(data):
+                    # Short pauses inside the utterance are kept
+                    self.frames.extend(pending_silence)
+                    self.frames.append(data)
+                    if on_frames:
+                        on_frames(b''.join(pending_silence) + data)
+                    pending_silence = []
+                else:
+                    pending_silence.append(data)
+                    if len(pending_silence) >= silence_chunks:
+                        break
+        except Exception:
+            self._close_stream()
+            raise
+
         return self.stop_recording()
     
     def cleanup(self):
@@ -0,0 +1,132 @@
+"""
+Speculative text-to-speech: synthesize the start of a result before anyone asks for it
+Users nearly always press "Read Aloud" right after an interview prep arrives, so its first
+sections are synthesized in the background and stored in the speech cache. The work runs on
+one low-priority thread and is abandoned as soon as the server is busy with real requests.
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from storage.speech_cache import speech_key
+
+
+def _lower_thread_priority():
+    """Nice the worker thread (Linux applies niceness per thread); best effort elsewhere"""
+    try:
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 10)
+    except (AttributeError, OSError):
+        pass
+
+
+class SpeculativeSynthesizer:
+    """Pre-synthesize result sections into a SpeechCache on a background thread"""
+
+    def __init__(self, get_handler: Callable, cache, sections: int = 3, max_pending: int = 8,
+                 should_yield: Optional[Callable[[], bool]] = None,
+                 on_synthesized: Optional[Callable[[dict], None]] = None):
+        """
+        Args:
+            get_handler: Returns the TTS handler (or None when TTS is unavailable)
+            cache: SpeechCache the audio is stored in
+            sections: How many leading sections of a result to synthesize
+            max_pending: Results queued at most; further ones are dropped
+            should_yield: Returns True while the server is too busy for speculative work
+            on_synthesized: Called with {"model", "characters", "latency_ms"} after each synthesis
+        """
+        self.get_handler = get_handler
+        self.cache = cache
+        self.sections = sections
+        self.max_pending = max_pending
+        self.should_yield = should_yield or (lambda: False)
+        self.on_synthesized = on_synthesized
+        self.stats = {"scheduled": 0, "dropped": 0, "synthesized": 0, "already_cached": 0, "cancelled": 0, "failed": 0}
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="speculative-tts",
+                                            initializer=_lower_thread_priority)
+        self._pending = 0
+        self._current = None   # (speech key, Event set when done) of the section being synthesized
+        self._lock = threading.Lock()
+
+    def schedule(self, sections: list, voice: str = "nova") -> bool:
+        """
+        Queue the first sections of a result for synthesis
+
+        Returns:
+            False if the work was dropped (queue full or server busy)
+        """
+        sections = [section for section in sections[:self.sections] if section.strip()]
+        if not sections:
+            return False
+        with self._lock:
+            if self._pending >= self.max_pending or self.should_yield():
+                self.stats["dropped"] += 1
+                return False
+            self._pending += 1
+            self.stats["scheduled"] += 1
+        self._executor.submit(self._run, sections, voice)
+        return True
+
+    def _run(self, sections: list, voice: str) -> None:
+        try:
+            for position, text in enumerate(sections):
+                if self.should_yield():
+                    with self._lock:
+                        self.stats["cancelled"] += len(sections) - position
+                    return
+                done = threading.Event()
+                with self._lock:
+                    self._current = (speech_key(text, voice), done)
+                try:
+                    self._synthesize(text, voice)
+                except Exception as e:
+                    with self._lock:
+                        self.stats["failed"] += 1
+                    print(f"⚠️ Speculative TTS failed: {e}")
+                finally:
+                    with self._lock:
+                        self._current = None
+                    done.set()
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def _synthesize(self, text: str, voice: str) -> None:
+        if self.cache.contains(text, voice):
+            with self._lock:
+                self.stats["already_cached"] += 1
+            return
+        handler = self.get_handler()
+        if handler is None:
+            raise RuntimeError("TTS service not available")
+        info = {}
+        started = time.perf_counter()
+        audio = handler.synthesize(text, voice, info=info)
+        if not audio:
+            raise RuntimeError("no audio returned")
+        latency_ms = (time.perf_counter() - started) * 1000
+        self.cache.put(text, voice, audio, model=info.get("model"), source="speculative")
+        with self._lock:
+            self.stats["synthesized"] += 1
+        if self.on_synthesized:
+            self.on_synthesized({"model": info.get("model"), "characters": info.get("characters", len(text)),
+                                 "latency_ms": latency_ms})
+
+    def wait_for(self, text: str, voice: str, timeout: float) -> bool:
+        """
+        Wait for the speculative synthesis of this text if it is running right now
+
+        Queued sections are not waited for: synthesizing them for the request is faster.
+
+        Returns:
+            True if it was running and finished within the timeout
+        """
+        with self._lock:
+            current = self._current
+        return current is not None and current[0] == speech_key(text, voice) and current[1].wait(timeout)
+
+    def status(self) -> dict:
+        """Counters plus the current queue"""
+        with self._lock:
+            return dict(self.stats, pending=self._pending, sections=self.sections)
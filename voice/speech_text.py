@@ -0,0 +1,94 @@
+"""
+Turn markdown results into plain text sections for speech synthesis
+An interview prep is split at its headings and numbered questions, so each question and its
+answer can be synthesized (and played) on its own instead of as one long clip.
+"""
+import re
+
+_HEADING_RE = re.compile(r"^\s{0,3}#{1,6}\s+")
+_NUMBERED_RE = re.compile(r"^\s{0,3}(?:\*\*|__)?\d{1,2}[.)]\s+")
+_LINK_RE = re.compile(r"!?\[([^\]]*)\]\([^)]*\)")
+_EMPHASIS_RE = re.compile(r"(\*\*|__|\*|_|`)(?=\S)(.+?)(?<=\S)\1")
+_BULLET_RE = re.compile(r"^\s*(?:[-*+•]|\d{1,2}[.)])\s+")
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+def speech_line(line: str) -> str:
+    """Plain text of one markdown line (headings, bullets, emphasis and links removed)"""
+    line = _HEADING_RE.sub("", line)
+    line = _BULLET_RE.sub("", line)
+    line = _LINK_RE.sub(r"\1", line)
+    line = _EMPHASIS_RE.sub(r"\2", line)
+    line = line.replace("|", " ").replace("**", "").strip(" \t*_#>-")
+    line = re.sub(r"\s+", " ", line).strip()
+    if line and line[-1] not in ".!?:;,":
+        # Headings and bullets have no full stop; without one they run into the next line
+        line += "."
+    return line
+
+
+def markdown_to_speech(text: str) -> str:
+    """Plain text of a whole markdown document"""
+    return " ".join(filter(None, (speech_line(line) for line in text.splitlines())))
+
+
+def _split_long(text: str, max_chars: int) -> list:
+    """Split at sentence boundaries into pieces of at most max_chars (longer sentences are cut)"""
+    pieces, current = [], ""
+    for sentence in _SENTENCE_END_RE.split(text):
+        while len(sentence) > max_chars:
+            if current:
+                pieces.append(current)
+                current = ""
+            cut = sentence.rfind(" ", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            pieces.append(sentence[:cut].strip())
+            sentence = sentence[cut:].strip()
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            pieces.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}".strip()
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def speech_sections(text: str, max_chars: int = 1500, min_chars: int = 120) -> list:
+    """
+    Split a markdown result into speakable sections
+
+    Args:
+        text: Markdown (an interview prep)
+        max_chars: Longest section; longer ones are split between sentences
+        min_chars: Shorter sections (e.g. a lone title) are merged into the next one
+
+    Returns:
+        Plain text sections in reading order
+    """
+    blocks, current = [], []
+    for line in text.splitlines():
+        if (_HEADING_RE.match(line) or _NUMBERED_RE.match(line)) and current:
+            blocks.append(current)
+            current = []
+        current.append(line)
+    if current:
+        blocks.append(current)
+
+    sections, pending = [], ""
+    for block in blocks:
+        spoken = " ".join(filter(None, (speech_line(line) for line in block)))
+        if not spoken:
+            continue
+        spoken = f"{pending} {spoken}".strip()
+        if len(spoken) < min_chars:
+            pending = spoken
+            continue
+        pending = ""
+        sections.extend(_split_long(spoken, max_chars))
+    if pending:
+        if sections and len(sections[-1]) + 1 + len(pending) <= max_chars:
+            sections[-1] = f"{sections[-1]} {pending}"
+        else:
+            sections.append(pending)
+    return sections
@@ -0,0 +1,193 @@
+"""
+Streaming speech-to-text with partial transcripts
+Audio arrives in small frames; the uncommitted window is re-decoded every step to give a
+partial transcript, and committed as a final segment when the speaker pauses (or when the
+window gets too long, keeping some overlap so words on the cut are not lost).
+"""
+import re
+import threading
+import time
+import uuid
+from typing import Callable, Optional
+
+import numpy as np
+
+from voice.audio_utils import EnergyVAD, pcm16_to_float
+
+SAMPLE_RATE = 16000
+FRAME_SAMPLES = SAMPLE_RATE * 30 // 1000
+PROMPT_CHARS = 200
+
+_WORD_RE = re.compile(r"[\w']+")
+
+
+def merge_overlap(previous: str, new: str, max_words: int = 8) -> str:
+    """Drop the words at the start of `new` that repeat the end of `previous`"""
+    previous_words = [w.lower() for w in _WORD_RE.findall(previous)]
+    new_tokens = new.split()
+    new_words = [" ".join(_WORD_RE.findall(token)).lower() for token in new_tokens]
+    for size in range(min(max_words, len(previous_words), len(new_words)), 0, -1):
+        if previous_words[-size:] == new_words[:size]:
+            return " ".join(new_tokens[size:])
+    return new
+
+
+class StreamingTranscriber:
+    """Incremental Whisper decoding over a sliding window of 16 kHz mono audio"""
+
+    def __init__(self, transcribe: Callable[[np.ndarray, Optional[str]], str], step_seconds: float = 1.0,
+                 max_window_seconds: float = 15.0, overlap_seconds: float = 1.0,
+                 endpoint_silence: float = 0.7, pre_roll: float = 0.3, vad: Optional[EnergyVAD] = None):
+        """
+        Args:
+            transcribe: fn(samples, prompt) -> text, e.g. SpeechToTextHandler.transcribe_samples
+            step_seconds: New audio needed before the partial transcript is refreshed
+            max_window_seconds: Longest stretch decoded at once before a forced cut
+            overlap_seconds: Audio kept across a forced cut
+            endpoint_silence: Pause length that commits the current segment
+            pre_roll: Audio kept before detected speech onset
+        """
+        self.transcribe = transcribe
+        self.step = int(step_seconds * SAMPLE_RATE)
+        self.max_window = int(max_window_seconds * SAMPLE_RATE)
+        self.overlap = int(overlap_seconds * SAMPLE_RATE)
+        self.endpoint = int(endpoint_silence * SAMPLE_RATE)
+        self.pre_roll = int(pre_roll * SAMPLE_RATE)
+        self.vad = vad or EnergyVAD()
+
+        self.frames = []
+        self.window_size = 0
+        self.pending = np.zeros(0, dtype=np.float32)
+        self.segments = []
+        self.partial = ""
+        self.heard_speech = False
+        self.trailing_silence = 0
+        self.since_decode = 0
+        self.decoded_seconds = 0.0
+
+    @property
+    def text(self) -> str:
+        """All committed text"""
+        return " ".join(self.segments)
+
+    @property
+    def window(self) -> np.ndarray:
+        """The uncommitted audio"""
+        return np.concatenate(self.frames) if self.frames else np.zeros(0, dtype=np.float32)
+
+    def _keep_tail(self, size: int) -> None:
+        """Drop all but the last `size` samples of the window"""
+        tail = self.window[max(0, self.window_size - size):]
+        self.frames = [tail] if len(tail) else []
+        self.window_size = len(tail)
+
+    def _decode(self, samples: np.ndarray) -> str:
+        self.decoded_seconds += len(samples) / SAMPLE_RATE
+        self.since_decode = 0
+        return self.transcribe(samples, self.text[-PROMPT_CHARS:] or None).strip()
+
+    def _commit(self, text: str) -> Optional[str]:
+        text = merge_overlap(self.text, text) if self.segments else text
+        self.partial = ""
+        if text:
+            self.segments.append(text)
+            return text
+        return None
+
+    def feed_pcm16(self, data: bytes) -> dict:
+        """Feed 16-bit little-endian mono PCM at 16 kHz"""
+        return self.feed(pcm16_to_float(data))
+
+    def feed(self, samples: np.ndarray) -> dict:
+        """
+        Add audio and decode whatever is due
+
+        Returns:
+            {"partial": current uncommitted text, "final": segments committed by this call}
+        """
+        final = []
+        self.pending = np.concatenate([self.pending, samples.astype(np.float32, copy=False)])
+        usable = len(self.pending) - len(self.pending) % FRAME_SAMPLES
+
+        for start in range(0, usable, FRAME_SAMPLES):
+            frame = self.pending[start:start + FRAME_SAMPLES]
+            speech = self.vad.is_speech(frame)
+            self.frames.append(frame)
+            self.window_size += len(frame)
+            self.since_decode += len(frame)
+
+            if not self.heard_speech:
+                if not speech:
+                    # Only a short pre-roll of leading silence is ever decoded
+                    if self.window_size > self.pre_roll + FRAME_SAMPLES:
+                        self._keep_tail(self.pre_roll)
+                    self.since_decode = 0
+                    continue
+                self.heard_speech = True
+            self.trailing_silence = 0 if speech else self.trailing_silence + len(frame)
+
+            if self.trailing_silence >= self.endpoint:
+                # Pause: commit the utterance without its trailing silence
+                committed = self._commit(self._decode(self.window[:self.window_size - self.trailing_silence + self.pre_roll]))
+                if committed:
+                    final.append(committed)
+                self._keep_tail(self.pre_roll)
+                self.heard_speech = False
+                self.trailing_silence = 0
+            elif self.window_size >= self.max_window:
+                # Long run without a pause: commit and carry an overlap into the next window
+                committed = self._commit(self._decode(self.window))
+                if committed:
+                    final.append(committed)
+                self._keep_tail(self.overlap)
+
+        self.pending = self.pending[usable:]
+        if self.heard_speech and self.since_decode >= self.step:
+            self.partial = self._decode(self.window)
+        return {"partial": self.partial, "final": final}
+
+    def finish(self) -> dict:
+        """Decode the remaining audio and return the full transcript"""
+        final = []
+        if self.heard_speech and self.window_size:
+            committed = self._commit(self._decode(np.concatenate([self.window, self.pending])))
+            if committed:
+                final.append(committed)
+        self.frames = []
+        self.window_size = 0
+        self.pending = np.zeros(0, dtype=np.float32)
+        self.heard_speech = False
+        self.partial = ""
+        return {"final": final, "text": self.text}
+
+
+class StreamingSessions:
+    """In-process registry of live transcription streams, expired when idle"""
+
+    def __init__(self, idle_timeout: float = 60.0):
+        self.idle_timeout = idle_timeout
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def create(self, transcriber: StreamingTranscriber) -> str:
+        """Register a stream and return its id"""
+        stream_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            for expired in [key for key, (_, _, seen) in self._sessions.items() if now - seen > self.idle_timeout]:
+                del self._sessions[expired]
+            self._sessions[stream_id] = (transcriber, threading.Lock(), now)
+        return stream_id
+
+    def get(self, stream_id: str):
+        """Return (transcriber, lock) for a live stream, or None"""
+        with self._lock:
+            entry = self._sessions.get(stream_id)
+            if entry is None:
+                return None
+            self._sessions[stream_id] = (entry[0], entry[1], time.time())
+            return entry[0], entry[1]
+
+    def close(self, stream_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(stream_id, None)
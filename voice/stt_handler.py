@@ -84,6 +84,30 @@ class SpeechToTextHandler:
             traceback.print_exc()
             raise
     
+    def transcribe_samples(self, samples, initial_prompt: Optional[str] = None) -> str:
+        """
+        Transcribe in-memory audio (16 kHz mono float32, as used for streaming)
+        
+        Args:
+            samples: numpy array of samples in [-1, 1]
+            initial_prompt: Preceding text, so a window continues the sentence
+            
+        Returns:
+            Transcribed text
+        """
+        if not WHISPER_AVAILABLE or not self.model:
+            raise RuntimeError("Whisper not available. Please use Web Speech API for voice input.")
+        
+        result = self.model.transcribe(
+            samples,
+            fp16=False,
+            language='en',
+            initial_prompt=initial_prompt,
+            condition_on_previous_text=False,
+            word_timestamps=False
+        )
+        return result["text"].strip()
+    
     def transcribe_audio_data(self, audio_data: bytes) -> str:
         """
         Transcribe audio data to text
@@ -45,18 +45,37 @@ class TextToSpeechHandler:
         Returns:
             Base64 encoded audio data or None if error
         """
+        audio_data = self.synthesize(text, voice)
+        return base64.b64encode(audio_data).decode('utf-8') if audio_data else None
+    
+    def synthesize(self, text: str, voice: str = "nova", max_length: int = 4000,
+                   free_only: bool = False, info: Optional[dict] = None) -> Optional[bytes]:
+        """
+        Convert text to MP3 bytes using OpenAI TTS with Google TTS fallback
+        
+        Args:
+            text: Text to convert to speech
+            voice: Voice to use (default: nova - female)
+            max_length: Characters synthesized before the text is truncated
+            free_only: Skip OpenAI and use Google TTS directly
+            info: Optional dict filled with the "model" used and the "characters" synthesized
+            
+        Returns:
+            MP3 audio data or None if error
+        """
         if not text or not text.strip():
             print("❌ No text provided for TTS")
             return None
         
         # Truncate very long text
-        max_length = 4000
         if len(text) > max_length:
             text = text[:max_length] + "..."
             print(f"⚠️ Text truncated to {max_length} characters")
+        if info is not None:
+            info["characters"] = len(text)
         
         # Try OpenAI TTS first if client is available
-        if self.client:
+        if self.client and not free_only:
             try:
                 print(f"🎤 Trying OpenAI TTS with voice: {voice}")
                 print(f"Text length: {len(text)} characters")
@@ -69,10 +88,11 @@ class TextToSpeechHandler:
                 )
                 
                 audio_data = response.content
-                audio_base64 = base64.b64encode(audio_data).decode('utf-8')
                 
                 print(f"✅ OpenAI TTS successful: {len(audio_data)} bytes")
-                return audio_base64
+                if info is not None:
+                    info["model"] = self.model
+                return audio_data
                 
             except Exception as e:
                 print(f"⚠️ OpenAI TTS failed: {e}")
@@ -91,12 +111,12 @@ class TextToSpeechHandler:
             tts.write_to_fp(audio_buffer)
             audio_buffer.seek(0)
             
-            # Convert to base64
             audio_data = audio_buffer.read()
-            audio_base64 = base64.b64encode(audio_data).decode('utf-8')
             
             print(f"✅ Google TTS successful: {len(audio_data)} bytes")
-            return audio_base64
+            if info is not None:
+                info["model"] = "gtts"
+            return audio_data
             
         except Exception as e:
             print(f"❌ Google TTS also failed: {e}")
@@ -0,0 +1,154 @@
+"""
+Adaptive Whisper model tier selection
+Keeps several Whisper sizes available and picks, per request, the most accurate one whose
+predicted latency (clip duration x measured real-time factor x current queue) fits the SLO.
+"""
+import json
+import os
+import threading
+import time
+from typing import Callable, Optional
+
+import numpy as np
+
+from voice.stt_handler import SpeechToTextHandler, WHISPER_AVAILABLE
+
+try:
+    import whisper
+except ImportError:
+    whisper = None
+
+SAMPLE_RATE = 16000
+
+# Seconds of CPU decoding per second of audio, used until a tier has been measured
+DEFAULT_REAL_TIME_FACTORS = {"tiny": 0.08, "base": 0.18, "small": 0.55, "medium": 1.6, "large": 3.5}
+
+
+def load_real_time_factors(path: str) -> dict:
+    """
+    Real-time factors per tier from benchmarks/bench_whisper_tiers.py --output
+
+    Returns:
+        {tier: real_time_factor} for the tiers that were measured without error
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        results = json.load(f)
+    return {result["tier"]: float(result["real_time_factor"])
+            for result in results if "real_time_factor" in result}
+
+
+class AdaptiveWhisper:
+    """Drop-in replacement for SpeechToTextHandler that chooses the model per clip"""
+
+    def __init__(self, tiers=("tiny", "base", "small"), latency_slo: float = 3.0, workers: int = 1,
+                 queue_depth: Optional[Callable[[], int]] = None, preload: bool = False,
+                 real_time_factors: Optional[dict] = None):
+        """
+        Args:
+            tiers: Model sizes from fastest/least accurate to slowest/most accurate
+            latency_slo: Target seconds from request to transcript
+            workers: Transcriptions that can run at once (the CPU pool size)
+            queue_depth: Returns the CPU jobs running or queued, including this one
+                (default: only the transcriptions running in this selector)
+            preload: Load every tier now instead of on first use
+            real_time_factors: Measured starting factors per tier (e.g. load_real_time_factors);
+                tiers not listed start from DEFAULT_REAL_TIME_FACTORS
+        """
+        self.tiers = list(tiers)
+        self.latency_slo = latency_slo
+        self.workers = max(1, workers)
+        measured = real_time_factors or {}
+        self.real_time_factors = {tier: measured.get(tier, DEFAULT_REAL_TIME_FACTORS.get(tier, 1.0)) for tier in self.tiers}
+        self._handlers = {}
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._in_flight = 0
+        self.queue_depth = queue_depth or (lambda: self._in_flight + 1)
+        if preload:
+            for tier in self.tiers:
+                self._handler(tier)
+
+    def _handler(self, tier: str) -> SpeechToTextHandler:
+        """Loaded handler for a tier, or the next smaller tier that loads"""
+        for candidate in reversed(self.tiers[:self.tiers.index(tier) + 1]):
+            with self._load_lock:
+                if candidate not in self._handlers:
+                    self._handlers[candidate] = SpeechToTextHandler(model_size=candidate)
+                handler = self._handlers[candidate]
+            if handler.is_available():
+                return handler
+        raise RuntimeError("No Whisper model could be loaded")
+
+    def warm_up(self) -> bool:
+        """Load every tier and run one short decode on each, so no request pays for it"""
+        if not self.is_available():
+            return False
+        silence = np.zeros(SAMPLE_RATE, dtype=np.float32)
+        for tier in self.tiers:
+            handler = self._handler(tier)
+            handler.transcribe_samples(silence)
+        return True
+
+    def predict_latency(self, tier: str, duration: float, queue_depth: Optional[int] = None) -> float:
+        """Expected seconds to transcribe `duration` seconds of audio given the requests ahead of it"""
+        queue_depth = max(0, self.queue_depth() - 1) if queue_depth is None else queue_depth
+        waves = 1 + queue_depth // self.workers
+        return self.real_time_factors[tier] * duration * waves
+
+    def select_tier(self, duration: float, queue_depth: Optional[int] = None) -> str:
+        """Most accurate tier predicted to meet the SLO, else the fastest one"""
+        for tier in reversed(self.tiers):
+            if self.predict_latency(tier, duration, queue_depth) <= self.latency_slo:
+                return tier
+        return self.tiers[0]
+
+    def _run(self, samples, initial_prompt: Optional[str] = None) -> str:
+        duration = len(samples) / SAMPLE_RATE
+        with self._lock:
+            self._in_flight += 1
+            tier = self.select_tier(duration)
+        try:
+            handler = self._handler(tier)
+            tier = handler.model_size
+            started = time.perf_counter()
+            text = handler.transcribe_samples(samples, initial_prompt)
+            elapsed = time.perf_counter() - started
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+        if duration > 0.5:
+            # Track each tier's real-time factor on this machine (exponential moving average)
+            with self._lock:
+                self.real_time_factors[tier] += 0.2 * (elapsed / duration - self.real_time_factors[tier])
+        print(f"🎚️  Whisper {tier}: {duration:.1f}s audio in {elapsed:.1f}s")
+        return text
+
+    def transcribe_audio_file(self, audio_file_path: str) -> str:
+        """Transcribe an audio file with the tier chosen for its duration"""
+        if not self.is_available():
+            raise RuntimeError("Whisper not available. Please use Web Speech API for voice input.")
+        if not os.path.exists(audio_file_path):
+            raise FileNotFoundError(f"Audio file not found: {audio_file_path}")
+        return self._run(whisper.load_audio(audio_file_path))
+
+    def transcribe_samples(self, samples, initial_prompt: Optional[str] = None) -> str:
+        """Transcribe 16 kHz float samples with the tier chosen for their duration"""
+        if not self.is_available():
+            raise RuntimeError("Whisper not available. Please use Web Speech API for voice input.")
+        return self._run(samples, initial_prompt)
+
+    def get_model_info(self) -> dict:
+        """Tiers, which are loaded, and their measured real-time factors"""
+        return {
+            "model_size": "adaptive",
+            "tiers": self.tiers,
+            "loaded": [tier for tier, handler in self._handlers.items() if handler.is_available()],
+            "real_time_factors": {tier: round(rtf, 3) for tier, rtf in self.real_time_factors.items()},
+            "latency_slo": self.latency_slo,
+            "queue_depth": self.queue_depth(),
+            "whisper_available": WHISPER_AVAILABLE,
+        }
+
+    def is_available(self) -> bool:
+        """Check if Whisper STT is available"""
+        return WHISPER_AVAILABLE